@@ -23,6 +23,7 @@ Generate a MultiTree object
 
 from toytree.core.tree import ToyTree
 from toytree.core.node import Node
+from toytree.core.arrays import TreeArrays
 # from toytree.core.multitree import MultiTree
 
 # easier acces to the main toyplot types
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+
+"""Compact array-backed representation of a ToyTree.
+
+A TreeArrays object stores the topology and edge data of a tree as a
+struct of NumPy arrays indexed by Node idx labels. It is immutable and
+does not store per-Node Python objects, making it cheap to hold in
+memory, to pickle, and to query from numeric code.
+
+Because Nodes are labeled with tips first (idx 0 to ntips - 1)
+followed by internal Nodes in postorder, the root is always the last
+idx, and every Node's parent has a larger idx than the Node itself.
+Many queries below take advantage of this ordering.
+
+Examples
+--------
+>>> tree = toytree.rtree.unittree(10, seed=123)
+>>> arrs = tree.to_arrays()
+>>> arrs.get_mrca_idx(0, 1, 2)
+>>> arrs.get_node_distance(0, 9)
+>>> tree = toytree.ToyTree.from_arrays(arrs)
+"""
+
+from __future__ import annotations
+from typing import TypeVar, Sequence, Tuple
+import numpy as np
+from toytree.utils.src.exceptions import ToytreeError
+
+ToyTree = TypeVar("ToyTree")
+
+__all__ = ["TreeArrays"]
+
+
+class TreeArrays:
+    """Immutable struct-of-arrays representation of a ToyTree.
+
+    Create from a ToyTree with `ToyTree.to_arrays()`, and convert back
+    to a ToyTree with `ToyTree.from_arrays()`. Only the topology and
+    the name, dist, support and height of Nodes are stored. All arrays
+    are indexed by Node idx labels and are read-only.
+
+    Attributes
+    ----------
+    parent: np.ndarray
+        int array of the parent idx of each Node (-1 for the root).
+    child_offsets: np.ndarray
+        int array of length nnodes + 1 such that the children of Node
+        i are `children[child_offsets[i]:child_offsets[i + 1]]`.
+    children: np.ndarray
+        int array of the child idxs of all Nodes, in order.
+    dist: np.ndarray
+        float array of the length of the edge above each Node.
+    support: np.ndarray
+        float array of the support of the edge above each Node.
+    height: np.ndarray
+        float array of the height of each Node.
+    names: np.ndarray
+        object array of the name of each Node.
+    """
+    _FIELDS = (
+        "parent", "child_offsets", "children",
+        "dist", "support", "height", "names",
+    )
+    __slots__ = _FIELDS + ("_root_dists", "_depths")
+
+    def __init__(
+        self,
+        parent: Sequence[int],
+        child_offsets: Sequence[int],
+        children: Sequence[int],
+        dist: Sequence[float],
+        support: Sequence[float],
+        height: Sequence[float],
+        names: Sequence[str],
+    ):
+        arrays = (
+            np.array(parent, dtype=np.int64),
+            np.array(child_offsets, dtype=np.int64),
+            np.array(children, dtype=np.int64),
+            np.array(dist, dtype=np.float64),
+            np.array(support, dtype=np.float64),
+            np.array(height, dtype=np.float64),
+            np.array(names, dtype=object),
+        )
+        nnodes = arrays[0].size
+        valid = (
+            nnodes
+            and arrays[0][-1] == -1
+            and np.all(arrays[0][:-1] > np.arange(nnodes - 1))
+            and arrays[1].size == nnodes + 1
+            and all(i.size == nnodes for i in arrays[3:])
+        )
+        if not valid:
+            raise ToytreeError(
+                "TreeArrays must be in Node idx order (root last and "
+                "parent idxs greater than child idxs).")
+        for attr, arr in zip(self._FIELDS, arrays):
+            arr.setflags(write=False)
+            object.__setattr__(self, attr, arr)
+        self._init_cache()
+
+    def _init_cache(self) -> None:
+        """Clear derived arrays, which are computed on first use."""
+        object.__setattr__(self, "_root_dists", None)
+        object.__setattr__(self, "_depths", None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("TreeArrays is immutable.")
+
+    def __repr__(self) -> str:
+        return f"<TreeArrays(ntips={self.ntips}, nnodes={self.nnodes})>"
+
+    def __len__(self) -> int:
+        return self.nnodes
+
+    def __getstate__(self):
+        return tuple(getattr(self, i) for i in self._FIELDS)
+
+    def __setstate__(self, state):
+        for attr, arr in zip(self._FIELDS, state):
+            object.__setattr__(self, attr, arr)
+        self._init_cache()
+
+    @classmethod
+    def from_tree(cls, tree: ToyTree) -> TreeArrays:
+        """Return a TreeArrays from a ToyTree in O(n) time."""
+        nnodes = tree.nnodes
+        parent = np.full(nnodes, -1, dtype=np.int64)
+        child_offsets = np.zeros(nnodes + 1, dtype=np.int64)
+        children = []
+        dist = np.empty(nnodes)
+        support = np.empty(nnodes)
+        height = np.empty(nnodes)
+        names = np.empty(nnodes, dtype=object)
+        for idx in range(nnodes):
+            node = tree._idx_dict[idx]
+            if node._up is not None:
+                parent[idx] = node._up._idx
+            children.extend(child._idx for child in node._children)
+            child_offsets[idx + 1] = len(children)
+            dist[idx] = node._dist
+            support[idx] = node._support
+            height[idx] = node._height
+            names[idx] = node._name
+        return cls(parent, child_offsets, children, dist, support, height, names)
+
+    @property
+    def nnodes(self) -> int:
+        """Number of Nodes in the tree."""
+        return self.parent.size
+
+    @property
+    def ntips(self) -> int:
+        """Number of tip Nodes in the tree."""
+        return int(np.count_nonzero(np.diff(self.child_offsets) == 0))
+
+    ###################################################
+    # TOPOLOGY QUERIES
+    ###################################################
+
+    def get_children(self, idx: int) -> np.ndarray:
+        """Return an array of the child idxs of a Node."""
+        return self.children[self.child_offsets[idx]:self.child_offsets[idx + 1]]
+
+    def get_tip_idxs(self) -> np.ndarray:
+        """Return an array of the tip Node idxs (0 to ntips - 1)."""
+        return np.flatnonzero(np.diff(self.child_offsets) == 0)
+
+    def get_tip_labels(self) -> np.ndarray:
+        """Return an array of the tip Node names in idx order."""
+        return self.names[self.get_tip_idxs()]
+
+    def get_depths(self) -> np.ndarray:
+        """Return an array of the number of edges from each Node to root.
+
+        The read-only array is computed once and cached.
+        """
+        if self._depths is None:
+            object.__setattr__(self, "_depths", self._sum_from_root([1] * self.nnodes, np.int64))
+        return self._depths
+
+    def get_mrca_idx(self, *idxs: int) -> int:
+        """Return the idx of the most recent common ancestor of Nodes.
+
+        Because a parent always has a larger idx than its children,
+        the MRCA is found by repeatedly moving the Node with the
+        smallest idx to its parent until all paths meet.
+        """
+        parent = self.parent
+        mrca = int(idxs[0])
+        for idx in idxs[1:]:
+            idx = int(idx)
+            while idx != mrca:
+                if idx < mrca:
+                    idx = parent[idx]
+                else:
+                    mrca = parent[mrca]
+        return int(mrca)
+
+    def get_mrca_idxs(self, pairs: np.ndarray) -> np.ndarray:
+        """Return an array of MRCA idxs for an (n, 2) array of idx pairs.
+
+        Paths from all pairs are traced to the root in parallel, such
+        that the number of vectorized steps is bounded by tree depth.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        left = pairs[:, 0].copy()
+        right = pairs[:, 1].copy()
+        active = np.flatnonzero(left != right)
+        while active.size:
+            lvals = left[active]
+            rvals = right[active]
+            lower = lvals < rvals
+            left[active[lower]] = self.parent[lvals[lower]]
+            right[active[~lower]] = self.parent[rvals[~lower]]
+            active = active[left[active] != right[active]]
+        return left
+
+    ###################################################
+    # DISTANCE QUERIES
+    ###################################################
+
+    def _sum_from_root(self, values: Sequence, dtype: np.dtype) -> np.ndarray:
+        """Return a read-only array of values summed on the path from
+        the root to each Node (excluding the root's value).
+
+        Parents have larger idxs than their children, so sums are
+        filled from the root down in reverse idx order.
+        """
+        parent = self.parent.tolist()
+        sums = [0] * self.nnodes
+        for idx in range(self.nnodes - 2, -1, -1):
+            sums[idx] = sums[parent[idx]] + values[idx]
+        arr = np.array(sums, dtype=dtype)
+        arr.setflags(write=False)
+        return arr
+
+    def get_root_dists(self) -> np.ndarray:
+        """Return an array of the distance from each Node to the root.
+
+        Distances are summed along edges from the root, rather than
+        from Node heights, such that they are exact to the order of
+        summation. The read-only array is computed once and cached.
+        """
+        if self._root_dists is None:
+            object.__setattr__(self, "_root_dists", self._sum_from_root(self.dist.tolist(), np.float64))
+        return self._root_dists
+
+    def get_node_distance(self, idx0: int, idx1: int) -> float:
+        """Return the patristic distance between two Nodes."""
+        mrca = self.get_mrca_idx(idx0, idx1)
+        rdists = self.get_root_dists()
+        return float(rdists[idx0] + rdists[idx1] - 2 * rdists[mrca])
+
+    def get_node_distances(self, pairs: np.ndarray) -> np.ndarray:
+        """Return an array of patristic distances for an (n, 2) array
+        of Node idx pairs.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        mrcas = self.get_mrca_idxs(pairs)
+        rdists = self.get_root_dists()
+        return rdists[pairs[:, 0]] + rdists[pairs[:, 1]] - 2 * rdists[mrcas]
+
+    def get_node_path_length(self, idx0: int, idx1: int) -> int:
+        """Return the number of edges separating two Nodes."""
+        mrca = self.get_mrca_idx(idx0, idx1)
+        depths = self.get_depths()
+        return int(depths[idx0] + depths[idx1] - 2 * depths[mrca])
+
+    def get_edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (parent, child) idx arrays for all non-root Nodes."""
+        child = np.arange(self.nnodes - 1)
+        return self.parent[child], child
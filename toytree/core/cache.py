@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""Per-tree cache of structures derived from a ToyTree topology.
+
+Many functions (e.g., in `distance`, `enum`, `infer` and `MultiTree`)
+derive structures from the topology of a tree, such as bipartitions,
+topology ids, or an LCAIndex. A ToyTree caches these in a dict keyed
+by the name of the structure (and its arguments). Each entry stores the
+topology version of the tree when it was computed, and is recomputed
+if the version has changed, which happens every time the tree is
+updated (`ToyTree._update`). Structures that depend on Node features,
+such as tip names, should include the features in their key, since
+Node features can be changed without updating the tree. Entries
+of older versions are removed on a cache miss, and at most
+`MAX_ENTRIES_PER_STRUCTURE` entries are kept for each structure name,
+such that keys of old feature values do not accumulate.
+
+Hits and misses are counted for each structure and can be viewed for
+profiling with `get_cache_stats`.
+
+Examples
+--------
+>>> tree = toytree.rtree.unittree(10, seed=123)
+>>> tree.get_topology_id()
+>>> tree.get_topology_id()
+>>> toytree.core.cache.get_cache_stats()
+>>> #              hits  misses
+>>> # topology_id     1       1
+"""
+
+from typing import TypeVar, Any, Callable, Hashable, Tuple
+from collections import Counter
+import pandas as pd
+
+ToyTree = TypeVar("ToyTree")
+
+__all__ = ["get_cached", "get_cache_stats", "reset_cache_stats"]
+
+CACHE_HITS = Counter()
+CACHE_MISSES = Counter()
+MAX_ENTRIES_PER_STRUCTURE = 8
+
+
+def get_cached(tree: ToyTree, key: Tuple[Hashable, ...], func: Callable[[], Any]) -> Any:
+    """Return a cached structure of a tree, computing it if needed.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        The tree from which the structure is derived.
+    key: Tuple
+        A hashable tuple where the first item is the name of the
+        structure, and other items are arguments it depends on.
+    func: Callable
+        A function with no arguments that computes the structure.
+        The returned object is shared by all callers and should not
+        be modified.
+    """
+    if tree._dirty:
+        tree._update_full()
+    try:
+        entry = tree._cache.get(key)
+    except TypeError:
+        # key includes unhashable feature values, do not cache.
+        CACHE_MISSES[key[0]] += 1
+        return func()
+    if entry is not None and entry[0] == tree._topology_version:
+        CACHE_HITS[key[0]] += 1
+        return entry[1]
+    CACHE_MISSES[key[0]] += 1
+    value = func()
+
+    # remove entries of older versions, and the oldest entries of this
+    # structure (e.g., keyed by old tip names) if there are too many.
+    version = tree._topology_version
+    same = []
+    for other, (other_version, _) in list(tree._cache.items()):
+        if other_version != version:
+            del tree._cache[other]
+        elif other[0] == key[0] and other != key:
+            same.append(other)
+    for other in same[:max(0, len(same) + 1 - MAX_ENTRIES_PER_STRUCTURE)]:
+        del tree._cache[other]
+    tree._cache[key] = (version, value)
+    return value
+
+
+def get_cache_stats() -> pd.DataFrame:
+    """Return a DataFrame with the number of hits and misses for
+    each type of cached structure since the last reset.
+    """
+    names = sorted(set(CACHE_HITS) | set(CACHE_MISSES))
+    return pd.DataFrame(
+        {"hits": [CACHE_HITS[i] for i in names], "misses": [CACHE_MISSES[i] for i in names]},
+        index=names,
+        dtype=int,
+    )
+
+
+def reset_cache_stats() -> None:
+    """Reset the hit and miss counters of cached structures."""
+    CACHE_HITS.clear()
+    CACHE_MISSES.clear()
+
+
+def _get_tip_features_key(tree: ToyTree, *features: str) -> Tuple[Tuple[Any, ...], ...]:
+    """Return a tuple of the values of features of tips for use in keys."""
+    tips = [tree._idx_dict[i] for i in range(tree.ntips)]
+    return tuple(tuple(getattr(node, feature) for node in tips) for feature in features)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+"""Constant time lowest common ancestor (LCA, or MRCA) queries.
+
+The LCAIndex is built in O(n log n) time from a ToyTree and then
+answers MRCA queries between any two Nodes in O(1) time using a
+range-minimum-query (RMQ) on a sparse table.
+
+Nodes are visited in preorder, and for two Nodes u and v visited at
+positions i < j, the MRCA is the parent of the Node with the smallest
+depth in the preorder range (i, j]. This is because the range ends at
+v, and contains the child of the MRCA that is ancestral to v, but does
+not leave the clade of the MRCA.
+
+A ToyTree caches its LCAIndex, which is built the first time it is
+needed and discarded whenever the tree is updated (`ToyTree._update`).
+
+Examples
+--------
+>>> tree = toytree.rtree.unittree(10, seed=123)
+>>> tree.get_mrca_idxs([[0, 1], [2, 8], [3, 15]])
+"""
+
+from __future__ import annotations
+from typing import TypeVar, Sequence
+import numpy as np
+
+ToyTree = TypeVar("ToyTree")
+
+__all__ = ["LCAIndex"]
+
+
+class LCAIndex:
+    """Index of a ToyTree topology for O(1) MRCA queries.
+
+    Attributes
+    ----------
+    parent: np.ndarray
+        int array of the parent idx of each Node (-1 for the root).
+    order: np.ndarray
+        int array of the preorder position of each Node.
+    tip_ranges: np.ndarray
+        int array of shape (nnodes, 2) with the first and last tip
+        idx descended from each Node. Tips descended from a Node
+        always have contiguous idx labels.
+    table: List[np.ndarray]
+        sparse table where table[k][i] is the min key among the Nodes
+        visited at preorder positions i to i + 2**k - 1, where Nodes
+        are keyed by (depth * nnodes + idx).
+    """
+    __slots__ = ("parent", "order", "tip_ranges", "table")
+
+    def __init__(self, tree: ToyTree):
+        nnodes = tree.nnodes
+        dtype = np.int32 if nnodes < 2**15 else np.int64
+        parent = np.full(nnodes, -1, dtype=dtype)
+        order = np.empty(nnodes, dtype=dtype)
+        tip_ranges = np.empty((nnodes, 2), dtype=dtype)
+
+        # visit Nodes in preorder, left to right, storing depth keys.
+        keys = []
+        stack = [(tree.treenode, 0)]
+        while stack:
+            node, depth = stack.pop()
+            order[node._idx] = len(keys)
+            keys.append(depth * nnodes + node._idx)
+            for child in node._children:
+                parent[child._idx] = node._idx
+            stack.extend((i, depth + 1) for i in node._children[::-1])
+
+        # tips descended from each Node (children are before parents).
+        ntips = tree.ntips
+        tip_ranges[:ntips, 0] = tip_ranges[:ntips, 1] = np.arange(ntips)
+        for idx in range(ntips, nnodes):
+            children = tree._idx_nodes[idx]._children
+            tip_ranges[idx, 0] = tip_ranges[children[0]._idx, 0]
+            tip_ranges[idx, 1] = tip_ranges[children[-1]._idx, 1]
+
+        # sparse table of min key over windows of size 2**k
+        table = [np.array(keys, dtype=dtype)]
+        width = 1
+        while 2 * width <= nnodes:
+            prev = table[-1]
+            table.append(np.minimum(prev[:-width], prev[width:]))
+            width *= 2
+
+        self.parent = parent
+        self.order = order
+        self.tip_ranges = tip_ranges
+        self.table = table
+
+    def get_mrca_idx(self, idx0: int, idx1: int) -> int:
+        """Return the MRCA idx of two Nodes selected by idx."""
+        if idx0 == idx1:
+            return idx0
+        pos0 = int(self.order[idx0])
+        pos1 = int(self.order[idx1])
+        if pos0 > pos1:
+            pos0, pos1 = pos1, pos0
+        pos0 += 1
+        level = (pos1 - pos0 + 1).bit_length() - 1
+        row = self.table[level]
+        key = min(row[pos0], row[pos1 - (1 << level) + 1])
+        return int(self.parent[key % self.parent.size])
+
+    def get_mrca_idx_of_many(self, idxs: Sequence[int]) -> int:
+        """Return the MRCA idx of any number of Nodes selected by idx.
+
+        The MRCA of a set of Nodes is the MRCA of the two Nodes that
+        are first and last in preorder.
+        """
+        idxs = np.asarray(idxs, dtype=np.int64)
+        pos = self.order[idxs]
+        return self.get_mrca_idx(int(idxs[pos.argmin()]), int(idxs[pos.argmax()]))
+
+    def get_mrca_idxs(self, pairs: np.ndarray) -> np.ndarray:
+        """Return an array of MRCA idxs for an (n, 2) array of idx pairs."""
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        pos0 = self.order[pairs[:, 0]].astype(np.int64)
+        pos1 = self.order[pairs[:, 1]].astype(np.int64)
+        lower = np.minimum(pos0, pos1) + 1
+        upper = np.maximum(pos0, pos1)
+
+        # level of the sparse table covering each range with 2 windows
+        same = lower > upper
+        sizes = np.where(same, 1, upper - lower + 1)
+        levels = np.frexp(sizes)[1] - 1
+        keys = np.empty(pairs.shape[0], dtype=np.int64)
+        for level in np.unique(levels):
+            mask = levels == level
+            row = self.table[level]
+            keys[mask] = np.minimum(
+                row[np.where(same[mask], 0, lower[mask])],
+                row[np.where(same[mask], 0, upper[mask] - (1 << level) + 1)],
+            )
+        mrcas = self.parent[keys % self.parent.size].astype(np.int64)
+        mrcas[same] = pairs[same, 0]
+        return mrcas
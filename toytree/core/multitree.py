@@ -37,7 +37,7 @@ from __future__ import annotations
 from typing import Union, List, Sequence, Optional, Tuple, TypeVar, Iterator
 from copy import deepcopy
 import numpy as np
-# import pandas as pd
+import pandas as pd
 from loguru import logger
 from toytree.utils import ToytreeError
 from toytree.core import ToyTree, Node
@@ -48,6 +48,8 @@ from toytree.drawing.src.draw_cloudtree import draw_cloudtree
 from toytree.drawing.src.draw_multitree import draw_multitree
 from toytree.annotate import add_axes_scale_bar
 # from toytree.core.drawing.render import ToytreeMark
+from toytree.core.cache import get_cached, _get_tip_features_key
+from toytree.enum.src.bipartitions import _iter_bipartition_bitmasks
 import toytree.infer
 
 # from toytree.utils import ToytreeError
@@ -60,6 +62,32 @@ Query = TypeVar("Query", str, int, Node)
 logger = logger.bind(name="toytree")
 
 
+def _get_topology_splits(tree: ToyTree, include_root: bool = False) -> Tuple:
+    """Return a hashable representation of a tree topology that is
+    equal for two trees only if they have the same topology.
+
+    This is the sorted tip names, the set of canonical bitmasks of
+    bipartitions (see `_iter_bipartition_bitmasks`), and if
+    include_root=True, the set of bitmasks of the root's children.
+    It is used to confirm that trees with the same topology hash
+    have the same topology.
+    """
+    def func():
+        labels = sorted(tree.get_tip_labels())
+        masks = frozenset(_iter_bipartition_bitmasks(tree, sort=True, tip_labels=labels))
+        root = None
+        if include_root and tree.is_rooted():
+            bits = {name: 1 << i for i, name in enumerate(labels)}
+            root = frozenset(
+                sum(bits[i] for i in child.get_leaf_names())
+                for child in tree.treenode._children
+            )
+        return tuple(labels), masks, root
+
+    key = ("topology_splits", include_root, _get_tip_features_key(tree, "name"))
+    return get_cached(tree, key, func)
+
+
 class MultiTree:
     """MultiTree class to visualize and analyze collections of trees.
 
@@ -126,8 +154,19 @@ class MultiTree:
         return all(set(i.get_tip_labels()) == first for i in self)
 
     def all_tree_topologies_same(self, include_root: bool = False) -> bool:
-        """Return True if all topologies in treelist are identical."""
-        return len(set(i.get_topology_id(include_root=include_root) for i in self)) == 1
+        """Return True if all topologies in treelist are identical.
+
+        Returns False at the first tree with a different topology hash,
+        and if all hashes are the same the trees are compared exactly
+        by their bipartitions.
+        """
+        first = self.treelist[0]
+        hashed = first.get_topology_hash(include_root=include_root)
+        for tree in self.treelist[1:]:
+            if tree.get_topology_hash(include_root=include_root) != hashed:
+                return False
+        splits = _get_topology_splits(first, include_root)
+        return all(_get_topology_splits(i, include_root) == splits for i in self.treelist[1:])
 
     def all_tree_tips_aligned(self, rtol: float = 1e-5, atol: float = 1e-5) -> bool:
         """Return True if all tree tips are aligned (i.e., ultrametric)
@@ -158,39 +197,118 @@ class MultiTree:
     #     return counter
 
     # better name?
-    def get_unique_topologies(self, include_root: bool = False) -> List[Tuple[ToyTree, int]]:
+    def get_unique_topologies(self, include_root: bool = False, exact: bool = True) -> List[Tuple[ToyTree, int]]:
         """Return a list of (ToyTree, count) for each unique tree.
 
         This can be useful for calculating statistics only on the
         unique set of trees and multiplying by their frequency (for
-        example this is done when generating consensus trees).
+        example this is done when generating consensus trees). Trees
+        are grouped by their topology hash (see `ToyTree.get_topology_hash`),
+        and each tree is compared exactly, by its bipartitions, to the
+        first tree of each topology with the same hash.
 
         Parameters
         ----------
         include_root:
             If False then all unique rooted trees are counted and
             returned rather than all unique unrooted trees.
+        exact:
+            If True (default) trees with the same topology hash are
+            also compared by their bipartitions, such that trees are
+            never grouped by a (highly unlikely) hash collision. If
+            False trees are grouped by hash only, which is slightly
+            faster.
 
         Examples
         --------
         >>> mtree = toytree.mtree(
         >>>     [toytree.rtree.rtree(6) for i in range(100)])
-        >>> print(mtree.get_unique_topology_counts())
+        >>> print(mtree.get_unique_topologies())
         >>> # [(ToyTree, 10), (ToyTree, 9), (ToyTree, 9), ...]
         """
-        trees_dict = {}
-        for tree in self:
-            hashed = tree.get_topology_id(include_root=include_root)
-            if hashed in trees_dict:
-                trees_dict[hashed][1] += 1
+        groups = self._get_topology_groups(include_root, exact)
+        entries = [[self.treelist[idx], count] for idx, count in groups]
+        return sorted(entries, key=lambda x: x[1], reverse=True)
+
+    def _get_topology_groups(self, include_root: bool, exact: bool) -> List[List[int]]:
+        """Return [[idx, count], ...] of the first tree of each unique
+        topology and its number of trees, in order of first occurrence.
+
+        Trees are grouped by topology hash, and if exact, each tree
+        with a hash already seen is compared by its bipartitions to the
+        first tree of each topology with the same hash.
+        """
+        # {hash: [[idx, count], ...]} with one entry per topology.
+        buckets = {}
+        groups = []
+        for idx, tree in enumerate(self):
+            hashed = tree.get_topology_hash(include_root=include_root)
+            bucket = buckets.get(hashed)
+            if bucket is None:
+                buckets[hashed] = [[idx, 1]]
+                groups.append(buckets[hashed][0])
+                continue
+            if not exact:
+                bucket[0][1] += 1
+                continue
+
+            # compare to the first tree of each topology with this hash
+            splits = _get_topology_splits(tree, include_root)
+            for entry in bucket:
+                if _get_topology_splits(self.treelist[entry[0]], include_root) == splits:
+                    entry[1] += 1
+                    break
             else:
-                trees_dict[hashed] = [tree, 1]
-        # sort trees and return as a List of Tuples
-        return sorted(trees_dict.values(), key=lambda x: x[1], reverse=True)
+                bucket.append([idx, 1])
+                groups.append(bucket[-1])
+        return groups
+
+    def topology_counts(self, include_root: bool = False, exact: bool = True) -> pd.Series:
+        """Return a Series with the number of trees of each topology.
+
+        The index is the index of the first tree in the treelist with
+        each topology, and values are the number of trees with that
+        topology, sorted from most to least common. Trees are grouped
+        the same as in `get_unique_topologies`.
 
-    def copy(self):
-        """Return a deepcopy of the MultiTree."""
-        return deepcopy(self)
+        Parameters
+        ----------
+        include_root:
+            If False then unrooted topologies are counted, else the
+            different rootings of a tree are counted separately.
+        exact:
+            If True (default) trees with the same topology hash are
+            also compared by their bipartitions, such that trees are
+            never grouped by a (highly unlikely) hash collision.
+
+        Examples
+        --------
+        >>> mtree = toytree.mtree(
+        >>>     [toytree.rtree.rtree(6) for i in range(100)])
+        >>> counts = mtree.topology_counts()
+        >>> most_common_tree = mtree[counts.index[0]]
+        """
+        groups = self._get_topology_groups(include_root, exact)
+        groups.sort(key=lambda x: (-x[1], x[0]))
+        return pd.Series(
+            [i[1] for i in groups],
+            index=pd.Index([i[0] for i in groups], name="tree"),
+            name="count",
+            dtype=np.int64,
+        )
+
+    def copy(self, deep: bool = False) -> MultiTree:
+        """Return a copy of the MultiTree.
+
+        Each ToyTree is copied using `ToyTree.copy`, see its docstring
+        for a description of the `deep` argument.
+        """
+        mtree = MultiTree.__new__(MultiTree)
+        for key, value in self.__dict__.items():
+            if key != "treelist":
+                setattr(mtree, key, deepcopy(value))
+        mtree.treelist = [i.copy(deep=deep) for i in self.treelist]
+        return mtree
 
     # todo: use wrap
     def write(
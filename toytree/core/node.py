@@ -34,10 +34,11 @@ References
 
 
 from __future__ import annotations
-from typing import List, Optional, Union, Iterator, Tuple  # Set, Any
+from typing import List, Optional, Union, Iterator, Tuple, Dict, Any  # Set
 from functools import total_ordering
 from copy import deepcopy
 from collections import deque
+from types import MappingProxyType
 
 from loguru import logger
 import numpy as np
@@ -107,6 +108,13 @@ class Node:
     >>> # but cannot be modified on Nodes (they are immutable)
     >>> node.dist = 10  # raises a TreeNodeError
     """
+    __slots__ = (
+        "_name", "_dist", "_support", "_children",
+        "_up", "_idx", "_height", "_x", "_features",
+    )
+    """: core attributes are stored in slots, and user features are
+    stored in a dict in the _features slot that is only created when
+    a feature is first set (see `__setattr__`)."""
 
     def __init__(self, name: str = "", dist: float = 0.0, support: float = np.nan):
         self._name = str(name)
@@ -127,6 +135,44 @@ class Node:
         """: height of this Node above the connected Node farthest from root."""
         self._x: float = 0.0
         """: private attribute updated during drawing as x-coordinate."""
+        self._features: Optional[Dict[str, Any]] = None
+        """: dict of user features, or None if no features are set."""
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        """Set a core attribute, or else store a user feature.
+
+        Slots and properties (e.g., name, support) are set normally.
+        Any other attribute is a user feature stored in a dict that is
+        created when the first feature is set on this Node.
+        """
+        if key in _NODE_ATTRS:
+            if key == "_dist":
+                DIST_VERSION[0] += 1
+            _set_attribute(self, key, value)
+        elif self._features is None:
+            _set_attribute(self, "_features", {key: value})
+        else:
+            self._features[key] = value
+
+    def __getattr__(self, key: str) -> Any:
+        """Return a user feature. Only called if no attribute exists."""
+        # _features is unset on Nodes created without __init__.
+        if key == "_features":
+            return None
+        features = self._features
+        if features is not None and key in features:
+            return features[key]
+        raise AttributeError(f"'Node' object has no attribute '{key}'")
+
+    def __delattr__(self, key: str) -> None:
+        """Delete a user feature, or a core attribute."""
+        features = self._features
+        if features is not None and key in features:
+            del features[key]
+            if not features:
+                _set_attribute(self, "_features", None)
+        else:
+            object.__delattr__(self, key)
 
     @property
     def name(self) -> str:
@@ -346,6 +392,23 @@ class Node:
     # These funcs are primarily for internal/developer use.
     #####################################################
 
+    def _get_features(self) -> Dict[str, Any]:
+        """Return a dict of the user features assigned to this Node.
+
+        The returned dict should not be modified. It is empty if no
+        features have been set on this Node.
+        """
+        features = self._features
+        return _NO_FEATURES if features is None else features
+
+    def _set_features(self, features: Dict[str, Any]) -> None:
+        """Add user features to this Node from a dict."""
+        if features:
+            if self._features is None:
+                _set_attribute(self, "_features", dict(features))
+            else:
+                self._features.update(features)
+
     def _add_child(self, node: Node) -> None:
         """Connect a Node by adding it as a child to this one.
 
@@ -887,6 +950,61 @@ class Node:
         print(f"\n{tree_lines}")
 
 
+# names set directly by Node.__setattr__ (slots and properties), and
+# the setter it uses for them, which skips the override.
+_NODE_ATTRS = frozenset(
+    [i for i in Node.__slots__]
+    + [i for i, j in vars(Node).items() if isinstance(j, property)]
+)
+_set_attribute = object.__setattr__
+_NO_FEATURES = MappingProxyType({})
+
+# counter of edits to Node dists, incremented by Node.__setattr__, for
+# invalidating cached structures that depend on edge lengths, since
+# dists can be changed without a topology update.
+DIST_VERSION = [0]
+
+# setters of slot descriptors, which also skip the override, for
+# loops that set attributes of every Node (e.g., ToyTree._update).
+_set_up = Node._up.__set__
+_set_idx = Node._idx.__set__
+_set_height = Node._height.__set__
+_set_x = Node._x.__set__
+_set_name = Node._name.__set__
+_set_dist = Node._dist.__set__
+_set_support = Node._support.__set__
+_set_children = Node._children.__set__
+
+
+def _new_node(
+    name: str,
+    dist: float,
+    support: float,
+    idx: int,
+    height: float,
+    x: float,
+    children: Tuple[Node, ...],
+) -> Node:
+    """Return a Node with cached attributes set, skipping __init__.
+
+    The children are connected to the new Node as its descendants.
+    This is used to rebuild a Node graph in idx order, e.g., when
+    copying a tree or building one from TreeArrays.
+    """
+    node = Node.__new__(Node)
+    _set_name(node, name)
+    _set_dist(node, dist)
+    _set_support(node, support)
+    _set_up(node, None)
+    _set_idx(node, idx)
+    _set_height(node, height)
+    _set_x(node, x)
+    _set_children(node, children)
+    for child in children:
+        _set_up(child, node)
+    return node
+
+
 if __name__ == "__main__":
 
     nodes = {i: Node(name=i) for i in range(20)}
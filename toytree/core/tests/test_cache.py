@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""unittest tests for the per-tree cache of derived structures.
+
+"""
+
+import unittest
+import toytree
+from toytree.core.cache import (
+    CACHE_HITS, CACHE_MISSES, MAX_ENTRIES_PER_STRUCTURE, get_cache_stats, reset_cache_stats)
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tree = toytree.rtree.unittree(12, seed=123)
+        reset_cache_stats()
+
+    def test_hits_on_repeat_calls(self):
+        """Repeated calls on an unchanged tree return cached values."""
+        tid = self.tree.get_topology_id()
+        self.assertEqual(CACHE_MISSES["topology_id"], 1)
+        self.assertEqual(tid, self.tree.get_topology_id())
+        self.assertEqual(CACHE_HITS["topology_id"], 1)
+        stats = get_cache_stats()
+        self.assertEqual(stats.loc["topology_id", "hits"], 1)
+
+    def test_invalidated_by_topology_change(self):
+        """Modifying a tree inplace recomputes cached values."""
+        tid = self.tree.get_topology_id(include_root=True)
+        version = self.tree._topology_version
+        self.tree.root(self.tree[0], inplace=True)
+        self.assertGreater(self.tree._topology_version, version)
+        self.assertNotEqual(tid, self.tree.get_topology_id(include_root=True))
+        self.assertEqual(CACHE_HITS["topology_id"], 0)
+
+    def test_invalidated_by_renaming_tips(self):
+        """Renaming tips changes bipartitions and topology ids."""
+        bips = list(self.tree.iter_bipartitions())
+        tid = self.tree.get_topology_id()
+        self.tree[0].name, self.tree[5].name = self.tree[5].name, self.tree[0].name
+        self.assertNotEqual(bips, list(self.tree.iter_bipartitions()))
+        self.assertNotEqual(tid, self.tree.get_topology_id())
+
+    def test_stale_entries_are_removed(self):
+        """Entries of old versions or old tip names do not accumulate."""
+        self.tree.get_topology_id()
+        self.tree.get_topology_hash()
+        self.tree.root(self.tree[0], inplace=True)
+        self.tree.get_topology_id()
+        versions = set(i[0] for i in self.tree._cache.values())
+        self.assertEqual(versions, {self.tree._topology_version})
+        self.assertNotIn("topology_hash", [i[0] for i in self.tree._cache])
+        for idx in range(3 * MAX_ENTRIES_PER_STRUCTURE):
+            self.tree[0].name = f"x{idx}"
+            self.tree.get_topology_id()
+        names = [i[0] for i in self.tree._cache]
+        self.assertEqual(names.count("topology_id"), MAX_ENTRIES_PER_STRUCTURE)
+        self.tree.get_topology_id()
+        self.assertEqual(CACHE_HITS["topology_id"], 1)
+
+    def test_copy_has_empty_cache(self):
+        """A copied tree does not share the cache of the original."""
+        self.tree.get_topology_id()
+        ctree = self.tree.copy()
+        self.assertEqual(ctree._cache, {})
+        ctree[0].name = "x"
+        self.assertNotEqual(ctree.get_topology_id(), self.tree.get_topology_id())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""Test copying ToyTree and MultiTree objects.
+
+"""
+
+import unittest
+import numpy as np
+import toytree
+
+
+class TestCopy(unittest.TestCase):
+    def setUp(self):
+        self.tree = toytree.rtree.unittree(20, seed=123)
+        self.tree.set_node_data("trait", {i: [i] for i in range(5)}, inplace=True)
+        self.tree.style.edge_colors = "red"
+
+    def test_copy_same_as_original(self):
+        """Copied tree has the same Nodes, data, and cached attrs."""
+        ctree = self.tree.copy()
+        self.assertEqual(ctree.write(), self.tree.write())
+        self.assertEqual(ctree.features, self.tree.features)
+        self.assertEqual((ctree.nnodes, ctree.ntips), (self.tree.nnodes, self.tree.ntips))
+        for node, cnode in zip(self.tree, ctree):
+            self.assertIsNot(node, cnode)
+            self.assertEqual(
+                (node._idx, node._height, node._x, node.name),
+                (cnode._idx, cnode._height, cnode._x, cnode.name))
+            self.assertEqual(
+                [i._idx for i in node.children], [i._idx for i in cnode.children])
+        self.assertTrue(ctree.get_node_data().equals(self.tree.get_node_data()))
+
+    def test_copy_is_independent(self):
+        """Modifying a copied tree does not modify the original."""
+        ctree = self.tree.copy()
+        ctree.style.edge_colors = "blue"
+        ctree.mod.drop_tips(0, inplace=True)
+        self.assertEqual(ctree.mod._tree, ctree)
+        self.assertEqual(self.tree.style.edge_colors, "red")
+        self.assertEqual(self.tree.ntips, 20)
+        self.assertEqual(ctree.ntips, 19)
+
+    def test_copy_shallow_and_deep_features(self):
+        """Feature values are shared unless deep=True."""
+        self.assertIs(self.tree.copy()[0].trait, self.tree[0].trait)
+        ctree = self.tree.copy(deep=True)
+        self.assertIsNot(ctree[0].trait, self.tree[0].trait)
+        self.assertEqual(ctree[0].trait, self.tree[0].trait)
+
+    def test_copy_deep_tree(self):
+        """Copy does not recurse, and so works on very deep trees."""
+        tree = toytree.rtree.imbtree(5000)
+        ctree = tree.copy()
+        self.assertEqual(ctree.treenode.height, tree.treenode.height)
+        self.assertTrue(np.allclose(
+            ctree.get_node_data("height"), tree.get_node_data("height")))
+
+    def test_multitree_copy(self):
+        """MultiTree copy copies each tree."""
+        mtree = toytree.mtree([self.tree, self.tree])
+        cmtree = mtree.copy()
+        self.assertEqual(cmtree.write(), mtree.write())
+        self.assertIsNot(cmtree[0], mtree[0])
+        self.assertIsNot(cmtree[0].treenode, mtree[0].treenode)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
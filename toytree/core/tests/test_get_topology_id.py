@@ -5,6 +5,7 @@
 """
 
 import unittest
+from unittest import mock
 import toytree
 
 
@@ -42,5 +43,64 @@ class TestGetTopologyID(unittest.TestCase):
                 self.assertEqual(tid, rtree.get_topology_id())
 
 
+class TestGetTopologyHash(unittest.TestCase):
+    def setUp(self):
+        self.trees = [toytree.rtree.rtree(ntips=12, seed=i) for i in range(20)]
+
+    def test_same_despite_rooting_and_rotation(self):
+        """Topology hash is unaffected by rooting or rotating Nodes."""
+        for tree in self.trees[:3]:
+            thash = tree.get_topology_hash()
+            self.assertEqual(thash, tree.unroot().get_topology_hash())
+            for node in tree[:-1]:
+                self.assertEqual(thash, tree.root(node).get_topology_hash())
+                self.assertEqual(thash, tree.mod.rotate_node(node).get_topology_hash())
+
+    def test_diff_when_rooting(self):
+        """include_root=True distinguishes rootings, as topology_id."""
+        tree = self.trees[0]
+        thash = tree.get_topology_hash(include_root=True)
+        for node in tree[:-1]:
+            rtree = tree.root(node)
+            same = rtree.get_topology_id(include_root=True) == tree.get_topology_id(include_root=True)
+            self.assertEqual(same, thash == rtree.get_topology_hash(include_root=True))
+
+    def test_unique_same_as_topology_id(self):
+        """Hashes group trees the same as topology ids."""
+        trees = self.trees + [i.root(3) for i in self.trees[:5]]
+        for include_root in (False, True):
+            ids = [i.get_topology_id(include_root=include_root) for i in trees]
+            hashes = [i.get_topology_hash(include_root=include_root) for i in trees]
+            self.assertEqual(len(set(ids)), len(set(hashes)))
+            self.assertEqual(len(set(zip(ids, hashes))), len(set(ids)))
+
+    def test_multitree_topology_counts(self):
+        """topology_counts agrees with get_unique_topologies."""
+        trees = [self.trees[i % 4].root(i % 7) for i in range(30)]
+        mtree = toytree.mtree(trees)
+        counts = mtree.topology_counts()
+        self.assertEqual(counts.sum(), 30)
+        self.assertEqual(counts.tolist(), [i[1] for i in mtree.get_unique_topologies(exact=True)])
+        for idx in counts.index:
+            self.assertEqual(mtree[idx].get_topology_id(), trees[idx].get_topology_id())
+        rooted_ids = {i.get_topology_id(include_root=True) for i in trees}
+        self.assertEqual(len(mtree.topology_counts(include_root=True)), len(rooted_ids))
+
+    def test_multitree_exact_on_hash_collision(self):
+        """Trees with the same hash are split by exact comparison."""
+        trees = [self.trees[i % 2].root(i % 3) for i in range(12)]
+        mtree = toytree.mtree(trees)
+        collide = lambda self, feature="name", include_root=False: 0
+        with mock.patch.object(toytree.ToyTree, "get_topology_hash", collide):
+            self.assertEqual(len(mtree.get_unique_topologies(exact=False)), 1)
+            self.assertEqual(mtree.topology_counts(exact=False).tolist(), [12])
+            self.assertEqual(mtree.topology_counts().to_dict(), {0: 6, 1: 6})
+            unique = mtree.get_unique_topologies()
+            self.assertFalse(mtree.all_tree_topologies_same())
+            self.assertTrue(toytree.mtree(trees[::2]).all_tree_topologies_same())
+        self.assertEqual([i[1] for i in unique], [6, 6])
+        self.assertEqual(unique, mtree.get_unique_topologies())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Test MRCA queries using the cached LCAIndex of a ToyTree.
+
+"""
+
+import unittest
+import numpy as np
+import toytree
+
+
+def get_mrca_by_ancestor_sets(*nodes):
+    """Return MRCA Node found by intersecting sets of ancestors."""
+    return min(set.intersection(*(
+        set(i.iter_ancestors(include_self=True)) for i in nodes)))
+
+
+class TestLCAIndex(unittest.TestCase):
+    def setUp(self):
+        self.trees = [
+            toytree.rtree.rtree(40, seed=123),
+            toytree.rtree.imbtree(30),
+            toytree.rtree.unittree(30, seed=123).unroot(),
+            toytree.tree("((a,b,c),(d,(e,f,g)),h,(i,j));"),
+        ]
+        self.rng = np.random.default_rng(123)
+
+    def test_get_mrca_idxs(self):
+        """Vectorized MRCA queries match MRCAs from ancestor sets."""
+        for tree in self.trees:
+            pairs = self.rng.integers(0, tree.nnodes, size=(300, 2))
+            mrcas = tree.get_mrca_idxs(pairs)
+            for (idx0, idx1), mrca in zip(pairs, mrcas):
+                node = get_mrca_by_ancestor_sets(tree[idx0], tree[idx1])
+                self.assertEqual(mrca, node.idx)
+
+    def test_get_mrca_node(self):
+        """MRCA of many Nodes matches MRCA from ancestor sets."""
+        for tree in self.trees:
+            for _ in range(100):
+                size = self.rng.integers(2, 6)
+                nodes = tree[self.rng.choice(tree.nnodes, size, replace=False)]
+                mrca = get_mrca_by_ancestor_sets(*nodes)
+                self.assertIs(tree.get_mrca_node(*nodes), mrca)
+
+    def test_is_monophyletic(self):
+        """Monophyly from tip ranges matches checking all leaves."""
+        tree = self.trees[0]
+        for _ in range(200):
+            size = self.rng.integers(1, 5)
+            nodes = tree[self.rng.choice(tree.ntips, size, replace=False)]
+            mrca = get_mrca_by_ancestor_sets(*nodes)
+            expected = all(i in nodes for i in mrca.iter_leaves())
+            self.assertEqual(tree.is_monophyletic(*nodes), expected)
+
+    def test_index_reset_by_update(self):
+        """Cached index is rebuilt after the tree is modified."""
+        tree = self.trees[0].copy()
+        tree.get_mrca_node("r0", "r1")
+        lca = tree._get_lca_index()
+        tree.root("r0", inplace=True)
+        self.assertIsNot(tree._get_lca_index(), lca)
+        nodes = tree.get_nodes("r0", "r1")
+        self.assertIs(tree.get_mrca_node(*nodes), get_mrca_by_ancestor_sets(*nodes))
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -135,6 +135,31 @@ class TestToyTreeNodeMethods(unittest.TestCase):
             sum(1 for i in node.iter_ancestors()),
             sum(1 for i in dnode.iter_ancestors()))
 
+    def test_node_features_store(self):
+        """User features are stored apart from slotted core attributes."""
+        node = toytree.Node("A")
+        self.assertEqual(node._get_features(), {})
+        node.color = "red"
+        self.assertEqual(node._get_features(), {"color": "red"})
+        self.assertEqual(node.copy().color, "red")
+        with self.assertRaises(AttributeError):
+            toytree.Node("B").color
+
+        # reading features of a tree does not add features to Nodes
+        tree = self.tree1.copy()
+        tree[0].color = "red"
+        self.assertEqual(tree.features[-1], "color")
+        self.assertEqual(tree[1]._get_features(), {})
+        self.assertEqual(tree.copy()[0].color, "red")
+
+        # Nodes have no __dict__, and reading features is side-effect free
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIsNone(tree[1]._features)
+        del node.color
+        self.assertIsNone(node._features)
+        with self.assertRaises(AttributeError):
+            node.color
+
     def test_node_method_detach(self):
         """detach should ..."""
         nodeA = toytree.Node("A")
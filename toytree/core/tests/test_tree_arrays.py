@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""Test conversion of ToyTrees to and from TreeArrays.
+
+"""
+
+import pickle
+import unittest
+import numpy as np
+import toytree
+from toytree.core.arrays import TreeArrays
+from toytree.utils import ToytreeError
+
+
+class TestTreeArrays(unittest.TestCase):
+    def setUp(self):
+        self.trees = [
+            toytree.rtree.bdtree(50, seed=123),
+            toytree.rtree.imbtree(20),
+            toytree.tree("((a:1,b:2)90:1,(c:3,d:1,e:2)80:1,f:4);"),
+        ]
+
+    def test_round_trip(self):
+        """Trees converted to arrays and back are unchanged."""
+        for tree in self.trees:
+            arrs = tree.to_arrays()
+            self.assertEqual(toytree.ToyTree.from_arrays(arrs).write(), tree.write())
+
+    def test_arrays(self):
+        """Arrays match the Node attributes of the tree."""
+        for tree in self.trees:
+            arrs = tree.to_arrays()
+            self.assertEqual(arrs.ntips, tree.ntips)
+            self.assertEqual(arrs.nnodes, tree.nnodes)
+            self.assertEqual(arrs.get_tip_labels().tolist(), tree.get_tip_labels())
+            self.assertTrue(np.allclose(arrs.height, tree.get_node_data("height")))
+            for node in tree:
+                children = [i.idx for i in node.children]
+                self.assertEqual(arrs.get_children(node.idx).tolist(), children)
+
+    def test_mrca(self):
+        """MRCA idxs match those from ToyTree.get_mrca_node."""
+        tree = self.trees[0]
+        arrs = tree.to_arrays()
+        rng = np.random.default_rng(123)
+        pairs = rng.integers(0, tree.nnodes, size=(200, 2))
+        mrcas = arrs.get_mrca_idxs(pairs)
+        for (idx0, idx1), mrca in zip(pairs, mrcas):
+            expected = tree.get_mrca_node(int(idx0), int(idx1)).idx
+            self.assertEqual(mrca, expected)
+            self.assertEqual(arrs.get_mrca_idx(idx0, idx1), expected)
+        self.assertEqual(
+            arrs.get_mrca_idx(0, 1, 2, 3), tree.get_mrca_node(0, 1, 2, 3).idx)
+
+    def test_node_distance(self):
+        """Node distances match those from toytree.distance."""
+        for tree in self.trees:
+            arrs = tree.to_arrays()
+            pairs = [(i, j) for i in range(tree.nnodes) for j in range(i, tree.nnodes, 7)]
+            dists = arrs.get_node_distances(pairs)
+            for (idx0, idx1), dist in zip(pairs, dists):
+                expected = tree.distance.get_node_distance(idx0, idx1)
+                self.assertAlmostEqual(dist, expected)
+                self.assertAlmostEqual(arrs.get_node_distance(idx0, idx1), expected)
+
+    def test_cached(self):
+        """Derived arrays of a TreeArrays are computed once."""
+        tree = self.trees[0].copy()
+        arrs = tree.to_arrays()
+        self.assertIs(arrs.get_root_dists(), arrs.get_root_dists())
+        self.assertIs(arrs.get_depths(), arrs.get_depths())
+        self.assertEqual(arrs.get_depths()[0], len(tree[0].get_ancestors()))
+        arrs2 = pickle.loads(pickle.dumps(arrs))
+        self.assertTrue(np.array_equal(arrs2.get_root_dists(), arrs.get_root_dists()))
+
+    def test_not_stale_after_edits(self):
+        """Names, supports and dists edited after to_arrays are used."""
+        tree = self.trees[0].copy()
+        tree.to_arrays()
+        tree.distance.get_node_distance(0, 1)
+        tree.set_node_data("name", {1: "YYY"}, inplace=True)
+        tree.set_node_data("support", {tree.ntips: 0.5}, inplace=True)
+        tree[0].name = "x"
+        arrs = tree.to_arrays()
+        self.assertEqual(arrs.names[0], "x")
+        self.assertEqual(arrs.names[1], "YYY")
+        self.assertEqual(arrs.support[tree.ntips], 0.5)
+
+        # dists edited with or without an update to the tree
+        expected = tree.distance.get_node_distance(0, 1) + 20
+        tree.set_node_data("dist", {0: tree[0].dist + 10}, inplace=True)
+        tree[1]._dist += 10
+        self.assertEqual(tree.to_arrays().dist[1], tree[1].dist)
+        self.assertAlmostEqual(tree.distance.get_node_distance(0, 1), expected)
+        rdists = tree.distance.get_node_distance_matrix()[:, -1]
+        path = [tree[1]] + list(tree[1].get_ancestors())[:-1]
+        self.assertAlmostEqual(rdists[1], sum(i.dist for i in path))
+
+    def test_immutable(self):
+        """Arrays cannot be modified and invalid arrays are rejected."""
+        arrs = self.trees[0].to_arrays()
+        with self.assertRaises(ValueError):
+            arrs.dist[0] = 1.0
+        with self.assertRaises(AttributeError):
+            arrs.dist = np.zeros(arrs.nnodes)
+        with self.assertRaises(ToytreeError):
+            TreeArrays([-1, 0], [0, 1, 1], [1], [0, 0], [0, 0], [0, 0], ["", ""])
+        arrs2 = pickle.loads(pickle.dumps(arrs))
+        self.assertTrue(np.array_equal(arrs.parent, arrs2.parent))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
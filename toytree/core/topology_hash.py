@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""Fast 128-bit hashes of tree topologies.
+
+A topology hash is computed in a single postorder traversal of a tree
+and is used to quickly identify unique topologies among large sets of
+trees (e.g., `MultiTree.get_unique_topologies`). Like
+`ToyTree.get_topology_id` the hash does not depend on the rotation of
+Nodes, and by default also does not depend on rooting.
+
+Each tip label is hashed to a 128-bit int. The tips in a clade are
+combined by summing their hashes modulo 2^128, which is commutative,
+such that the clade hash does not depend on the order of children.
+
+- include_root=False: each non-trivial bipartition is represented by
+  the side that does not contain a reference tip (the tip with the
+  lowest label hash), and the tree hash combines a mix of every
+  bipartition hash. The same unrooted tree thus has the same hash
+  regardless of where, or if, it is rooted.
+- include_root=True: the hash of each Node is a mix of the sum of its
+  children's hashes, and the tree hash is the hash of the root.
+
+Different topologies can in theory have the same hash, but with 128
+bits this is extremely unlikely. Functions that require certainty can
+compare trees with equal hashes exactly, e.g., by bipartitions.
+
+Examples
+--------
+>>> tree = toytree.rtree.unittree(10, seed=123)
+>>> tree.get_topology_hash()
+>>> # 199382052097612153366380113429302585121
+"""
+
+from typing import TypeVar, Any
+from functools import lru_cache
+from hashlib import blake2b
+
+ToyTree = TypeVar("ToyTree")
+
+__all__ = ["get_topology_hash"]
+
+MASK128 = (1 << 128) - 1
+MULT1 = 0x9E3779B97F4A7C15F39CC0605CEDC835
+MULT2 = 0xC2B2AE3D27D4EB4F165667B19E3779F9
+ROOT_CONST = 0x2545F4914F6CDD1D8B7E9D3A1F6C2B55
+
+
+@lru_cache(maxsize=2**16)
+def _hash_label(label: Any) -> int:
+    """Return a 128-bit hash of a tip label that is stable across
+    sessions (unlike the builtin `hash` of str)."""
+    return int.from_bytes(blake2b(str(label).encode(), digest_size=16).digest(), "little")
+
+
+def _mix(value: int) -> int:
+    """Return a 128-bit int mixed from a 128-bit int (xorshift-multiply)."""
+    value ^= value >> 67
+    value = (value * MULT1) & MASK128
+    value ^= value >> 61
+    value = (value * MULT2) & MASK128
+    value ^= value >> 67
+    return value
+
+
+def get_topology_hash(tree: ToyTree, feature: str = "name", include_root: bool = False) -> int:
+    """Return a 128-bit int hash of a tree topology.
+
+    See the module docstring for details.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree to hash.
+    feature: str
+        The feature used to represent tip Nodes (default='name').
+    include_root: bool
+        If True the root position of rooted trees affects the hash.
+    """
+    nodes = tree._idx_dict
+    ntips = tree.ntips
+    values = [_hash_label(getattr(nodes[idx], feature)) for idx in range(ntips)]
+
+    # rooted: hash of nested clades.
+    if include_root and tree.is_rooted():
+        for idx in range(ntips, tree.nnodes):
+            value = ROOT_CONST
+            for child in nodes[idx]._children:
+                value += values[child._idx]
+            values.append(_mix(value & MASK128))
+        return values[-1]
+
+    # unrooted: hash of the set of non-trivial bipartitions.
+    ref = min(values)
+    has_ref = [i == ref for i in values]
+    for idx in range(ntips, tree.nnodes):
+        value = 0
+        ref_below = False
+        for child in nodes[idx]._children:
+            value += values[child._idx]
+            ref_below |= has_ref[child._idx]
+        values.append(value & MASK128)
+        has_ref.append(ref_below)
+    total = values[-1]
+
+    # do not include the root, or the one redundant split at the root
+    # of a rooted tree (same as in iter_bipartitions).
+    topnode = tree.nnodes - 2 if tree.is_rooted() else tree.nnodes - 1
+    hashed = _mix(total ^ ROOT_CONST)
+    for idx in range(ntips, topnode):
+        side = (total - values[idx]) & MASK128 if has_ref[idx] else values[idx]
+        hashed += _mix(side)
+    return _mix(hashed & MASK128)
@@ -13,11 +13,12 @@ Examples
 from __future__ import annotations
 from typing import (
     Sequence, Dict, List, Optional, Iterator, Any, Union, Tuple,
-    TypeVar, Set,  # Callable,
+    TypeVar, Set, Hashable,  # Callable,
 )
 import re
 from pathlib import Path
 from copy import deepcopy
+from functools import partial
 from hashlib import md5
 # from collections.abc import Sequence as SequenceType
 
@@ -28,8 +29,15 @@ from toyplot.coordinates import Cartesian
 
 # subpackage object APIs
 from toytree.core.apis import (
-    TreeModAPI, TreeDistanceAPI, TreeEnumAPI, PhyloCompAPI, AnnotationAPI)
-from toytree.core.node import Node
+    TreeModAPI, TreeDistanceAPI, TreeEnumAPI, PhyloCompAPI, AnnotationAPI,
+    SubPackageAPI)
+from toytree.core.node import (
+    Node, _new_node, _set_height, _set_x, _set_idx,
+)
+from toytree.core.arrays import TreeArrays
+from toytree.core.lca import LCAIndex
+from toytree.core.cache import get_cached, _get_tip_features_key
+from toytree.core.topology_hash import get_topology_hash
 from toytree.style import TreeStyle
 from toytree.drawing import draw_toytree, ToyTreeMark
 from toytree.utils.src.exceptions import (
@@ -93,14 +101,29 @@ class ToyTree:
     """
     def __init__(self, treenode: Node) -> ToyTree:
         """Initialize a ToyTree from a Node instance."""
+        self._init_attributes(treenode)
+
+        # update Node idxs, _idx_dict, nnodes, ntips, and Node heights
+        self._update()
 
+    def _init_attributes(self, treenode: Node) -> None:
+        """Set the attributes of a new ToyTree, before Node idxs are
+        assigned by `_update` (see `from_arrays` for an exception)."""
         self.treenode = treenode
-        self.nnodes: int = 0
-        self.ntips: int = 0
         self.style = TreeStyle()
         self.edge_features: Set = set(("dist", "support"))
-        self._idx_dict: Dict[int, Node] = {}
+        self._nnodes: int = 0
+        self._ntips: int = 0
+        self._idx_nodes: Dict[int, Node] = {}
         """Private dict mapping Node idx labels to Node instances."""
+        self._dirty: bool = False
+        """Private flag that topology changed and _update is deferred."""
+        self._nsessions: int = 0
+        """Private counter of open edit sessions deferring _update."""
+        self._topology_version: int = 0
+        """Private counter incremented each time the tree is updated."""
+        self._cache: Dict[Hashable, Tuple[int, Any]] = {}
+        """Private cache of derived structures (see `toytree.core.cache`)."""
 
         # toytree subpackage library API (mod, pcm, distance, layout)"""
         self.mod = TreeModAPI(self)
@@ -109,9 +132,6 @@ class ToyTree:
         self.enum = TreeEnumAPI(self)
         self.annotate = AnnotationAPI(self)
 
-        # update Node idxs, _idx_dict, nnodes, ntips, and Node heights
-        self._update()
-
     #####################################################
     # DUNDERS
     #####################################################
@@ -124,6 +144,16 @@ class ToyTree:
         """ToyTree is iterable, returning Nodes in idx order."""
         return (self[i] for i in range(self.nnodes))
 
+    def __contains__(self, node: Node) -> bool:
+        """Return True if a Node is connected to this tree's root."""
+        if not isinstance(node, Node):
+            return False
+        while node._up is not None:
+            if node not in node._up._children:
+                return False
+            node = node._up
+        return node is self.treenode
+
     # def __getitem__(self, idx: int) -> Node:
     #     """Nodes can be accessed by indexing or slicing by idx label"""
     #     # allow indexing by int, e.g., [3]
@@ -182,6 +212,31 @@ class ToyTree:
         """Short object representation for toytree.core.tree.ToyTree"""
         return f"<toytree.ToyTree at {hex(id(self))}>"
 
+    @property
+    def nnodes(self) -> int:
+        """Number of Nodes in the tree."""
+        if self._dirty:
+            self._update_full()
+        return self._nnodes
+
+    @property
+    def ntips(self) -> int:
+        """Number of tip Nodes in the tree."""
+        if self._dirty:
+            self._update_full()
+        return self._ntips
+
+    @property
+    def _idx_dict(self) -> Dict[int, Node]:
+        """Private dict mapping Node idx labels to Node instances.
+
+        If an update was deferred during an edit session Nodes are
+        relabeled here, the first time the tree is indexed.
+        """
+        if self._dirty:
+            self._update_full()
+        return self._idx_nodes
+
     # def __str__(self) -> str:
     #     """Return ascii representation of tree."""
     #     return "\n".join(self.treenode._get_ascii()[0])
@@ -254,7 +309,7 @@ class ToyTree:
         """
         feats = set()
         for node in self:
-            feats.update(node.__dict__)
+            feats.update(node._get_features())
         feats = (i for i in feats if not i.startswith("_"))
         defaults = ("idx", "name", "height", "dist", "support")
         return defaults + tuple(sorted(feats))
@@ -311,10 +366,106 @@ class ToyTree:
         heights = [i._height for i in self[:self.ntips]]
         return np.allclose(heights, 0., atol=tol)
 
-    def copy(self) -> ToyTree:
-        """Return a deepcopy of the ToyTree."""
-        return deepcopy(self)
-        # return ToyTree(self.treenode.copy())
+    def copy(self, deep: bool = False) -> ToyTree:
+        """Return a copy of the ToyTree.
+
+        The Node graph is rebuilt in idx order (children before their
+        parents), and the cached idx, height, and x values of Nodes
+        are copied rather than recomputed by a new traversal. This is
+        much faster than `copy.deepcopy`.
+
+        Parameters
+        ----------
+        deep: bool
+            If False (default) user features assigned to Nodes are
+            copied shallowly, such that mutable feature values (e.g.,
+            lists or arrays) are shared with the original tree. If True
+            feature values are also deepcopied.
+
+        Examples
+        --------
+        >>> tree = toytree.rtree.unittree(10)
+        >>> tree.set_node_data("traits", {0: [1, 2]}, inplace=True)
+        >>> ctree = tree.copy(deep=True)
+        """
+        new_nodes = []
+        for node in self._idx_dict.values():
+            new = _new_node(
+                node._name, node._dist, node._support, node._idx,
+                node._height, node._x,
+                tuple(new_nodes[i._idx] for i in node._children),
+            )
+            features = node._get_features()
+            if features:
+                new._set_features(deepcopy(features) if deep else features)
+            new_nodes.append(new)
+
+        # create tree without calling __init__, which would _update,
+        # and copy other attrs (e.g., style), or re-init subpackage APIs.
+        tree = ToyTree.__new__(ToyTree)
+        tree.treenode = new_nodes[-1]
+        tree._idx_nodes = dict(enumerate(new_nodes))
+        for key, value in self.__dict__.items():
+            if key in ("treenode", "_idx_nodes", "_cache"):
+                continue
+            if isinstance(value, SubPackageAPI):
+                setattr(tree, key, type(value)(tree))
+            else:
+                setattr(tree, key, deepcopy(value))
+        tree._nsessions = 0
+        tree._cache = {}
+        return tree
+
+    def to_arrays(self) -> TreeArrays:
+        """Return a compact immutable array-backed copy of the tree.
+
+        The TreeArrays object stores the parent idx, child idxs, dist,
+        support, height, and name of each Node as NumPy arrays indexed
+        by Node idx labels. Other Node features are not stored. It
+        supports fast read-only queries (tips, MRCA, heights, node
+        distances) and can be converted back to a ToyTree using
+        `ToyTree.from_arrays`.
+
+        Examples
+        --------
+        >>> tree = toytree.rtree.unittree(10)
+        >>> arrs = tree.to_arrays()
+        >>> arrs.get_mrca_idxs([[0, 1], [2, 8]])
+        """
+        # not cached, since names, dists and supports can be changed
+        # without updating the tree.
+        return TreeArrays.from_tree(self)
+
+    @staticmethod
+    def from_arrays(arrays: TreeArrays) -> ToyTree:
+        """Return a ToyTree built from a TreeArrays object in O(n) time.
+
+        Because the arrays are in Node idx order, with children before
+        their parents, the Node graph is built in a single pass, and
+        the idx and height of each Node are taken from the arrays
+        rather than recomputed by a traversal. See `ToyTree.to_arrays`.
+        """
+        names = arrays.names.tolist()
+        dists = arrays.dist.tolist()
+        supports = arrays.support.tolist()
+        heights = arrays.height.tolist()
+        offsets = arrays.child_offsets.tolist()
+        children = arrays.children.tolist()
+        nodes = []
+        for idx, name in enumerate(names):
+            kids = tuple(nodes[i] for i in children[offsets[idx]:offsets[idx + 1]])
+            x = sum(i._x for i in kids) / len(kids) if kids else idx
+            nodes.append(_new_node(
+                name, dists[idx], supports[idx], idx, heights[idx], x, kids))
+
+        # set attributes without calling _update (see `ToyTree.copy`)
+        tree = ToyTree.__new__(ToyTree)
+        tree._init_attributes(nodes[-1])
+        tree._idx_nodes = dict(enumerate(nodes))
+        tree._nnodes = len(nodes)
+        tree._ntips = arrays.ntips
+        tree._topology_version = 1
+        return tree
 
     #####################################################
     # TRAVERSAL
@@ -366,76 +517,251 @@ class ToyTree:
         for node in self.treenode.traverse(strategy=strategy):
             yield node
 
-    def _update(self) -> None:
-        """Traverse to set and cache Node idxorder and coordinates.
-
-        idxorder traversal is used to fill the ToyTree._idx_dict to
-        make Nodes easily indexable. While doing this it also calculates
-        Node heights and spacing (_x) and counts nnodes and ntips.
+    def _update(self, clade: Optional[Node] = None) -> None:
+        """Update cached Node idxorder and coordinates after an edit.
 
         If a topology has been modified then idx labels must be
         updated. This function is called by all internal `toytree.mod`
         functions which modify the topology (e.g., add_child, root,
         rotate, etc) but not if users modify Nodes adhoc. This is why
         Node objects are immutable.
+
+        If the tree is in an edit session (see `toytree.mod.edit_session`)
+        the update is deferred until the session closes, or until the
+        tree is next indexed. Otherwise, if the edit was local to a
+        clade below the root (e.g., a rotation, NNI or SPR within the
+        clade, or adding or removing Nodes in it) only the Nodes in
+        that clade are traversed and updated, and Nodes after it are
+        shifted to new idxs if its size changed (see `_update_clade`),
+        else all Nodes are updated by a full traversal (see
+        `_update_full`).
+
+        Parameters
+        ----------
+        clade: Node or None
+            The Node at the root of the clade that contains all Nodes
+            modified by an edit, if known.
         """
-        # clear depth counters used to get heights during traversal
-        depths = {self.treenode: 0.}
+        if self._nsessions:
+            self._dirty = True
+        elif clade is None or clade is self.treenode or not self._update_clade(clade):
+            self._update_full()
 
+    def _update_full(self) -> None:
+        """Traverse to set and cache Node idxorder and coordinates.
+
+        idxorder traversal is used to fill the ToyTree._idx_dict to
+        make Nodes easily indexable. While doing this it also calculates
+        Node heights and spacing (_x) and counts nnodes and ntips.
+        """
+        self._dirty = False
+        self._topology_version += 1
+
+        # depths from the root are stored alongside Nodes on the queue
+        # and stacks, rather than in a dict keyed by Node, since many
+        # Nodes can share the same hash (e.g., unnamed, before idx).
         # queue starts with root children, and stack starts with root.
-        queue = list(self.treenode._children)
+        queue = [(i, i._dist) for i in self.treenode._children]
 
         # start w/ root on stack, as either an inner or a tip.
         if queue:
-            inner_stack = [self.treenode]
+            inner_stack = [(self.treenode, 0.)]
             outer_stack = []
         else:
             inner_stack = []
-            outer_stack = [self.treenode]
+            outer_stack = [(self.treenode, 0.)]
 
         # traverse left then right subtrees to fill and pull from queue
+        max_depth = 0.
         while queue:
             # get node from start of queue to proceed levelorder
-            node = queue.pop()
+            node, depth = queue.pop()
 
-            # set depth of this node from the root
-            depths[node] = depths[node._up] + node._dist
-
-            # if leaf add to output stack and update farthest depth
-            if node.is_leaf():
-                outer_stack.append(node)
+            # add to inner or outer (leaf) stack and update farthest depth
+            if node._children:
+                inner_stack.append((node, depth))
             else:
-                inner_stack.append(node)
+                outer_stack.append((node, depth))
+                if depth > max_depth:
+                    max_depth = depth
 
             # add node's children to the queue (left child on end)
-            queue.extend(node._children)
+            queue.extend((i, depth + i._dist) for i in node._children)
 
-        # get max_depth from root, height is measured relative to this.
-        max_depth = max(depths.values())
+        # max_depth from root, height is measured relative to this.
+        # (internal Nodes can only be deeper than tips if dists < 0)
+        max_depth = max([max_depth] + [depth for _, depth in inner_stack])
 
         # clear idx cache and counter to be filled next
         idx = 0
-        self._idx_dict.clear()
+        self._idx_nodes.clear()
 
         # return nodes in reverse order they were added to stack
         while outer_stack:
-            node = outer_stack.pop()
-            node._height = max_depth - depths[node]
-            node._x = idx
-            node._idx = idx
-            self._idx_dict[idx] = node
+            node, depth = outer_stack.pop()
+            _set_height(node, max_depth - depth)
+            _set_x(node, idx)
+            _set_idx(node, idx)
+            self._idx_nodes[idx] = node
             idx += 1
-        self.ntips = idx
+        self._ntips = idx
 
         # return internal nodes, or just root if only a single Node.
         while inner_stack:
-            node = inner_stack.pop()
-            node._height = max_depth - depths[node]
-            node._x = sum(i._x for i in node._children) / len(node._children)
-            node._idx = idx
-            self._idx_dict[idx] = node
+            node, depth = inner_stack.pop()
+            _set_height(node, max_depth - depth)
+            _set_x(node, sum(i._x for i in node._children) / len(node._children))
+            _set_idx(node, idx)
+            self._idx_nodes[idx] = node
             idx += 1
-        self.nnodes = idx
+        self._nnodes = idx
+
+    def _update_clade(self, clade: Node) -> bool:
+        """Update idxs, heights and coordinates of Nodes in one clade.
+
+        Because tips are labeled from left to right, and internal
+        Nodes in postorder, the Nodes of any clade occupy a contiguous
+        range of tip idxs and a contiguous range of internal idxs. If
+        a clade is edited without changing its number of tips and
+        internal Nodes, then Nodes outside of it keep their idx and
+        height, and only the Nodes in the clade are relabeled within
+        the same ranges. The x coordinates of ancestors of the clade
+        are also updated. If Nodes were added to or removed from the
+        clade then Nodes after its ranges are also shifted to new idxs,
+        but their heights are kept, and no traversal is needed.
+
+        The clade must be a Node that was in the tree before the edit
+        and which contains all Nodes that were added, removed or moved.
+
+        This returns False without modifying any Nodes if the clade is
+        not suitable for a local update, such as if the clade was a tip
+        before the edit, or the change in edge lengths changes the
+        height of the tree, in which case a full update must be
+        performed.
+        """
+        if self._dirty or clade not in self:
+            return False
+
+        # get depth of clade from root, summed in the same order as in
+        # `_update_full`, such that heights are identical.
+        depth = 0.
+        for node in list(clade.iter_ancestors(include_self=True))[-2::-1]:
+            depth += node._dist
+
+        # get clade Nodes in idxorder with their depths from the root.
+        queue = [(clade, depth)]
+        tips = []
+        inner = []
+        while queue:
+            node, depth = queue.pop()
+            if node._children:
+                inner.append((node, depth))
+            else:
+                tips.append((node, depth))
+            queue.extend((i, depth + i._dist) for i in node._children)
+        tips.reverse()
+        inner.reverse()
+
+        # get the idx ranges the clade filled before the edit from the
+        # idxs of its Nodes that are still at their idx, extended over
+        # any adjacent Nodes that were removed from the tree.
+        nodes = tips + inner
+        members = set(id(i) for i, _ in nodes)
+        old_heights = []
+        old_idxs = ([], [])
+        for node, _ in nodes:
+            if self._idx_nodes.get(node._idx) is node:
+                old_idxs[node._idx >= self._ntips].append(node._idx)
+                old_heights.append(node._height)
+
+        ranges = []
+        for idxs, start, end in (
+            (old_idxs[0], 0, self._ntips),
+            (old_idxs[1], self._ntips, self._nnodes),
+        ):
+            if not idxs:
+                # a tip clade has no internal range.
+                if start == 0 or inner:
+                    return False
+                ranges.append(range(0))
+                continue
+            low, high = min(idxs), max(idxs) + 1
+            while low > start and self._idx_nodes[low - 1] not in self:
+                low -= 1
+            while high < end and self._idx_nodes[high] not in self:
+                high += 1
+            ranges.append(range(low, high))
+
+            # Nodes in the range must be in the clade or removed.
+            for idx in ranges[-1]:
+                old = self._idx_nodes[idx]
+                if id(old) not in members:
+                    if old in self:
+                        return False
+                    old_heights.append(old._height)
+
+        # check that max depth in the tree (height of root) is unchanged
+        max_depth = self.treenode._height
+        new_max = max(depth for _, depth in nodes)
+        if new_max > max_depth:
+            return False
+        if new_max < max_depth and min(old_heights, default=0.) <= 0:
+            return False
+
+        # a change in the number of Nodes is placed by the inner range.
+        dtips = len(tips) - len(ranges[0])
+        dinner = len(inner) - len(ranges[1])
+        if (dtips or dinner) and not ranges[1]:
+            return False
+
+        # set heights of clade Nodes.
+        self._topology_version += 1
+        for node, depth in nodes:
+            _set_height(node, max_depth - depth)
+
+        # relabel Nodes within the same ranges and set x.
+        if not (dtips or dinner):
+            for (node, _), idx in zip(tips, ranges[0]):
+                _set_x(node, idx)
+                _set_idx(node, idx)
+                self._idx_nodes[idx] = node
+            for (node, _), idx in zip(inner, ranges[1]):
+                _set_x(node, sum(i._x for i in node._children) / len(node._children))
+                _set_idx(node, idx)
+                self._idx_nodes[idx] = node
+
+            # update x coordinates of ancestors of the clade
+            node = clade._up
+            while node is not None:
+                _set_x(node, sum(i._x for i in node._children) / len(node._children))
+                node = node._up
+            return True
+
+        # or, insert the clade Nodes into the idx order and relabel
+        # all Nodes from the start of its tip range. Internal Nodes
+        # after the clade (its ancestors, or clades to its right) have
+        # their x coordinates updated.
+        order = list(self._idx_nodes.values())
+        order = (
+            order[:ranges[0].start]
+            + [i for i, _ in tips]
+            + order[ranges[0].stop:ranges[1].start]
+            + [i for i, _ in inner]
+            + order[ranges[1].stop:]
+        )
+        ntips = self._ntips + dtips
+        inner_stop = ranges[1].stop + dtips + dinner
+        for idx in range(ranges[0].start, len(order)):
+            node = order[idx]
+            _set_idx(node, idx)
+            if idx < ntips:
+                _set_x(node, idx)
+            elif idx >= inner_stop - len(inner):
+                _set_x(node, sum(i._x for i in node._children) / len(node._children))
+        self._idx_nodes = dict(enumerate(order))
+        self._ntips = ntips
+        self._nnodes = len(order)
+        return True
 
     #####################################################
     # TREE MODIFICATION FUNCTIONS (See ToyTree.mod)
@@ -548,8 +874,8 @@ class ToyTree:
 
         # match Node names as a group so we only need to perform one
         # tree traversal. Each query can return multiple regex hits.
-        matched = set(self._iter_nodes_by_name_match(*names))
-        nodes.update(matched)
+        if names:
+            nodes.update(self._iter_nodes_by_name_match(*names))
 
         # if not query then return all Nodes
         if not nodes:
@@ -596,11 +922,33 @@ class ToyTree:
         nodes = self.get_nodes(*query)
         if len(nodes) == 1:
             return nodes[0]
-        # include_self necessary to find ancestor between tip ^ parent
-        nset = set.intersection(*(
-            set(i.iter_ancestors(include_self=True)) for i in nodes)
-        )
-        return min(nset)
+        lca = self._get_lca_index()
+        return self._idx_nodes[lca.get_mrca_idx_of_many([i._idx for i in nodes])]
+
+    def get_mrca_idxs(self, pairs: np.ndarray) -> np.ndarray:
+        """Return an array of MRCA Node idxs for many pairs of Nodes.
+
+        This is a fast vectorized alternative to calling
+        `get_mrca_node` on many pairs of Nodes. Each query takes
+        constant time using an index of the tree topology that is
+        built on the first call and cached until the tree is modified.
+
+        Parameters
+        ----------
+        pairs: np.ndarray
+            An int array of shape (n, 2) of Node idx labels.
+
+        Examples
+        --------
+        >>> tree = toytree.rtree.unittree(10, seed=123)
+        >>> tree.get_mrca_idxs([[0, 1], [2, 8], [3, 15]])
+        >>> # array([11, 18, 16])
+        """
+        return self._get_lca_index().get_mrca_idxs(pairs)
+
+    def _get_lca_index(self) -> LCAIndex:
+        """Return the cached LCAIndex of this tree, building if needed."""
+        return get_cached(self, ("lca",), partial(LCAIndex, self))
 
     def get_ancestors(
         self,
@@ -746,10 +1094,10 @@ class ToyTree:
             raise ToytreeError("The tree must be rooted to test monophyly")
         nodes = self.get_nodes(*query)
         mrca = self.get_mrca_node(*nodes)
-        for node in mrca.iter_leaves():
-            if node not in nodes:
-                return False
-        return True
+        # tips descended from the mrca have a contiguous range of idxs
+        start, end = self._get_lca_index().tip_ranges[mrca._idx]
+        tips = set(i._idx for i in nodes if not i._children)
+        return len(tips) == end - start + 1
 
     ##################################################
     # TREE DISTANCE (ToyTree.distance)
@@ -817,6 +1165,42 @@ class ToyTree:
         --------
         - iter_bipartitions
         """
+        key = ("topology_id", feature, include_root, _get_tip_features_key(self, "name", feature))
+        return get_cached(self, key, partial(self._get_topology_id, feature, include_root))
+
+    def get_topology_hash(self, feature="name", include_root: bool = False) -> int:
+        """Return a 128-bit int hash representing this topology.
+
+        This is a faster alternative to `get_topology_id` that is
+        computed in a single traversal of the tree. Like the topology
+        id, the hash is not affected by the rotation of Nodes, and by
+        default is not affected by rooting. Different topologies are
+        extremely unlikely to have the same hash, but this is not
+        guaranteed. See `toytree.core.topology_hash` for details.
+
+        Parameters
+        ----------
+        feature: str
+            The feature used to represent tip Nodes (default='name').
+        include_root: bool
+            By default the root Node is excluded (if tree is rooted)
+            such that all unrooted trees with the same toplogy return
+            the same hash. To distinguish among differently rooted
+            versions of the same tree set `include_root=True`.
+
+        Examples
+        --------
+        >>> tree.get_topology_hash() # 199382052097612153366380113429302585121
+
+        See Also
+        --------
+        - get_topology_id
+        """
+        key = ("topology_hash", feature, include_root, _get_tip_features_key(self, feature))
+        return get_cached(self, key, partial(get_topology_hash, self, feature, include_root))
+
+    def _get_topology_id(self, feature: str, include_root: bool) -> str:
+        """Return the topology id, without caching (see get_topology_id)."""
         # bipartitions are ordered by edge idx order, and names within
         # bipartitions are consistently ordered by alphanumeric names.
         # so we sort so that trees with the same topology but rotated
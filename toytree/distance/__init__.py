@@ -37,3 +37,4 @@ Examples
 from toytree.distance._src.nodedist import *
 from toytree.distance._src.treedist import *
 from toytree.distance._src.quartet_dist import *
+from toytree.distance._src.tree_move_dists import *
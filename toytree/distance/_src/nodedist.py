@@ -6,13 +6,17 @@ These functions take a tree as input and use Node int idx labels
 to select Nodes.
 """
 
-from typing import TypeVar, Tuple, Union, Dict, Iterator
-import itertools
+from typing import TypeVar, Tuple, Union, Dict, Iterator, Optional
+from pathlib import Path
+from functools import partial
 import numpy as np
 import pandas as pd
 from loguru import logger
 from toytree import Node, ToyTree
 from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.core.cache import get_cached
+from toytree.core.node import DIST_VERSION
+from toytree.utils.src.arrays import get_output_array, iter_row_blocks
 # from toytree.utils import ToytreeError
 
 # type aliases
@@ -150,11 +154,140 @@ def get_node_distance(
     return dist
 
 
+def _get_root_dists(tree: ToyTree, topology_only: bool = False) -> np.ndarray:
+    """Return read-only array of the distance from the root to each
+    Node by idx.
+
+    These are cached on the tree until it is updated. Root dists are
+    also recomputed if the dist of any Node has been changed (see
+    `toytree.core.node.DIST_VERSION`), whereas depths only depend on
+    the topology.
+    """
+    if topology_only:
+        return get_cached(tree, ("depths",), partial(_get_root_dists_uncached, tree, True))
+    key = ("root_dists", DIST_VERSION[0])
+    return get_cached(tree, key, partial(_get_root_dists_uncached, tree, False))
+
+
+def _get_root_dists_uncached(tree: ToyTree, topology_only: bool) -> np.ndarray:
+    """Return read-only array of root dists (or depths) summed from
+    the root in reverse idx order (parents before children)."""
+    sums = [0] * tree.nnodes
+    for idx in range(tree.nnodes - 2, -1, -1):
+        node = tree._idx_dict[idx]
+        sums[idx] = sums[node._up._idx] + (1 if topology_only else node._dist)
+    arr = np.array(sums, dtype=np.int64 if topology_only else np.float64)
+    arr.setflags(write=False)
+    return arr
+
+
+def _get_internal_starts(tree: ToyTree) -> np.ndarray:
+    """Return array of the smallest internal Node idx in each clade.
+
+    Internal Nodes are labeled in postorder, so the internal Nodes of
+    a clade have contiguous idxs ending at the clade's own idx. For
+    tips (which have no internal Nodes) the array is unused.
+    """
+    starts = np.arange(tree.nnodes)
+    for idx in range(tree.ntips, tree.nnodes):
+        for child in tree[idx]._children:
+            if child._children:
+                starts[idx] = starts[child._idx]
+                break
+    return starts
+
+
+def _fill_mrca_root_dists(
+    tree: ToyTree,
+    arr: np.ndarray,
+    rdists: np.ndarray,
+    tips_only: bool = False,
+) -> None:
+    """Fill arr[i, j] with the root dist of the MRCA of Nodes i and j.
+
+    Tips descended from a Node have a contiguous range of idx labels,
+    as do internal Nodes, so the set of pairs whose MRCA is a given
+    Node can be written as a few rectangular blocks: each child clade
+    against its earlier sibling clades, and the Node against all of
+    its descendants. Every cell is written once, in O(nnodes) NumPy
+    slice assignments. If tips_only, arr has shape (ntips, ntips).
+    """
+    ntips = tree.ntips
+    tip_ranges = tree._get_lca_index().tip_ranges.tolist()
+    istarts = None if tips_only else _get_internal_starts(tree).tolist()
+    for idx in range(ntips, tree.nnodes):
+        node = tree[idx]
+        value = rdists[idx]
+        tstart, tend = tip_ranges[idx]
+        blocks = []
+        if not tips_only:
+            # the Node is the MRCA of itself and all descendants
+            istart = istarts[idx]
+            blocks.append((slice(idx, idx + 1), slice(tstart, tend + 1)))
+            blocks.append((slice(idx, idx + 1), slice(istart, idx + 1)))
+            icursor = istart
+
+        # each child clade vs. all earlier sibling clades
+        for cnum, child in enumerate(node._children):
+            ctstart, ctend = tip_ranges[child._idx]
+            cols = [slice(ctstart, ctend + 1)]
+            rows = [slice(tstart, ctstart)]
+            if not tips_only:
+                if child._children:
+                    cistart, icursor_next = istarts[child._idx], child._idx + 1
+                else:
+                    cistart, icursor_next = icursor, icursor
+                cols.append(slice(cistart, icursor_next))
+                rows.append(slice(istart, cistart))
+                icursor = icursor_next
+            if cnum:
+                blocks.extend((i, j) for i in rows for j in cols)
+
+        for rows, cols in blocks:
+            arr[rows, cols] = value
+            arr[cols, rows] = value
+
+    # tips are the MRCA of themselves
+    tips = np.arange(ntips)
+    arr[tips, tips] = rdists[:ntips]
+
+
+def _get_distance_matrix(
+    tree: ToyTree,
+    topology_only: bool,
+    tips_only: bool,
+    dtype: Optional[np.dtype],
+    memmap: Optional[Union[str, Path]],
+) -> np.ndarray:
+    """Return matrix of patristic distances among all Nodes or tips.
+
+    The distance between Nodes i and j is computed as
+    rdist[i] + rdist[j] - 2 * rdist[mrca(i, j)], by first filling
+    the matrix with the MRCA root dists and then transforming it in
+    place in blocks of rows.
+    """
+    rdists = _get_root_dists(tree, topology_only)
+    size = tree.ntips if tips_only else tree.nnodes
+    if dtype is None:
+        dtype = rdists.dtype
+    arr = get_output_array((size, size), dtype, memmap)
+    rdists_sub = rdists[:size].astype(arr.dtype)
+    _fill_mrca_root_dists(tree, arr, rdists, tips_only)
+    for rows in iter_row_blocks(size, size):
+        block = arr[rows]
+        block *= -2
+        block += rdists_sub[rows, None]
+        block += rdists_sub[None, :]
+    return arr
+
+
 @add_subpackage_method(TreeDistanceAPI)
 def get_node_distance_matrix(
     tree: ToyTree,
     topology_only: bool = False,
-    df: bool = False
+    df: bool = False,
+    dtype: Optional[np.dtype] = None,
+    memmap: Optional[Union[str, Path]] = None,
 ) -> Union[np.array, pd.DataFrame]:
     """Return pairwise distances between all Nodes in a ToyTree.
 
@@ -166,6 +299,14 @@ def get_node_distance_matrix(
         If True distances represent the number of edges between Nodes.
     df: bool
         If True a pandas.DataFrame is returned instead of np.ndarray.
+    dtype: np.dtype or None
+        dtype of the returned matrix. Default is float, or int if
+        topology_only=True. Use np.float32 to halve memory.
+    memmap: str, Path or None
+        Optional path to a .npy file to which the matrix is written
+        as a memory-mapped array, for trees too large to store the
+        matrix in memory. It can be re-opened later with
+        `np.load(path, mmap_mode="r")`.
 
     Returns
     -------
@@ -180,55 +321,13 @@ def get_node_distance_matrix(
     >>> tree = toytree.rtree.unittree(10, seed=123)
     >>> toytree.distance.get_node_distance_matrix(tree)
     """
-    dtype = int if topology_only else float
-
-    # postorder ordered
-    arr = np.zeros((tree.nnodes, tree.nnodes), dtype=dtype)
-
-    # store list of descendants indices for each node
-    clade_map = {}
-
-    # reorder
-    reorder = []
-
-    # traverse tree in postorder, but first visit all tips (idxorder).
-    for idx, node in enumerate(tree.traverse("postorder")):
-
-        # init clade list to store descendants of this node
-        clade_map[node] = [idx]
-
-        # store idxorder index for re-sorting later.
-        reorder.append(node.idx)
-
-        # build desc list from children desc lists
-        for child in node._children:
-
-            # store child's clade list to parent's clade list
-            clade = clade_map[child]
-            clade_map[node].extend(clade)
-
-            # set dist from child's clade members to parent
-            arr[clade, idx] = arr[clade, max(clade)] + (1 if topology_only else child._dist)
-
-        # set children clade's dists to each other
-        for ch0, ch1 in itertools.combinations(node._children, 2):
-            ch0 = clade_map[ch0]
-            ch1 = clade_map[ch1]
-            for c in ch0:
-                arr[c, ch1] = arr[c, idx] + arr[ch1, idx]
-
-    # mirror fill
-    arr[np.tril_indices_from(arr)] = arr.T[np.tril_indices_from(arr)]
-
-    # reorder into idx order
-    idxorder = [reorder.index(i) for i in range(tree.nnodes)]
+    arr = _get_distance_matrix(tree, topology_only, False, dtype, memmap)
 
     # optionally format as dataframe
     if not df:
-        return arr[idxorder][:, idxorder]
+        return arr
     index = tree.get_tip_labels() + [str(i.idx) for i in tree[tree.ntips:]]
-    return pd.DataFrame(
-        arr[idxorder][:, idxorder], columns=index, index=index)
+    return pd.DataFrame(arr, columns=index, index=index)
 
 
 @add_subpackage_method(TreeDistanceAPI)
@@ -269,10 +368,15 @@ def get_internal_node_distance_matrix(
 def get_tip_distance_matrix(
     tree: ToyTree,
     topology_only: bool = False,
-    df: bool = False
+    df: bool = False,
+    dtype: Optional[np.dtype] = None,
+    memmap: Optional[Union[str, Path]] = None,
 ) -> Union[np.array, pd.DataFrame]:
     """Return pairwise distances between tip Nodes in a ToyTree.
 
+    Only the (ntips, ntips) matrix is allocated, making this much
+    less memory intensive than slicing the full Node distance matrix.
+
     Parameters
     ----------
     tree: toytree.ToyTree
@@ -282,6 +386,12 @@ def get_tip_distance_matrix(
     df: bool
         If True a pandas.DataFrame is returned instead of np.array
         with str Node names as index and column names.
+    dtype: np.dtype or None
+        dtype of the returned matrix. Default is float, or int if
+        topology_only=True. Use np.float32 to halve memory.
+    memmap: str, Path or None
+        Optional path to a .npy file to which the matrix is written
+        as a memory-mapped array. See `get_node_distance_matrix`.
 
     Returns
     -------
@@ -295,10 +405,11 @@ def get_tip_distance_matrix(
     >>> tree = toytree.rtree.unittree(10, seed=123)
     >>> toytree.distance.get_tip_distance_matrix(tree)
     """
-    arr = get_node_distance_matrix(tree, topology_only=topology_only, df=df)
+    arr = _get_distance_matrix(tree, topology_only, True, dtype, memmap)
     if not df:
-        return arr[:tree.ntips, :tree.ntips]
-    return arr.iloc[:tree.ntips, :tree.ntips]
+        return arr
+    names = tree.get_tip_labels()
+    return pd.DataFrame(arr, columns=names, index=names)
 
 
 @add_subpackage_method(TreeDistanceAPI)
@@ -29,12 +29,14 @@ References
 - ...
 """
 
-from typing import Mapping
+from typing import Mapping, Tuple
+import math
 import itertools
 import pandas as pd
 import numpy as np
 from toytree.core import ToyTree
 from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.core.cache import get_cached, _get_tip_features_key
 import toytree
 
 
@@ -79,14 +81,172 @@ def get_quartet_comparison(tree1: ToyTree, tree2: ToyTree) -> Mapping[str, int]:
     """Return dict of quartet similarity/resolution data for two trees.
 
     This is used internally. Users should call `get_quartet_metrics`.
+    Quartets are counted without enumerating them, in O(n^2) time and
+    memory (see `_get_quartet_comparison_from_data`).
     """
     # require trees to share the same tips
     assert set(tree1.get_tip_labels()) == set(tree2.get_tip_labels())
+    data1 = _get_quartet_tree_data(tree1)
+    data2 = _get_quartet_tree_data(tree2)
+    return _get_quartet_comparison_from_data(data1, data2)
 
-    # get each quartet resolution array
-    arr1 = get_quartet_resolutions_table(tree1)
-    arr2 = get_quartet_resolutions_table(tree2)
 
+######################################################################
+# COUNT QUARTETS WITHOUT ENUMERATING THEM
+#
+# A quartet ab|cd is resolved in a tree if an edge separates {a, b}
+# from {c, d}. The edges that do so form a path, and the k - 1 Nodes
+# inside a path of k edges are exactly the Nodes at which {a, b} and
+# {c, d} are in two different components (subtrees). Thus for any
+# resolved quartet: #edges - #nodes = 1, and for unresolved quartets
+# both are 0. Each edge (+1), and each pair of components at a Node
+# (-1), is a "config" that splits tips into two sides (X, Y). The
+# number of quartets resolved in both trees, the same way (S) or
+# differently (D), is then a sum over all pairs of configs of the two
+# trees, of counts computed from the sizes of the intersections of
+# their sides: |X1 & X2|, |X1 & Y2|, |Y1 & X2|, |Y1 & Y2|. Every side
+# is either the clade of a Node or its complement, so intersection
+# sizes are computed from a (nnodes1, nnodes2) clade overlap matrix.
+######################################################################
+
+
+def _get_quartet_tree_data(tree: ToyTree) -> Tuple[np.ndarray, ...]:
+    """Return arrays used to count quartets shared with another tree.
+
+    Returns (ranks, sizes, tip_ranges, configs) where ranks are the
+    sorted order of tip names (by tip idx), sizes are the number of
+    tips below each Node, and configs is an int array of shape (n, 5)
+    of (Node idx, is complement, Node idx, is complement, sign) for
+    the two sides of every edge and every pair of Node components
+    with at least two tips on each side. This is cached on the tree.
+    """
+    key = ("quartet_tree_data", _get_tip_features_key(tree, "name"))
+    return get_cached(tree, key, lambda: _get_quartet_tree_data_uncached(tree))
+
+
+def _get_quartet_tree_data_uncached(tree: ToyTree) -> Tuple[np.ndarray, ...]:
+    ntips = tree.ntips
+    names = np.array(tree.get_tip_labels())
+    ranks = np.argsort(np.argsort(names))
+    tip_ranges = tree._get_lca_index().tip_ranges.astype(np.int64)
+    sizes = tip_ranges[:, 1] - tip_ranges[:, 0] + 1
+
+    configs = []
+    for idx in range(ntips, tree.nnodes):
+        node = tree[idx]
+        # the edge above this Node
+        if not node.is_root():
+            if sizes[idx] > 1 and ntips - sizes[idx] > 1:
+                configs.append((idx, 0, idx, 1, 1))
+        # pairs of components at this Node
+        comps = [(i._idx, 0) for i in node._children if sizes[i._idx] > 1]
+        if not node.is_root() and ntips - sizes[idx] > 1:
+            comps.append((idx, 1))
+        for side0, side1 in itertools.combinations(comps, 2):
+            configs.append(side0 + side1 + (-1,))
+    configs = np.array(configs, dtype=np.int64).reshape(-1, 5)
+    return ranks, sizes, tip_ranges, configs
+
+
+def _get_clade_overlaps(data1: Tuple, data2: Tuple) -> np.ndarray:
+    """Return matrix of the number of tips shared by each pair of clades.
+
+    Tips of a clade have contiguous idx labels, so the row of each
+    Node in tree1 is a difference of cumulative sums over tip rows.
+    """
+    ranks1, _, tip_ranges1, _ = data1
+    ranks2, _, tip_ranges2, _ = data2
+    ntips = ranks1.size
+
+    # tip idxs of tree2 as tip idxs of tree1
+    tips2_in_1 = np.argsort(ranks1)[ranks2]
+    cumsums = np.zeros((ntips + 1, tip_ranges2.shape[0]), dtype=np.int32)
+    for jdx, (start, end) in enumerate(tip_ranges2.tolist()):
+        cumsums[tips2_in_1[start:end + 1] + 1, jdx] = 1
+    np.cumsum(cumsums, axis=0, out=cumsums)
+    overlaps = cumsums[tip_ranges1[:, 1] + 1]
+    overlaps -= cumsums[tip_ranges1[:, 0]]
+    return overlaps
+
+
+def _get_side_sizes(
+    overlaps: np.ndarray, ntips: int, sizes1: np.ndarray, sizes2: np.ndarray,
+    idx1: np.ndarray, comp1: np.ndarray, idx2: np.ndarray, comp2: np.ndarray,
+) -> np.ndarray:
+    """Return number of tips shared by sides of configs (broadcast).
+
+    A side is the clade of a Node (comp=0) or its complement (comp=1).
+    """
+    shared = overlaps[idx1, idx2].astype(np.int64)
+    sign1 = 1 - 2 * comp1
+    sign2 = 1 - 2 * comp2
+    return (
+        sign1 * sign2 * shared
+        + comp2 * sign1 * sizes1[idx1]
+        + comp1 * sign2 * sizes2[idx2]
+        + comp1 * comp2 * ntips
+    )
+
+
+def _comb2(values: np.ndarray) -> np.ndarray:
+    return values * (values - 1) // 2
+
+
+def _get_quartet_comparison_from_data(
+    data1: Tuple, data2: Tuple, max_size: int = 2**20,
+) -> Mapping[str, int]:
+    """Return dict of quartet resolution data from `_get_quartet_tree_data`.
+
+    Counts are computed in blocks of configs of tree1 such that memory
+    is bounded by the (nnodes1, nnodes2) clade overlap matrix.
+    """
+    ntips = data1[0].size
+    sizes1, configs1 = data1[1], data1[3]
+    sizes2, configs2 = data2[1], data2[3]
+    overlaps = _get_clade_overlaps(data1, data2)
+
+    # number of quartets resolved in each tree
+    nres = []
+    for sizes, configs in ((sizes1, configs1), (sizes2, configs2)):
+        xsize = np.where(configs[:, 1], ntips - sizes[configs[:, 0]], sizes[configs[:, 0]])
+        ysize = np.where(configs[:, 3], ntips - sizes[configs[:, 2]], sizes[configs[:, 2]])
+        nres.append(int(np.sum(configs[:, 4] * _comb2(xsize) * _comb2(ysize))))
+
+    # number resolved in both trees the same (S) or differently (D)
+    same = diff = 0
+    x2, xc2, y2, yc2, sign2 = (configs2[:, i][None, :] for i in range(5))
+    step = max(1, max_size // max(1, configs2.shape[0]))
+    for start in range(0, configs1.shape[0], step):
+        x1, xc1, y1, yc1, sign1 = (configs1[start:start + step, i][:, None] for i in range(5))
+        args = (overlaps, ntips, sizes1, sizes2)
+        xx = _get_side_sizes(*args, x1, xc1, x2, xc2)
+        xy = _get_side_sizes(*args, x1, xc1, y2, yc2)
+        yx = _get_side_sizes(*args, y1, yc1, x2, xc2)
+        yy = _get_side_sizes(*args, y1, yc1, y2, yc2)
+        weight = sign1 * sign2
+        same += int(np.sum(weight * (_comb2(xx) * _comb2(yy) + _comb2(xy) * _comb2(yx))))
+        diff += int(np.sum(weight * xx * xy * yx * yy))
+
+    data = {}
+    data["Q"] = math.comb(ntips, 4)
+    data["S"] = same
+    data["D"] = diff
+    data["R1"] = nres[0] - same - diff
+    data["R2"] = nres[1] - same - diff
+    data["U"] = data["Q"] - nres[0] - nres[1] + same + diff
+    data["N"] = data["S"] + data["D"] + data["R1"] + data["R2"] + data["U"]
+    return data
+
+
+def _get_quartet_comparison_from_tables(
+    arr1: np.ndarray, arr2: np.ndarray,
+) -> Mapping[str, int]:
+    """Return dict of quartet resolution data for two resolution tables.
+
+    This enumerates all quartets (see `get_quartet_resolutions_table`)
+    and is only practical for small trees. It is kept as a reference
+    implementation for testing `get_quartet_comparison`.
+    """
     # stats dict
     data = {}
 
@@ -2,54 +2,501 @@
 
 """Tree distance measures based on tree moves (SPR and NNI).
 
-TODO.
+Computing the minimum number of nearest neighbor interchange (NNI) or
+subtree prune and regraft (SPR) moves that separate two trees is
+NP-hard, and so both measures here are approximations that are fast
+to compute for many pairs of trees. Both measure unrooted topologies,
+and require bifurcating trees that share the same tip names.
+
+- get_treedist_nni
+    Lower and upper bounds on the NNI distance (Li et al. 1996) from
+    the regions of splits in tree1 that are not in tree2.
+- get_treedist_spr
+    An upper bound on the SPR distance from a bounded beam search of
+    SPR moves that reduce the number of splits not in tree2.
 
 References
 ----------
-- 
+- Robinson DF (1971). “Comparison of labeled trees with valency
+  three.” Journal of Combinatorial Theory, Series B, 11(2), 105–119.
+- Li M, Tromp J, Zhang L (1996). "Some notes on the nearest neighbour
+  interchange distance." Lecture Notes in Computer Science 1090.
+- Allen BL, Steel M (2001). "Subtree transfer operations and their
+  induced metrics on evolutionary trees." Annals of Combinatorics 5.
 """
 
+from typing import Tuple, List, Dict, Sequence, Optional
+import math
+import numpy as np
+import pandas as pd
+from loguru import logger
+from toytree.core import ToyTree
+from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.utils import ToytreeError
+from toytree.distance._src.treedist import TIPS_IDENTICAL
+
+logger = logger.bind(name="toytree")
+
+__all__ = [
+    "get_treedist_nni",
+    "get_treedist_spr",
+]
+
+BIFURCATING = "tree move distances require bifurcating trees."
+
+# an SPR state is a tree stored as lists indexed by node id, where
+# leaves are ids 0..nleaves-1: (parent, children, root, leafbits).
+State = Tuple[List[Optional[int]], List[List[int]], int, List[int]]
+
+
+def _check_trees(tree1: ToyTree, tree2: ToyTree) -> List[str]:
+    """Return sorted tip labels shared by both trees, or raise."""
+    labels = sorted(tree1.get_tip_labels())
+    if labels != sorted(tree2.get_tip_labels()):
+        raise ToytreeError(TIPS_IDENTICAL)
+    for tree in (tree1, tree2):
+        for idx in range(tree.ntips, tree.nnodes - 1):
+            if len(tree._idx_dict[idx]._children) != 2:
+                raise ToytreeError(BIFURCATING)
+        if len(tree.treenode._children) not in (2, 3):
+            raise ToytreeError(BIFURCATING)
+    return labels
+
+
+def _get_nni_region_upper(nleaves: int) -> int:
+    """Return an upper bound on the NNI distance between two trees
+    with nleaves tips that share no splits (Li et al. 1996).
 
-def tree_dist_nni():
+    Each tree can be transformed into a caterpillar in nleaves - 3
+    moves, and two caterpillars can be reconciled by a merge sort in
+    nleaves * ceil(log2(nleaves)) moves. Two trees with four tips that
+    differ are always one move apart.
     """
+    if nleaves <= 4:
+        return max(0, nleaves - 3)
+    return nleaves * math.ceil(math.log2(nleaves)) + 2 * (nleaves - 3)
 
-    Use the approach of Li et al. (1996) to approximate the Nearest 
-    Neighbour Interchange distance (Robinson, 1971) between 
-    phylogenetic trees.
-
-    FROM TREEDIST:
-    https://cran.r-project.org/web/packages/TreeDist/TreeDist.pdf
-
-    In brief, this approximation algorithm works by identifying edges in one tree that do not match
-    edges in the second. Each of these edges must undergo at least one NNI operation in order to
-    reconcile the trees. Edges that match in both trees need never undergo an NNI operation, and divide
-    each tree into smaller regions. By ’cutting’ matched edges into two, a tree can be divided into a
-    number of regions that solely comprise unmatched edges.
-    These regions can be viewed as separate trees that need to be reconciled. One way to reconcile
-    these trees is to conduct a series of NNI operations that reduce a tree to a pectinate (caterpillar) tree,
-    then to conduct an analogue of the mergesort algorithm. This takes at most n log n + O(n) NNI
-    operations, and provides a loose upper bound on the NNI score. The maximum number of moves
-    for an n-leaf tree (OEIS A182136) can be calculated exactly for small trees (Fack et al. 2002); this
-    provides a tighter upper bound, but is unavailable for n > 12. NNIDiameter() reports the limits on
-    this bound.    
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_nni(tree1: ToyTree, tree2: ToyTree) -> pd.Series:
+    """Return lower and upper bounds on the NNI distance between trees.
+
+    The nearest neighbor interchange (NNI) distance is the minimum
+    number of NNI moves that transform one unrooted tree into another.
+    This uses the approach of Li et al. (1996): each edge in tree1
+    whose split is not in tree2 must undergo at least one NNI, which
+    gives the lower bound. Edges that match in both trees never need
+    to be moved, and cutting them divides tree1 into regions of
+    unmatched edges that can be reconciled independently. A region
+    with e unmatched edges is a tree with e + 3 leaves, and the sum of
+    an upper bound on the NNI distance of each region (see
+    `_get_nni_region_upper`) gives the upper bound.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        A bifurcating tree to compare to tree2.
+    tree2: ToyTree
+        A bifurcating tree with the same tip names as tree1.
+
+    Returns
+    -------
+    pd.Series
+        A Series with "lower" and "upper" bounds on the NNI distance.
+
+    Examples
+    --------
+    >>> tree1 = toytree.rtree.unittree(ntips=10, seed=123)
+    >>> tree2 = toytree.rtree.unittree(ntips=10, seed=321)
+    >>> toytree.distance.get_treedist_nni(tree1, tree2)
+    >>> # lower     4
+    >>> # upper    29
+    >>> # Name: nni, dtype: int64
 
     References
     ----------
-    - Li et al. (1996)
-    - Fack V, Lievens S, Van der Jeugt J (2002). “On the diameter of 
-    the rotation graph of binary coupling trees.” Discrete Mathematics,
-    245(1-3), 1–18.
-    - Robinson DF (1971). “Comparison of labeled trees with valency 
-    three.” Journal of Combinatorial Theory, Series B, 11(2), 105–119.
+    - Li M, Tromp J, Zhang L (1996). "Some notes on the nearest
+      neighbour interchange distance." Lecture Notes in Computer
+      Science 1090.
+    """
+    labels = _check_trees(tree1, tree2)
+    split_index = set(tree2.iter_bipartitions(type="bitmask", sort=True, tip_labels=labels))
+    masks = tree1.iter_bipartitions(type="bitmask", sort=True, tip_labels=labels)
+
+    # union the Nodes at the ends of each unmatched edge. Bitmasks are
+    # yielded for idx ntips..topnode-1 where the redundant edge at the
+    # root of a rooted tree is excluded, so the root is passed through.
+    nodes = tree1._idx_dict
+    root = tree1.nnodes - 1
+    groups = list(range(tree1.nnodes))
+
+    def find(idx: int) -> int:
+        while groups[idx] != idx:
+            groups[idx] = groups[groups[idx]]
+            idx = groups[idx]
+        return idx
+
+    unmatched = []
+    for idx, mask in enumerate(masks, start=tree1.ntips):
+        if mask in split_index:
+            continue
+        unmatched.append(idx)
+        pidx = nodes[idx]._up._idx
+        groups[find(idx)] = find(pidx)
+        if pidx == root and tree1.is_rooted():
+            groups[find(root - 1)] = find(root)
+
+    # count unmatched edges in each region
+    sizes: Dict[int, int] = {}
+    for idx in unmatched:
+        group = find(idx)
+        sizes[group] = sizes.get(group, 0) + 1
+    upper = sum(_get_nni_region_upper(i + 3) for i in sizes.values())
+    return pd.Series({"lower": len(unmatched), "upper": upper}, name="nni")
+
+
+###################################################################
+# SPR search on trees stored as lists
+###################################################################
+
+
+def _canon(mask: int, full: int) -> int:
+    """Return the side of a split that does not contain leaf 0."""
+    return full ^ mask if mask & 1 else mask
+
+
+def _get_state(tree: ToyTree, bits: Dict[str, int]) -> State:
+    """Return an SPR state from a ToyTree, with the root of an unrooted
+    tree resolved arbitrarily to make it bifurcating."""
+    nodes = tree._idx_dict
+    parent = [None] * tree.nnodes
+    children = [[] for _ in range(tree.nnodes)]
+    for idx in range(tree.nnodes - 1):
+        parent[idx] = nodes[idx]._up._idx
+    for idx in range(tree.ntips, tree.nnodes):
+        children[idx] = [i._idx for i in nodes[idx]._children]
+    root = tree.nnodes - 1
+    if len(children[root]) == 3:
+        new = len(parent)
+        parent.append(root)
+        children.append(children[root][1:])
+        for idx in children[new]:
+            parent[idx] = new
+        children[root] = [children[root][0], new]
+    leafbits = [bits[nodes[idx]._name] for idx in range(tree.ntips)]
+    return parent, children, root, leafbits
+
+
+def _get_masks(state: State) -> List[int]:
+    """Return the bitmask of leaves below each node of a state."""
+    parent, children, root, leafbits = state
+    masks = [0] * len(parent)
+    masks[:len(leafbits)] = leafbits
+    order = [root]
+    for idx in order:
+        order.extend(children[idx])
+    for idx in reversed(order):
+        for child in children[idx]:
+            masks[idx] |= masks[child]
+    return masks
+
+
+def _get_split_counts(state: State, masks: List[int]) -> Dict[int, int]:
+    """Return a dict counting the non-trivial canonical splits of a state.
+
+    Splits are counted rather than stored in a set because the two
+    children of the root have the same split.
+    """
+    nleaves = len(state[3])
+    full = masks[state[2]]
+    counts: Dict[int, int] = {}
+    for mask in masks:
+        split = _canon(mask, full)
+        if 1 < bin(split).count("1") < nleaves - 1:
+            counts[split] = counts.get(split, 0) + 1
+    return counts
+
+
+def _get_reduced_states(state1: State, splits2: Sequence[int]) -> Tuple[State, List[int]]:
+    """Return state1 and splits2 after collapsing the common subtrees.
+
+    Each maximal clade of state1 whose splits are all in splits2 is a
+    subtree shared by both trees, and is replaced by a single leaf.
+    This does not change the SPR distance (Allen and Steel 2001).
     """
+    parent, children, root, leafbits = state1
+    masks = _get_masks(state1)
+    full = masks[root]
+    index = set(splits2)
+
+    # postorder flag of whether a node's clade is fully shared
+    order = [root]
+    for idx in order:
+        order.extend(children[idx])
+    shared = [True] * len(parent)
+    for idx in reversed(order[1:]):
+        if children[idx]:
+            shared[idx] = (
+                all(shared[i] for i in children[idx])
+                and _canon(masks[idx], full) in index)
+
+    # new leaves are maximal shared clades, traversed from the root
+    groups, internal, new_ids = [], [], {}
+    stack = [root]
+    while stack:
+        idx = stack.pop()
+        if children[idx] and (idx == root or not shared[idx]):
+            internal.append(idx)
+            stack.extend(children[idx])
+        else:
+            new_ids[idx] = len(groups)
+            groups.append(masks[idx])
+
+    # internal nodes are numbered after the new leaves
+    nleaves = len(groups)
+    for num, idx in enumerate(internal):
+        new_ids[idx] = nleaves + num
+    new_parent = [None] * (nleaves + len(internal))
+    new_children = [[] for _ in new_parent]
+    for idx in internal:
+        for child in children[idx]:
+            new_children[new_ids[idx]].append(new_ids[child])
+            new_parent[new_ids[child]] = new_ids[idx]
+    state = (new_parent, new_children, new_ids[root], [1 << i for i in range(nleaves)])
 
+    # remap the splits of tree2 onto the new leaves
+    new_full = (1 << nleaves) - 1
+    new_splits = set()
+    for split in splits2:
+        mask = 0
+        for num, group in enumerate(groups):
+            both = split & group
+            if both == group:
+                mask |= 1 << num
+            elif both:
+                break
+        else:
+            mask = _canon(mask, new_full)
+            if 1 < bin(mask).count("1") < nleaves - 1:
+                new_splits.add(mask)
+    return state, sorted(new_splits)
 
-def tree_dist_spr(tree1, tree2, max_dist: int=10) -> float:
-    """Heuristic search algorithm to count N SPR moves separating two trees.
-    
-    Starting from tree1 all SPR moves that decrease the distance 
-    ... continue until dist=0 or max_dist is exceeded.
+
+def _iter_spr_moves(state: State, masks: List[int], counts: Dict[int, int], index: set):
+    """Yield (nunmatched, s, t) for every SPR move in a state.
+
+    Moving the subtree of node s onto the edge above node t removes
+    the split of the parent p of s, removes the leaves of s from the
+    ancestors of p up to the LCA of p and t, adds them to ancestors of
+    t up to the LCA, and adds the split of the new node above t. Only
+    these changes are evaluated, such that the number of splits that
+    are not in the index is computed for each move without copying.
     """
+    parent, children, root, _ = state
+    full = masks[root]
+    unmatched = sum(1 for i in counts if i not in index)
+
+    # preorder intervals and depths to find subtrees and LCAs
+    nnodes = len(parent)
+    tin, tout, depth = [0] * nnodes, [0] * nnodes, [0] * nnodes
+    order = [root]
+    for idx in order:
+        for child in children[idx]:
+            depth[child] = depth[idx] + 1
+            order.append(child)
+    # iterative DFS for contiguous intervals
+    stack, clock = [(root, False)], 0
+    while stack:
+        idx, done = stack.pop()
+        if done:
+            tout[idx] = clock
+            continue
+        tin[idx] = clock
+        clock += 1
+        stack.append((idx, True))
+        for child in children[idx]:
+            stack.append((child, False))
+
+    # canonical splits exclude leaf 0, so a split is trivial if it has
+    # at most one leaf, or all leaves except leaf 0.
+    trivial = full ^ 1
+
+    for s in range(nnodes):
+        if s == root:
+            continue
+        p = parent[s]
+        sib = children[p][0] if children[p][1] == s else children[p][1]
+        smask = masks[s]
+        for t in range(nnodes):
+            if t in (p, sib) or tin[s] <= tin[t] < tout[s]:
+                continue
+            changes = []
+            # t is an ancestor of s: it loses the leaves of s
+            t_anc = tin[t] <= tin[s] < tout[t]
+            changes.append((masks[p], -1))
+            changes.append(((masks[t] ^ smask if t_anc else masks[t]) | smask, 1))
+
+            # walk ancestors of p and of t (skipping p) to their LCA
+            x = parent[p]
+            y = parent[t]
+            if y == p:
+                y = parent[p]
+            while x != y:
+                if y is None or (x is not None and depth[x] >= depth[y]):
+                    changes.append((masks[x], -1))
+                    changes.append((masks[x] ^ smask, 1))
+                    x = parent[x]
+                else:
+                    changes.append((masks[y], -1))
+                    changes.append((masks[y] | smask, 1))
+                    y = parent[y]
+                    if y == p:
+                        y = parent[p]
+
+            # count new number of distinct splits not in index
+            delta: Dict[int, int] = {}
+            for mask, sign in changes:
+                split = full ^ mask if mask & 1 else mask
+                if split & (split - 1) and split != trivial and split not in index:
+                    delta[split] = delta.get(split, 0) + sign
+            new = unmatched
+            for split, change in delta.items():
+                old = counts.get(split, 0)
+                new += (old + change > 0) - (old > 0)
+            yield new, s, t
+
+
+def _apply_spr_move(state: State, s: int, t: int) -> State:
+    """Return a copy of a state with the subtree s moved above t."""
+    parent, children, root, leafbits = state
+    parent = parent[:]
+    children = [i[:] for i in children]
+
+    # prune: remove p and connect the sibling of s to its grandparent
+    p = parent[s]
+    sib = children[p][0] if children[p][1] == s else children[p][1]
+    gparent = parent[p]
+    parent[sib] = gparent
+    if gparent is None:
+        root = sib
+    else:
+        children[gparent][children[gparent].index(p)] = sib
+
+    # regraft: reuse p as the new node between t and its parent
+    tparent = parent[t]
+    parent[p] = tparent
+    parent[t] = p
+    children[p] = [s, t]
+    if tparent is None:
+        root = p
+    else:
+        children[tparent][children[tparent].index(t)] = p
+    return parent, children, root, leafbits
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_spr(
+    tree1: ToyTree,
+    tree2: ToyTree,
+    max_dist: int = 10,
+    beam: int = 4,
+) -> float:
+    """Return an upper bound on the SPR distance between two trees.
+
+    The subtree prune and regraft (SPR) distance is the minimum number
+    of SPR moves that transform one unrooted tree into another. Subtrees
+    that are shared by both trees are first collapsed into single tips,
+    which does not change the SPR distance. Then a beam search is run
+    starting from tree1, where at each step every SPR move of each tree
+    in the beam is evaluated by the number of its splits that are not
+    in tree2, and the `beam` best distinct trees are kept. The search
+    stops when tree2 is found, or when `max_dist` moves are exceeded.
+
+    The returned value is the number of moves in the path that was
+    found, which is an upper bound on the SPR distance, and is exact
+    for trees that are one SPR move apart.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        A bifurcating tree to compare to tree2.
+    tree2: ToyTree
+        A bifurcating tree with the same tip names as tree1.
+    max_dist: int
+        The maximum number of moves to search. If tree2 is not found
+        within this many moves then np.inf is returned.
+    beam: int
+        The number of trees kept at each step of the search. Larger
+        values are slower but can find shorter paths.
+
+    Examples
+    --------
+    >>> tree1 = toytree.tree("((a,b),(c,(d,(e,f))));")
+    >>> tree2 = toytree.tree("((a,(b,c)),(d,(e,f)));")
+    >>> toytree.distance.get_treedist_spr(tree1, tree2)
+    >>> # 1.0
+
+    References
+    ----------
+    - Allen BL, Steel M (2001). "Subtree transfer operations and their
+      induced metrics on evolutionary trees." Annals of Combinatorics 5.
+    """
+    labels = _check_trees(tree1, tree2)
+    bits = {name: 1 << i for i, name in enumerate(labels)}
+    full = (1 << len(labels)) - 1
+    splits2 = {
+        _canon(i, full) for i in
+        tree2.iter_bipartitions(type="bitmask", tip_labels=labels)
+    }
+    state = _get_state(tree1, bits)
+    state, splits2 = _get_reduced_states(state, splits2)
+    index = set(splits2)
+
+    # identical trees are reduced to a single shared subtree
+    masks = _get_masks(state)
+    counts = _get_split_counts(state, masks)
+    if all(i in index for i in counts):
+        return 0.0
+
+    beams = [(state, masks, counts)]
+    seen = {frozenset(counts)}
+    for dist in range(1, max_dist + 1):
+        moves = []
+        for num, (state, masks, counts) in enumerate(beams):
+            for score, s, t in _iter_spr_moves(state, masks, counts, index):
+                if not score:
+                    return float(dist)
+                moves.append((score, num, s, t))
+        moves.sort()
+
+        # keep the best distinct trees
+        new_beams = []
+        for score, num, s, t in moves:
+            state = _apply_spr_move(beams[num][0], s, t)
+            masks = _get_masks(state)
+            counts = _get_split_counts(state, masks)
+            key = frozenset(counts)
+            if key in seen:
+                continue
+            seen.add(key)
+            new_beams.append((state, masks, counts))
+            if len(new_beams) == beam:
+                break
+        beams = new_beams
+        if not beams:
+            break
+    return np.inf
+
+
+def _get_state_newick(state: State, names: Sequence[str]) -> str:
+    """Return a newick string of a state with leaves named by names."""
+    parent, children, root, leafbits = state
+
+    def write(idx: int) -> str:
+        if not children[idx]:
+            return names[leafbits[idx].bit_length() - 1]
+        return "(" + ",".join(write(i) for i in children[idx]) + ")"
+    return write(root) + ";"
 
 
 if __name__ == "__main__":
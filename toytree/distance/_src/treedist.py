@@ -47,13 +47,20 @@ References
   https://doi.org/10.1016/j.jmva.2006.11.013).
 """
 
-from typing import Set, Callable, Union, Iterator, Tuple, Optional
+from typing import Set, Callable, Union, Iterator, Tuple, Optional, Sequence, List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 from loguru import logger
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from toytree.distance._src.treedist_utils import (
     _get_split_phylo_info,
+    _get_split_matching_from_incidence,
+    _get_tree_split_incidence,
+    _get_incidence_phylo_info,
+    _get_incidence_entropy,
     get_trees_nye_dist,
     get_trees_matching_split_dist,
     get_trees_matching_split_info_dist,
@@ -62,9 +69,17 @@ from toytree.distance._src.treedist_utils import (
     get_trees_shared_phylo_info_dist_from_biparts,
     get_trees_mutual_clust_info_dist_from_biparts,
 )
-from toytree import ToyTree
+from toytree.distance._src.quartet_dist import (
+    QUARTET_METRICS,
+    get_treedist_quartets,
+    _get_quartet_tree_data,
+    _get_quartet_comparison_from_data,
+)
+from toytree import ToyTree, MultiTree
 from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.core.cache import get_cached, _get_tip_features_key
 from toytree.utils import ToytreeError
+from toytree.utils.src.arrays import get_output_array
 
 logger = logger.bind(name="toytree")
 
@@ -75,11 +90,14 @@ TIPS_IDENTICAL = "Treedist methods require that trees share identical tip names.
 # put functions here to have then exposed to 'distance' subpackage API
 __all__ = [
     "get_treedist_rf",
+    "get_treedist_rf_one_to_many",
     "get_treedist_rfi",
     "get_treedist_rfg_ms",
     "get_treedist_rfg_msi",
     "get_treedist_rfg_spi",
     "get_treedist_rfg_mci",
+    "get_treedist_kf_branch_score",
+    "get_treedist_matrix",
 ]
 
 
@@ -97,6 +115,10 @@ def _get_rf_distance(
     it is the symmetric difference between two bipart sets divided
     by the total number of (internal) bipartitions in both sets.
 
+    Bipartitions can be in any hashable format that is consistent
+    between the two sets, such as int bitmasks (fastest) or tuples
+    of frozensets of names.
+
     Parameters
     ----------
     set1: set
@@ -164,6 +186,136 @@ def _get_rf_distance_information_corrected(
     return total_info - shared_info
 
 
+###################################################################
+# Day's (1985) cluster table for linear time RF distances.
+#
+# Tips of a reference tree are numbered by their left-to-right order
+# (which is their idx order), such that the side of each of its splits
+# that does not contain tip 0 is an interval [L, R] of tip numbers.
+# Splits are stored in a table by their R (or L if another split has
+# the same R) for O(1) lookup. A split of another tree is then shared
+# with the reference if its side without tip 0 is also an interval,
+# i.e., its (max - min + 1) tip number equals its size, and the table
+# contains [min, max].
+###################################################################
+
+def _get_range_min_max(
+    values: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return min and max of values[start:end + 1] for each range."""
+    mins = [values]
+    maxs = [values]
+    width = 1
+    while 2 * width <= values.size:
+        mins.append(np.minimum(mins[-1][:-width], mins[-1][width:]))
+        maxs.append(np.maximum(maxs[-1][:-width], maxs[-1][width:]))
+        width *= 2
+    levels = np.frexp(ends - starts + 1)[1] - 1
+    rmin = np.empty(starts.size, dtype=values.dtype)
+    rmax = np.empty(starts.size, dtype=values.dtype)
+    for level in np.unique(levels):
+        mask = levels == level
+        lower = starts[mask]
+        upper = ends[mask] - (1 << level) + 1
+        rmin[mask] = np.minimum(mins[level][lower], mins[level][upper])
+        rmax[mask] = np.maximum(maxs[level][lower], maxs[level][upper])
+    return rmin, rmax
+
+
+def _get_tip_ranges(tree: ToyTree) -> np.ndarray:
+    """Return (nnodes, 2) array of the first and last tip idx below each
+    Node. This is cached on the tree (see `toytree.core.cache`).
+    """
+    def _get_tip_ranges_uncached():
+        nodes = tree._idx_dict
+        starts = list(range(tree.ntips))
+        ends = list(range(tree.ntips))
+        for idx in range(tree.ntips, tree.nnodes):
+            children = nodes[idx]._children
+            starts.append(starts[children[0]._idx])
+            ends.append(ends[children[-1]._idx])
+        return np.array([starts, ends], dtype=np.int64).T
+    return get_cached(tree, ("tip_ranges",), _get_tip_ranges_uncached)
+
+
+def _get_split_intervals(tree: ToyTree, order: np.ndarray) -> np.ndarray:
+    """Return (n, 2) array of the [L, R] sides of splits in a tree.
+
+    `order` is the number of each tip (by idx) in the reference tree
+    ordering, and rows are -1 for splits whose side that does not
+    include tip 0 is not an interval in this ordering. Splits are
+    the same as those in `tree.iter_bipartitions()`.
+    """
+    ntips = tree.ntips
+    topnode = tree.nnodes - 2 if tree.is_rooted() else tree.nnodes - 1
+    tip_ranges = _get_tip_ranges(tree)[ntips:topnode]
+    sizes = tip_ranges[:, 1] - tip_ranges[:, 0] + 1
+    rmin, rmax = _get_range_min_max(order, tip_ranges[:, 0], tip_ranges[:, 1])
+
+    # the side without tip 0 is the clade, or else its complement,
+    # which is the tips before and after the clade in idx order.
+    clade = rmin > 0
+    pre_min = np.minimum.accumulate(np.append(ntips, order))
+    pre_max = np.maximum.accumulate(np.append(-1, order))
+    suf_min = np.minimum.accumulate(np.append(order, ntips)[::-1])[::-1]
+    suf_max = np.maximum.accumulate(np.append(order, -1)[::-1])[::-1]
+    cmin = np.minimum(pre_min[tip_ranges[:, 0]], suf_min[tip_ranges[:, 1] + 1])
+    cmax = np.maximum(pre_max[tip_ranges[:, 0]], suf_max[tip_ranges[:, 1] + 1])
+    lower = np.where(clade, rmin, cmin)
+    upper = np.where(clade, rmax, cmax)
+    valid = upper - lower + 1 == np.where(clade, sizes, ntips - sizes)
+    intervals = np.stack([lower, upper], axis=1)
+    intervals[~valid] = -1
+    return intervals
+
+
+def _get_rf_cluster_table(tree: ToyTree) -> Tuple[np.ndarray, ...]:
+    """Return a cluster table of the splits in a reference tree.
+
+    Returns (names, order, table_l, table_r, nsplits), where names are
+    the sorted tip names, order is the reference number of each tip
+    name in sorted order, and table_r[R] = L and table_l[L] = R store
+    each split interval [L, R]. This is cached on the tree.
+    """
+    key = ("rf_cluster_table", _get_tip_features_key(tree, "name"))
+    return get_cached(tree, key, lambda: _get_rf_cluster_table_uncached(tree))
+
+
+def _get_rf_cluster_table_uncached(tree: ToyTree) -> Tuple[np.ndarray, ...]:
+    ntips = tree.ntips
+    names = np.array(tree.get_tip_labels())
+    sorter = np.argsort(names)
+    intervals = _get_split_intervals(tree, np.arange(ntips))
+    intervals = np.unique(intervals, axis=0)
+
+    # store largest interval with each R at table_r, others at table_l.
+    # This is unique because intervals of splits are nested or disjoint.
+    table_l = np.full(ntips, -1, dtype=np.int64)
+    table_r = np.full(ntips, -1, dtype=np.int64)
+    for lower, upper in intervals.tolist():
+        if table_r[upper] == -1:
+            table_r[upper] = lower
+        else:
+            table_l[lower] = upper
+    return names[sorter], sorter, table_l, table_r, intervals.shape[0]
+
+
+def _get_rf_from_cluster_table(table: Tuple[np.ndarray, ...], tree: ToyTree) -> Tuple[int, int]:
+    """Return (RF distance, total number of splits) to a reference tree."""
+    names, order, table_l, table_r, nsplits = table
+    tips = np.array(tree.get_tip_labels())
+    index = np.searchsorted(names, tips)
+    if (tips.size != names.size) or np.any(names[np.minimum(index, names.size - 1)] != tips):
+        raise ToytreeError(TIPS_IDENTICAL)
+    intervals = _get_split_intervals(tree, order[index])
+    lower, upper = intervals[:, 0], intervals[:, 1]
+    found = (lower >= 0) & (
+        (table_r[upper] == lower) | (table_l[np.maximum(lower, 0)] == upper))
+    nshared = int(found.sum())
+    total = nsplits + intervals.shape[0]
+    return total - 2 * nshared, total
+
+
 ##############################################################
 #
 #  PUBLIC METHODS
@@ -207,9 +359,58 @@ def get_treedist_rf(
         doi:10.1016/0025-5564(81)90043-2.
     """
     assert set(tree1.get_tip_labels()) == set(tree2.get_tip_labels()), TIPS_IDENTICAL
-    set1 = set(tree1.iter_bipartitions(type=frozenset, sort=True))
-    set2 = set(tree2.iter_bipartitions(type=frozenset, sort=True))
-    return _get_rf_distance(set1, set2, normalize=normalize)
+    score, total = _get_rf_from_cluster_table(_get_rf_cluster_table(tree1), tree2)
+    if normalize:
+        return score / total
+    return score
+
+
+@add_subpackage_method(TreeDistanceAPI)
+def get_treedist_rf_one_to_many(
+    tree: ToyTree,
+    trees: Union[MultiTree, Sequence[ToyTree]],
+    normalize: bool = False,
+) -> np.ndarray:
+    """Return array of Robinson-Foulds (RF) distances from one tree to many.
+
+    The splits of the reference tree are stored once in a cluster
+    table (Day 1985), after which each other tree is compared in
+    linear time. This is useful for comparing many trees (e.g., bootstrap
+    replicates) to a single tree. Trees must share the same tip names.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A reference tree.
+    trees: MultiTree or Sequence[ToyTree]
+        A collection of trees to compare to the reference tree.
+    normalize: bool
+        Normalize distance score by the total number of splits in
+        both trees (the max number of possible differences).
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(ntips=10, seed=123)
+    >>> mtree = toytree.mtree([toytree.rtree.unittree(10, seed=i) for i in range(5)])
+    >>> tree.distance.get_treedist_rf_one_to_many(mtree)
+    >>> # array([10.,  6.,  8.,  6., 10.])
+
+    References
+    ----------
+    - Day, W.H.E. (1985) "Optimal algorithms for comparing trees with
+      labeled leaves". Journal of Classification 2: 7–28.
+    """
+    if isinstance(trees, MultiTree):
+        trees = trees.treelist
+    table = _get_rf_cluster_table(tree)
+    dists = np.zeros(len(trees))
+    for idx, other in enumerate(trees):
+        score, total = _get_rf_from_cluster_table(table, other)
+        if normalize:
+            dists[idx] = score / total
+        else:
+            dists[idx] = score
+    return dists
 
 
 @add_subpackage_method(TreeDistanceAPI)
@@ -423,17 +624,72 @@ def get_treedist_rfg_jac(
     raise NotImplementedError("TODO")
 
 
+def _get_kf_edge_lengths(tree: ToyTree, tip_labels: Optional[Sequence[str]] = None) -> Dict[int, float]:
+    """Return a dict mapping bitmask splits to edge lengths.
+
+    Terminal edges are included, and the two edges at the root of a
+    rooted tree are summed as a single edge, since they represent the
+    same split. Bitmasks are over sorted tip names by default.
+    """
+    if tip_labels is None:
+        tip_labels = sorted(tree.get_tip_labels())
+    masks = tree.iter_bipartitions(
+        type="bitmask", sort=True, include_singleton_partitions=True, tip_labels=tip_labels)
+    nodes = tree._idx_dict
+    root = tree.nnodes - 1
+    rooted = tree.is_rooted()
+    lengths = {}
+    for idx, mask in enumerate(masks):
+        dist = nodes[idx]._dist
+        # the split of the other root child (idx root-1) is not yielded
+        if rooted and nodes[idx]._up._idx == root:
+            dist += nodes[root - 1]._dist
+        lengths[mask] = dist
+    return lengths
+
+
+def _get_kf_distance(lengths1: Dict[int, float], lengths2: Dict[int, float]) -> float:
+    """Return the KF branch score distance between edge length dicts."""
+    ssq = 0.
+    for mask, dist in lengths1.items():
+        ssq += (dist - lengths2.get(mask, 0.)) ** 2
+    for mask, dist in lengths2.items():
+        if mask not in lengths1:
+            ssq += dist ** 2
+    return ssq ** 0.5
+
+
+@add_subpackage_method(TreeDistanceAPI)
 def get_treedist_kf_branch_score(
     tree1: ToyTree,
     tree2: ToyTree,
 ) -> float:
-    """Return the Kune-Felsenstein metric...
+    """Return the Kuhner-Felsenstein branch score distance between trees.
 
     The Branch Score Distance of Kuhner and Felsenstein (1994) compares
     two trees using information of their branch lengths. It finds all
     bipartitions in the tree, and their branch lengths, as well as all
     possible alternative bipartitions that are not in the tree, which
-    are assigned branch lenghts of zero.
+    are assigned branch lenghts of zero. The distance is the square
+    root of the sum of squared differences in branch lengths. Terminal
+    edges are included, and trees are compared as unrooted, such that
+    the two edges at the root of a rooted tree are summed.
+
+    To compare many trees see `get_treedist_matrix(trees, metric="kf")`.
+
+    Parameters
+    ----------
+    tree1: ToyTree
+        An input ToyTree to compare to tree2.
+    tree2: ToyTree
+        An input ToyTree to compare to tree1.
+
+    Examples
+    --------
+    >>> tree1 = toytree.rtree.unittree(10, seed=123)
+    >>> tree2 = toytree.rtree.unittree(10, seed=321)
+    >>> tree1.distance.get_treedist_kf_branch_score(tree2)
+    >>> # 0.8485...
 
     Reference
     ---------
@@ -441,36 +697,344 @@ def get_treedist_kf_branch_score(
       phylogeny algorithms under equal and unequal evolutionary rates.
       Molecular Biology and Evolution, 11, 459–468.
     """
-    raise NotImplementedError("TODO")
-    utree = tree.unroot()
-    iter_biparts = tree.iter_bipartitions(include_singleton_partitions=True)
-    for node, bipart in zip(tree, iter_biparts):
-        if node._up.is_root():
-            "add dist to ..."
-        print((node, node.up), node._dist, bipart)
+    labels = sorted(tree1.get_tip_labels())
+    if labels != sorted(tree2.get_tip_labels()):
+        raise ToytreeError(TIPS_IDENTICAL)
+    return _get_kf_distance(
+        _get_kf_edge_lengths(tree1, labels), _get_kf_edge_lengths(tree2, labels))
+
+
+##############################################################
+#
+#  ALL-PAIRS DISTANCE MATRIX
+#
+##############################################################
+
+# Each metric is computed from data that is extracted once per tree
+# (e.g., its set of bipartitions), and then compared across all pairs.
+
+def _get_bipart_set(tree: ToyTree) -> Set:
+    return set(tree.iter_bipartitions(type=frozenset, sort=True))
+
+
+def _get_bitmask_set(tree: ToyTree) -> Set[int]:
+    """Return set of canonical bitmask splits over sorted tip names."""
+    return set(tree.iter_bipartitions(type="bitmask", sort=True))
+
+
+def _get_split_incidence(tree: ToyTree) -> np.ndarray:
+    return _get_tree_split_incidence(tree)
+
+
+def _get_split_incidence_and_phylo_info(tree: ToyTree) -> Tuple[np.ndarray, float]:
+    inc = _get_tree_split_incidence(tree)
+    return inc, _get_incidence_phylo_info(inc)
+
+
+def _get_split_incidence_and_entropy(tree: ToyTree) -> Tuple[np.ndarray, float]:
+    inc = _get_tree_split_incidence(tree)
+    return inc, _get_incidence_entropy(inc)
+
+
+def _compare_matching_split(data1, data2, normalize: bool) -> float:
+    arr, indices = _get_split_matching_from_incidence(data1, data2, "ms")
+    return arr[indices].sum()
+
+
+def _compare_shared_phylo_info(data1, data2, normalize: bool) -> float:
+    arr, indices = _get_split_matching_from_incidence(data1[0], data2[0], "spi")
+    spi = arr[indices].sum()
+    ind_info = data1[1] + data2[1]
+    if normalize:
+        if not ind_info:
+            return 0.
+        return (ind_info - (2 * spi)) / ind_info
+    return ind_info - (2 * spi)
+
+
+def _compare_mutual_clust_info(data1, data2, normalize: bool) -> float:
+    arr, indices = _get_split_matching_from_incidence(data1[0], data2[0], "mci")
+    mci = arr[indices].sum()
+    ind_info = data1[1] + data2[1]
+    if normalize:
+        return (ind_info - (2 * mci)) / ind_info
+    return ind_info - (2 * mci)
+
+
+def _compare_kf(data1, data2, normalize: bool) -> float:
+    return _get_kf_distance(data1, data2)
+
+
+def _compare_quartets(data1, data2, normalize: bool, quartet_metric: str) -> float:
+    data = _get_quartet_comparison_from_data(data1, data2)
+    return 1 - QUARTET_METRICS[quartet_metric](data)
+
+
+# {metric: (per-tree function, pairwise function, public function)}
+TREEDIST_MATRIX_METRICS = {
+    "rf": (_get_bitmask_set, _get_rf_distance, get_treedist_rf),
+    "rfi": (_get_bipart_set, _get_rf_distance_information_corrected, get_treedist_rfi),
+    "rfg_ms": (_get_split_incidence, _compare_matching_split, get_treedist_rfg_ms),
+    # same as get_treedist_rfg_msi, which returns the MCI distance.
+    "rfg_msi": (_get_split_incidence_and_entropy, _compare_mutual_clust_info, get_treedist_rfg_msi),
+    "rfg_spi": (_get_split_incidence_and_phylo_info, _compare_shared_phylo_info, get_treedist_rfg_spi),
+    "rfg_mci": (_get_split_incidence_and_entropy, _compare_mutual_clust_info, get_treedist_rfg_mci),
+    "quartets": (_get_quartet_tree_data, _compare_quartets, get_treedist_quartets),
+    "kf": (_get_kf_edge_lengths, _compare_kf, get_treedist_kf_branch_score),
+}
+
+# metrics that support normalize=True in get_treedist_matrix
+TREEDIST_MATRIX_NORMALIZE_METRICS = {"rf", "rfi", "rfg_msi", "rfg_spi", "rfg_mci"}
+
+# state shared with worker processes by `_init_treedist_worker`
+_WORKER_STATE = {}
+
+
+def _init_treedist_worker(metric: str, data: list, normalize: bool, kwargs: dict) -> None:
+    """Store per-tree data in a worker process once, not per task."""
+    _WORKER_STATE.update(metric=metric, data=data, normalize=normalize, kwargs=kwargs)
+
+
+def _get_treedist_rows(
+    metric: str, data: list, normalize: bool, kwargs: dict, start: int, stop: int,
+) -> List[np.ndarray]:
+    """Return distances from trees start:stop to all trees after each."""
+    compare = TREEDIST_MATRIX_METRICS[metric][1]
+    rows = []
+    for idx in range(start, stop):
+        rows.append(np.array([
+            compare(data[idx], data[jdx], normalize=normalize, **kwargs)
+            for jdx in range(idx + 1, len(data))
+        ], dtype=np.float64))
+    return rows
+
+
+def _get_treedist_rows_worker(start: int, stop: int) -> Tuple[int, List[np.ndarray]]:
+    return start, _get_treedist_rows(
+        _WORKER_STATE["metric"], _WORKER_STATE["data"],
+        _WORKER_STATE["normalize"], _WORKER_STATE["kwargs"], start, stop)
+
+
+def _iter_row_blocks_by_npairs(ntrees: int, nblocks: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, stop) rows of the upper triangle with ~equal pairs."""
+    target = max(1, ntrees * (ntrees - 1) // 2 // max(1, nblocks))
+    start = npairs = 0
+    for idx in range(ntrees):
+        npairs += ntrees - 1 - idx
+        if npairs >= target:
+            yield start, idx + 1
+            start, npairs = idx + 1, 0
+    if start < ntrees:
+        yield start, ntrees
+
+
+def _get_kf_sparse_matrix(treelist: Sequence[ToyTree]) -> sparse.csr_matrix:
+    """Return a (ntrees, nsplits) sparse matrix of edge lengths.
+
+    Each tree is encoded once as a sparse row vector of its edge
+    lengths, indexed by a dict of all splits observed in any tree.
+    """
+    labels = sorted(treelist[0].get_tip_labels())
+    index = {}
+    indptr, indices, data = [0], [], []
+    for tree in treelist:
+        for mask, dist in _get_kf_edge_lengths(tree, labels).items():
+            indices.append(index.setdefault(mask, len(index)))
+            data.append(dist)
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.array(data, dtype=np.float64), indices, indptr),
+        shape=(len(treelist), len(index)))
+
+
+# relative size of squared KF distances below which they are recomputed
+KF_RECOMPUTE_TOLERANCE = 1e-6
+
+
+def _get_kf_block(edges: sparse.csr_matrix, norms: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Return KF distances from trees start:stop to trees start:.
+
+    Squared distances are expanded as |x|^2 + |y|^2 - 2 x.y, such that
+    all pairs in a block are computed by one sparse matrix product.
+    This expansion loses precision for near-identical trees, so pairs
+    with a small distance relative to their norms are recomputed from
+    the sparse difference x - y, which is exactly zero for identical
+    trees.
+    """
+    gram = (edges[start:stop] @ edges[start:].T).toarray()
+    scale = norms[start:stop, None] + norms[None, start:]
+    dist2 = scale - 2 * gram
+    rows, cols = np.nonzero(dist2 <= KF_RECOMPUTE_TOLERANCE * scale)
+    if rows.size:
+        diff = edges[start + rows] - edges[start + cols]
+        dist2[rows, cols] = np.asarray(diff.multiply(diff).sum(axis=1)).ravel()
+    np.maximum(dist2, 0, out=dist2)
+    return np.sqrt(dist2)
+
+
+def _init_kf_worker(edges: sparse.csr_matrix, norms: np.ndarray) -> None:
+    """Store the edge length matrix in a worker process once."""
+    _WORKER_STATE.update(edges=edges, norms=norms)
+
+
+def _get_kf_block_worker(start: int, stop: int) -> Tuple[int, np.ndarray]:
+    return start, _get_kf_block(_WORKER_STATE["edges"], _WORKER_STATE["norms"], start, stop)
+
+
+def _fill_kf_matrix(arr: np.ndarray, treelist: Sequence[ToyTree], njobs: int, max_size: int = 2**22) -> None:
+    """Fill a (ntrees, ntrees) array with all-pairs KF distances.
+
+    Rows of the upper triangle are computed in blocks, limiting the
+    size of dense temporary arrays to about max_size, optionally in
+    parallel, and each block is written to arr (which can be a memmap).
+    """
+    ntrees = len(treelist)
+    edges = _get_kf_sparse_matrix(treelist)
+    norms = np.asarray(edges.multiply(edges).sum(axis=1)).ravel()
+    nblocks = max(njobs * 4, -(-ntrees * ntrees // 2 // max_size))
+    blocks = list(_iter_row_blocks_by_npairs(ntrees, nblocks))
+
+    def _fill(start, block):
+        stop = start + block.shape[0]
+        arr[start:stop, start:] = block
+        arr[start:, start:stop] = block.T
+
+    if njobs > 1 and ntrees > 2:
+        with ProcessPoolExecutor(
+            njobs, initializer=_init_kf_worker, initargs=(edges, norms),
+        ) as pool:
+            for start, block in pool.map(_get_kf_block_worker, *zip(*blocks)):
+                _fill(start, block)
+    else:
+        for start, stop in blocks:
+            _fill(start, _get_kf_block(edges, norms, start, stop))
+    # distances of trees to themselves are exactly zero
+    arr[np.diag_indices(ntrees)] = 0
 
 
 def get_treedist_matrix(
-    *trees: ToyTree,
-    metric: Callable,
-    normalize: bool = True,
+    *trees: Union[ToyTree, MultiTree, Sequence[ToyTree]],
+    metric: Union[str, Callable] = "rf",
+    normalize: bool = False,
+    njobs: int = 1,
+    dtype: np.dtype = np.float32,
+    df: bool = False,
+    memmap: Optional[Union[str, Path]] = None,
     **kwargs,
-) -> pd.DataFrame:
-    """Return ...
+) -> Union[np.ndarray, pd.DataFrame]:
+    """Return a symmetric matrix of distances between all pairs of trees.
 
     This is a generalization of `get_treedist_x` methods that
-    arranges results for multiple tree comparisons into a dataframe.
+    arranges results for multiple tree comparisons into a matrix.
+    The data needed to compute a metric (e.g., the bipartitions or
+    clade sizes of a tree) are computed only once per tree
+    and then compared across all pairs of trees, optionally in
+    parallel blocks of rows on a pool of processes.
 
     Parameters
     ----------
+    *trees: ToyTree, MultiTree, or Sequence[ToyTree]
+        Trees to compare, entered as separate args, as a MultiTree,
+        or as a list of ToyTrees. All trees must share the same tips.
+    metric: str or Callable
+        Name of a tree distance metric: "rf", "rfi", "rfg_ms",
+        "rfg_msi", "rfg_spi", "rfg_mci", "quartets", or "kf", or one
+        of the `get_treedist_x` functions. For "quartets" an additional
+        kwarg `quartet_metric` can select a quartet distance metric
+        (default="symmetric_difference"). For "kf" (branch score) each
+        tree is encoded as a sparse vector of edge lengths over all
+        observed splits, and blocks of pairs are computed by sparse
+        matrix products.
+    normalize: bool
+        Normalize each distance as described for each metric. This
+        is supported by "rf", "rfi", "rfg_msi", "rfg_spi", and
+        "rfg_mci"; a ToytreeError is raised if normalize=True with
+        "rfg_ms", "quartets", or "kf".
+    njobs: int
+        Number of processes used to compute distances in parallel.
+    dtype: np.dtype
+        Float dtype of the returned matrix. Default is np.float32.
+    df: bool
+        If True a pandas.DataFrame is returned instead of np.ndarray.
+    memmap: str, Path or None
+        Optional path to a .npy file to which the matrix is written
+        as a memory-mapped array. It can be re-opened later with
+        `np.load(path, mmap_mode="r")`.
+    **kwargs:
+        Additional arguments to the metric.
 
     Examples
     --------
-    >>> tree1 = toytree.rtree.unittree(ntips=10, seed=123)
-    >>> tree2 = toytree.rtree.unittree(ntips=10, seed=321)
-    >>> ...
+    >>> trees = toytree.mtree([toytree.rtree.unittree(10, seed=i) for i in range(5)])
+    >>> toytree.distance.get_treedist_matrix(trees, metric="rf", normalize=True)
+    >>> toytree.distance.get_treedist_matrix(trees, metric="rfg_mci", njobs=4)
     """
-    raise NotImplementedError("TODO")
+    # flatten inputs into a list of ToyTrees
+    treelist = []
+    for item in trees:
+        if isinstance(item, ToyTree):
+            treelist.append(item)
+        else:
+            treelist.extend(item)
+
+    # get metric name and its functions
+    if callable(metric):
+        names = {j[2]: i for i, j in TREEDIST_MATRIX_METRICS.items()}
+        metric = names.get(metric, metric)
+    if metric not in TREEDIST_MATRIX_METRICS:
+        raise ToytreeError(
+            f"metric {metric} not recognized, must be one of "
+            f"{list(TREEDIST_MATRIX_METRICS)}.")
+    if normalize and metric not in TREEDIST_MATRIX_NORMALIZE_METRICS:
+        raise ToytreeError(
+            f"normalize is not supported for metric {metric}, only for "
+            f"{sorted(TREEDIST_MATRIX_NORMALIZE_METRICS)}.")
+    if metric == "quartets":
+        kwargs.setdefault("quartet_metric", "symmetric_difference")
+        if kwargs["quartet_metric"] not in QUARTET_METRICS:
+            raise ToytreeError(
+                f"quartet_metric must be one of {sorted(QUARTET_METRICS)}.")
+
+    # require all trees to share the same tips
+    if treelist:
+        tips = set(treelist[0].get_tip_labels())
+        if any(set(i.get_tip_labels()) != tips for i in treelist[1:]):
+            raise ToytreeError(TIPS_IDENTICAL)
+
+    # kf distances of all pairs are computed by sparse matrix products
+    ntrees = len(treelist)
+    if metric == "kf":
+        arr = get_output_array((ntrees, ntrees), dtype, memmap)
+        if ntrees:
+            _fill_kf_matrix(arr, treelist, njobs)
+        if not df:
+            return arr
+        return pd.DataFrame(arr, index=range(ntrees), columns=range(ntrees))
+
+    # get data used by the metric once per tree
+    data = [TREEDIST_MATRIX_METRICS[metric][0](i) for i in treelist]
+    arr = get_output_array((ntrees, ntrees), dtype, memmap)
+
+    # compare all pairs in blocks of rows of the upper triangle
+    args = (metric, data, normalize, kwargs)
+    if njobs > 1 and ntrees > 2:
+        blocks = list(_iter_row_blocks_by_npairs(ntrees, njobs * 4))
+        with ProcessPoolExecutor(
+            njobs, initializer=_init_treedist_worker, initargs=args,
+        ) as pool:
+            results = pool.map(_get_treedist_rows_worker, *zip(*blocks))
+            for start, rows in results:
+                for idx, row in enumerate(rows, start=start):
+                    arr[idx, idx + 1:] = row
+                    arr[idx + 1:, idx] = row
+    else:
+        for idx, row in enumerate(_get_treedist_rows(*args, 0, ntrees)):
+            arr[idx, idx + 1:] = row
+            arr[idx + 1:, idx] = row
+
+    if not df:
+        return arr
+    return pd.DataFrame(arr, index=range(ntrees), columns=range(ntrees))
 
 
 ##############################################################
@@ -12,6 +12,7 @@ from typing import Tuple, Sequence, Set
 # FIXME: support backup method old Python does not support
 # from functools import cache
 import itertools
+import math
 
 from loguru import logger
 from scipy.special import factorial2
@@ -21,6 +22,8 @@ import pandas as pd
 from toytree.utils import ToytreeError
 from toytree import ToyTree
 from toytree.core.apis import TreeDistanceAPI, add_subpackage_method
+from toytree.enum.src.bipartitions import _bitmasks_to_array
+from toytree.core.cache import get_cached, _get_tip_features_key
 
 logger = logger.bind(name="toytree")
 
@@ -33,11 +36,15 @@ logger = logger.bind(name="toytree")
 
 def _get_n_unrooted_trees(size: int) -> int:
     """Return the number of possible unrooted trees for ntips=size."""
+    if size < 3:
+        return 1
     return int(factorial2(2 * size - 5))
 
 
 def _get_n_rooted_trees(size: int) -> int:
     """Return the number of possible rooted trees for ntips=size."""
+    if size < 2:
+        return 1
     return int(factorial2(2 * size - 3))
 
 
@@ -140,12 +147,23 @@ def _get_phylo_prob(size_a: int, size_b: int) -> float:
     return trees_w_split / _get_n_unrooted_trees(size_x)
 
 
+def _get_log2_odd_double_factorial(size: int) -> float:
+    """Return log2(size!!) for an odd size >= -1 without overflow."""
+    half = (size + 1) // 2
+    return (math.lgamma(2 * half + 1) - math.lgamma(half + 1)) / math.log(2) - half
+
+
 # @cache
 def _get_phylo_info(size_a: int, size_b: int) -> float:
     """Return information of phylo prob in units of bits."""
     if (size_a < 2) or (size_b < 2):
         return 0
-    return -np.log2(_get_phylo_prob(size_a, size_b))
+    # -log2(_get_phylo_prob(size_a, size_b)) computed in log units
+    return (
+        _get_log2_odd_double_factorial(2 * (size_a + size_b) - 5)
+        - _get_log2_odd_double_factorial(2 * size_a - 3)
+        - _get_log2_odd_double_factorial(2 * size_b - 3)
+    )
 
 
 # @cache
@@ -166,7 +184,7 @@ def _get_split_phylo_info(split: Tuple[Tuple, Tuple]) -> float:
 
 def get_tree_splitwise_phylo_info(tree: ToyTree) -> float:
     """Return the maximum phylogenetic information in a tree."""
-    return sum(_get_split_phylo_info(i) for i in tree.iter_bipartitions())
+    return _get_incidence_phylo_info(_get_tree_split_incidence(tree))
 
 
 ####################################################
@@ -305,7 +323,7 @@ def _get_split_entropy(split: Tuple[Tuple, Tuple]) -> float:
 
 def get_tree_splitwise_entropy(tree: ToyTree) -> float:
     """Return the maximum entropy of a tree"""
-    return sum(_get_split_entropy(i) for i in tree.iter_bipartitions())
+    return _get_incidence_entropy(_get_tree_split_incidence(tree))
 
 
 ####################################################
@@ -347,6 +365,183 @@ def _get_two_splits_entropy_info_dist(
     return _get_two_splits_entropy(split1, split2)[4]
 
 
+####################################################################
+# Vectorized split similarity scores for all pairs of bipartitions.
+#
+# The sizes of the four intersections of the subsets of every pair of
+# splits (A1|B1, A2|B2) are computed by a matrix multiplication of
+# incidence matrices, and the number of trees are computed in log2
+# units from a table of log2 double factorials, which does not
+# overflow for large trees.
+####################################################################
+
+def _get_log2_double_factorials(size: int) -> np.ndarray:
+    """Return array where arr[k + 1] = log2(k!!) for odd k in [-1, size].
+
+    Only odd k are used in tree counts, and entries for even k are 0.
+    """
+    arr = np.zeros(size + 2)
+    for odd in range(-1, size + 1, 2):
+        arr[odd + 1] = _get_log2_odd_double_factorial(odd)
+    return arr
+
+
+def _get_log2_n_rooted_trees(ldf: np.ndarray, size: np.ndarray) -> np.ndarray:
+    """Return log2 number of rooted trees for an array of sizes."""
+    return ldf[np.maximum(2 * size - 3, -1) + 1]
+
+
+def _get_log2_n_unrooted_trees(ldf: np.ndarray, size: np.ndarray) -> np.ndarray:
+    """Return log2 number of unrooted trees for an array of sizes."""
+    return ldf[np.maximum(2 * size - 5, -1) + 1]
+
+
+def _get_phylo_info_array(ldf: np.ndarray, size_a: np.ndarray, size_b: np.ndarray) -> np.ndarray:
+    """Return array of `_get_phylo_info` for arrays of split sizes."""
+    info = (
+        _get_log2_n_unrooted_trees(ldf, size_a + size_b)
+        - _get_log2_n_rooted_trees(ldf, size_a)
+        - _get_log2_n_rooted_trees(ldf, size_b)
+    )
+    return np.where((size_a < 2) | (size_b < 2), 0., info)
+
+
+def _get_phylo_info_two_splits_array(
+    ldf: np.ndarray, ntips: int, size_a1: np.ndarray, size_a2: np.ndarray,
+) -> np.ndarray:
+    """Return array of `_get_phylo_info_two_splits` for arrays of sizes."""
+    small = np.minimum(size_a1, size_a2)
+    large = np.maximum(size_a1, size_a2)
+    ntrees = np.select(
+        [small == 0, large == ntips],
+        [
+            _get_log2_n_unrooted_trees(ldf, ntips - large),
+            _get_log2_n_rooted_trees(ldf, small) + _get_log2_n_rooted_trees(ldf, ntips - small),
+        ],
+        default=(
+            _get_log2_n_rooted_trees(ldf, large - small + 1)
+            + _get_log2_n_rooted_trees(ldf, small)
+            + _get_log2_n_rooted_trees(ldf, ntips - large)
+        ),
+    )
+    return _get_log2_n_unrooted_trees(ldf, np.array(ntips)) - ntrees
+
+
+def _entropy_array(*prob: np.ndarray) -> np.ndarray:
+    """Return sum of entropies for arrays of probabilities."""
+    total = 0.
+    for arr in prob:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total = total - np.where(arr > 0, arr * np.log2(arr), 0.)
+    return total
+
+
+def _get_incidence_matrices(
+    biparts1: Sequence[Tuple[Tuple, Tuple]],
+    biparts2: Sequence[Tuple[Tuple, Tuple]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (nb, ntips) 0/1 matrices of the first subset of each split."""
+    if not biparts1:
+        return np.zeros((0, 0)), np.zeros((len(biparts2), 0))
+    names = sorted(set(biparts1[0][0]) | set(biparts1[0][1]))
+    names = {j: i for i, j in enumerate(names)}
+    incs = []
+    for biparts in (biparts1, biparts2):
+        inc = np.zeros((len(biparts), len(names)))
+        for idx, bipart in enumerate(biparts):
+            inc[idx, [names[i] for i in bipart[0]]] = 1
+        incs.append(inc)
+    return tuple(incs)
+
+
+def _get_tree_split_incidence(tree: ToyTree) -> np.ndarray:
+    """Return incidence matrix of the bipartitions of a tree.
+
+    Rows are in the same order as `tree.iter_bipartitions()` and
+    columns are the sorted tip labels. This is cached on the tree.
+    """
+    key = ("split_incidence", _get_tip_features_key(tree, "name"))
+    return get_cached(tree, key, lambda: _bitmasks_to_array(
+        list(tree.iter_bipartitions(type="bitmask")), tree.ntips))
+
+
+def _get_incidence_phylo_info(inc: np.ndarray) -> float:
+    """Return sum of the phylo info of splits in an incidence matrix."""
+    ntips = inc.shape[1]
+    sizes = inc.sum(axis=1).astype(np.int64)
+    ldf = _get_log2_double_factorials(2 * ntips)
+    return float(_get_phylo_info_array(ldf, sizes, ntips - sizes).sum())
+
+
+def _get_incidence_entropy(inc: np.ndarray) -> float:
+    """Return sum of the entropy of splits in an incidence matrix."""
+    ntips = inc.shape[1]
+    sizes = inc.sum(axis=1)
+    return float(_entropy_array(sizes / ntips, (ntips - sizes) / ntips).sum())
+
+
+def _get_split_similarity_matrix(
+    inc1: np.ndarray,
+    inc2: np.ndarray,
+    split_similarity_metric: str = "spi",
+) -> np.ndarray:
+    """Return (nb1, nb2) matrix of split similarity scores.
+
+    This returns the same values as calling the `_get_two_splits_x`
+    function of a metric on every pair of bipartitions, but computes
+    them on whole arrays from incidence matrices of the splits.
+    """
+    nb1 = inc1.shape[0]
+    nb2 = inc2.shape[0]
+    if not (nb1 and nb2):
+        return np.zeros((nb1, nb2))
+
+    # sizes of subsets and of their intersections: |A1 & A2|, etc.
+    ntips = inc1.shape[1]
+    inc1 = inc1.astype(np.float64)
+    inc2 = inc2.astype(np.float64)
+    sa1 = inc1.sum(axis=1).astype(np.int64)[:, None]
+    sa2 = inc2.sum(axis=1).astype(np.int64)[None, :]
+    sb1 = ntips - sa1
+    sb2 = ntips - sa2
+    aa = np.rint(inc1 @ inc2.T).astype(np.int64)
+    ab = sa1 - aa
+    ba = sa2 - aa
+    bb = ntips - sa1 - sa2 + aa
+
+    if split_similarity_metric == "ms":
+        return (ntips - np.maximum(aa + bb, ab + ba)).astype(float)
+
+    if split_similarity_metric == "nye":
+        ali1 = np.minimum(aa / (sa1 + sa2 - aa), bb / (sb1 + sb2 - bb))
+        ali2 = np.minimum(ab / (sa1 + sb2 - ab), ba / (sb1 + sa2 - ba))
+        return np.maximum(ali1, ali2)
+
+    if split_similarity_metric == "mci":
+        h1 = _entropy_array(sa1 / ntips, sb1 / ntips)
+        h2 = _entropy_array(sa2 / ntips, sb2 / ntips)
+        hjoint = _entropy_array(*(i / ntips for i in (aa, ab, ba, bb)))
+        return h1 + h2 - hjoint
+
+    ldf = _get_log2_double_factorials(2 * ntips)
+    if split_similarity_metric == "msi":
+        return np.maximum(
+            _get_phylo_info_array(ldf, aa, bb),
+            _get_phylo_info_array(ldf, ab, ba),
+        )
+
+    # spi: info of compatible splits, where a subset of split1 is a
+    # subset of a subset of split2, selected in the same order as in
+    # `_get_subset_superset`.
+    conds = [ab == 0, aa == 0, bb == 0, ba == 0]
+    subset = np.select(conds, [sa1, sa1, sb1, sb1], default=0)
+    superset = np.select(conds, [sa2, sb2, sa2, sb2], default=0)
+    hs1 = _get_phylo_info_array(ldf, sa1, sb1)
+    hs2 = _get_phylo_info_array(ldf, sa2, sb2)
+    hs12 = _get_phylo_info_two_splits_array(ldf, ntips, subset, superset)
+    return np.where(np.any(conds, axis=0), hs1 + hs2 - hs12, 0.)
+
+
 ####################################################################
 # Get matching of bipartitions based on split similarity scores,
 # i.e., shared phylo info (spi) or mutual clustering info (msi)
@@ -378,38 +573,28 @@ def _get_split_matching(
     ----------
     - ...
     """
-    # split similarity function
-    if split_similarity_metric == "mci":
-        _get_split_similarity = _get_two_splits_entropy_info
-        maximize = True
-    elif split_similarity_metric == "spi":
-        _get_split_similarity = _get_two_splits_shared_phylo_info
-        maximize = True
-    elif split_similarity_metric == "ms":
-        _get_split_similarity = _get_two_splits_matching_split_dist
-        maximize = False
-    elif split_similarity_metric == "msi":
-        _get_split_similarity = _get_two_splits_matching_split_phylo_info
-        maximize = True
-    elif split_similarity_metric == "nye":
-        _get_split_similarity = _get_two_splits_nye_similarity
-        maximize = True
-    else:
+    if split_similarity_metric not in ("mci", "spi", "ms", "msi", "nye"):
         raise ToytreeError(
             "split similarity metric must be in "
             "('mci', 'spi', 'ms', 'msi', 'nye')")
 
-    # get partitions in their input order.
-    nb1 = len(biparts1)
-    nb2 = len(biparts2)
+    # get matrix of split similarity measures
+    inc1, inc2 = _get_incidence_matrices(biparts1, biparts2)
+    return _get_split_matching_from_incidence(inc1, inc2, split_similarity_metric)
+
 
-    # get matric of split similarity measures
-    arr = np.zeros(shape=(nb1, nb2))
-    for idx, bip1 in enumerate(biparts1):
-        for jdx, bip2 in enumerate(biparts2):
-            arr[idx, jdx] = _get_split_similarity(bip1, bip2)
+def _get_split_matching_from_incidence(
+    inc1: np.ndarray,
+    inc2: np.ndarray,
+    split_similarity_metric: str = "spi",
+) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Return a paired similarity matrix and optimal matching.
 
-    # get linear solution pairing splits
+    Same as `_get_split_matching` but from incidence matrices of the
+    splits (see `_get_tree_split_incidence`).
+    """
+    arr = _get_split_similarity_matrix(inc1, inc2, split_similarity_metric)
+    maximize = split_similarity_metric != "ms"
     indices = linear_sum_assignment(arr, maximize=maximize)
     return arr, indices
 
@@ -474,9 +659,9 @@ def get_trees_nye_similarity(
     web-based tool for comparing two alternative phylogenetic trees.”
     Bioinformatics, 22(1), 117--119. doi: 10.1093/bioinformatics/bti720.
     """
-    biparts1 = list(tree1.iter_bipartitions())
-    biparts2 = list(tree2.iter_bipartitions())
-    arr, indices = _get_split_matching(biparts1, biparts2, "nye")
+    inc1 = _get_tree_split_incidence(tree1)
+    inc2 = _get_tree_split_incidence(tree2)
+    arr, indices = _get_split_matching_from_incidence(inc1, inc2, "nye")
     nye = arr[indices].sum()
     if normalize:
         ind_info = sum(get_tree_splitwise_nye_similarity(i) for i in (tree1, tree2))
@@ -504,9 +689,9 @@ def get_trees_matching_split_dist(
     Distance is the number of elements that must be moved from one
     subset to another in order to make the two splits identical.
     """
-    biparts1 = list(tree1.iter_bipartitions())
-    biparts2 = list(tree2.iter_bipartitions())
-    arr, indices = _get_split_matching(biparts1, biparts2, "ms")
+    inc1 = _get_tree_split_incidence(tree1)
+    inc2 = _get_tree_split_incidence(tree2)
+    arr, indices = _get_split_matching_from_incidence(inc1, inc2, "ms")
     msd = arr[indices].sum()
     if normalize:
         logger.warning("no normalization method for matching split distance.")
@@ -522,9 +707,9 @@ def get_trees_matching_split_info(
     subset to another in order to make the two splits identical, but,
     then the phylo info is returned for each match.
     """
-    biparts1 = list(tree1.iter_bipartitions())
-    biparts2 = list(tree2.iter_bipartitions())
-    arr, indices = _get_split_matching(biparts1, biparts2, "msi")
+    inc1 = _get_tree_split_incidence(tree1)
+    inc2 = _get_tree_split_incidence(tree2)
+    arr, indices = _get_split_matching_from_incidence(inc1, inc2, "msi")
     msi = arr[indices].sum()
     if normalize:
         ind_info = sum(get_tree_splitwise_phylo_info(i) for i in (tree1, tree2))
@@ -560,9 +745,9 @@ def get_trees_shared_phylo_info(
     that phylogenetics seeks to reconstruct the single tree that
     accurately represents historical events.
     """
-    biparts1 = list(tree1.iter_bipartitions())
-    biparts2 = list(tree2.iter_bipartitions())
-    arr, indices = _get_split_matching(biparts1, biparts2, "spi")
+    inc1 = _get_tree_split_incidence(tree1)
+    inc2 = _get_tree_split_incidence(tree2)
+    arr, indices = _get_split_matching_from_incidence(inc1, inc2, "spi")
     spi = arr[indices].sum()
     if normalize:
         ind_info = sum(get_tree_splitwise_phylo_info(i) for i in (tree1, tree2))
@@ -615,9 +800,9 @@ def get_trees_mutual_clust_info(
     """Return the mutual clustering information (cid).
 
     """
-    biparts1 = list(tree1.iter_bipartitions())
-    biparts2 = list(tree2.iter_bipartitions())
-    arr, indices = _get_split_matching(biparts1, biparts2, "mci")
+    inc1 = _get_tree_split_incidence(tree1)
+    inc2 = _get_tree_split_incidence(tree2)
+    arr, indices = _get_split_matching_from_incidence(inc1, inc2, "mci")
     mci = arr[indices].sum()
     if normalize:
         ind_info = sum(get_tree_splitwise_entropy(i) for i in (tree1, tree2))
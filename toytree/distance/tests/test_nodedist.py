@@ -4,6 +4,8 @@
 
 """
 
+import os
+import tempfile
 import unittest
 import numpy as np
 import toytree
@@ -43,6 +45,35 @@ class TestRoot(unittest.TestCase):
                     print(idx1, idx2, dist, arr[idx1, idx2])
                     self.assertAlmostEqual(dist, arr[idx1, idx2])
 
+    def test_get_node_distance_matrix_topology_only(self):
+        """Topology-only distances count edges on the path."""
+        for tree in self.trees + [toytree.tree("((a,b,c),(d,(e,f,g)),h);")]:
+            arr = tree.distance.get_node_distance_matrix(topology_only=True)
+            self.assertEqual(arr.dtype.kind, "i")
+            for idx1 in range(tree.nnodes):
+                for idx2 in range(tree.nnodes):
+                    path = tree.distance.get_node_path(idx1, idx2)
+                    self.assertEqual(arr[idx1, idx2], len(path) - 1)
+
+    def test_get_tip_distance_matrix(self):
+        """Tip-only matrix matches the tips of the full matrix."""
+        for tree in self.trees:
+            arr = tree.distance.get_node_distance_matrix()
+            tarr = tree.distance.get_tip_distance_matrix()
+            self.assertEqual(tarr.shape, (tree.ntips, tree.ntips))
+            self.assertTrue(np.allclose(arr[:tree.ntips, :tree.ntips], tarr))
+
+        # float32 and memory-mapped output
+        tarr32 = tree.distance.get_tip_distance_matrix(dtype=np.float32)
+        self.assertEqual(tarr32.dtype, np.float32)
+        self.assertTrue(np.allclose(tarr, tarr32, atol=1e-4))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "dists.npy")
+            marr = tree.distance.get_tip_distance_matrix(memmap=path)
+            marr.flush()
+            self.assertTrue(np.allclose(np.load(path), tarr))
+            del marr
+
 
 
 if __name__ == "__main__":
@@ -8,3 +8,257 @@ used to generate new results in R:::TreeDist for comparison.
 """
 
 # TODO...
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import toytree
+
+
+class TestTreedistMatrix(unittest.TestCase):
+    def setUp(self):
+        self.trees = [toytree.rtree.unittree(8, seed=i) for i in range(5)]
+        self.trees[2] = self.trees[2].mod.collapse_nodes(12)
+
+    def get_expected(self, func, **kwargs):
+        """Return matrix from calling a pairwise function on all pairs."""
+        return np.array([
+            [func(i, j, **kwargs) if i is not j else 0 for j in self.trees]
+            for i in self.trees
+        ])
+
+    def test_matrix_matches_pairwise(self):
+        """Matrix values match each pairwise get_treedist function."""
+        dist = toytree.distance
+        for func in (dist.get_treedist_rf, dist.get_treedist_rfi, dist.get_treedist_rfg_mci):
+            for normalize in (False, True):
+                arr = dist.get_treedist_matrix(
+                    self.trees, metric=func, normalize=normalize, dtype=np.float64)
+                self.assertTrue(np.allclose(arr, arr.T))
+                self.assertTrue(np.allclose(arr, self.get_expected(func, normalize=normalize)))
+
+    def test_normalize_unsupported_raises(self):
+        """Metrics without a normalization raise an error if normalize=True."""
+        for metric in ("rfg_ms", "quartets", "kf"):
+            with self.assertRaises(toytree.utils.ToytreeError):
+                toytree.distance.get_treedist_matrix(self.trees, metric=metric, normalize=True)
+            arr = toytree.distance.get_treedist_matrix(self.trees, metric=metric)
+            self.assertEqual(arr.shape, (5, 5))
+
+    def test_multitree_parallel_memmap(self):
+        """MultiTree input, parallel blocks and memmap give same result."""
+        mtree = toytree.mtree(self.trees)
+        arr = toytree.distance.get_treedist_matrix(mtree, metric="rf")
+        self.assertEqual(arr.dtype, np.float32)
+        arr2 = toytree.distance.get_treedist_matrix(*self.trees, metric="rf", njobs=2)
+        self.assertTrue(np.array_equal(arr, arr2))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "rf.npy")
+            marr = toytree.distance.get_treedist_matrix(mtree, memmap=path)
+            marr.flush()
+            self.assertTrue(np.array_equal(np.load(path), arr))
+            del marr
+
+    def test_quartets(self):
+        """Quartet metrics are computed from cached per-tree data."""
+        arr = toytree.distance.get_treedist_matrix(
+            self.trees, metric="quartets", quartet_metric="steel_and_penny", df=True)
+        exp = self.get_expected(
+            toytree.distance._src.quartet_dist.get_quartet_metric,
+            metric="steel_and_penny")
+        self.assertTrue(np.allclose(arr.values, exp))
+
+    def test_kf_branch_score(self):
+        """KF matrix from sparse edge vectors matches pairwise distances."""
+        rng = np.random.default_rng(123)
+        trees = [i.copy() for i in self.trees + self.trees]
+        for tree in trees:
+            for node in tree[:-1]:
+                node._dist = rng.exponential()
+        self.trees = trees
+        exp = self.get_expected(toytree.distance.get_treedist_kf_branch_score)
+        arr = toytree.distance.get_treedist_matrix(trees, metric="kf", dtype=np.float64)
+        self.assertTrue(np.allclose(arr, exp))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "kf.npy")
+            marr = toytree.distance.get_treedist_matrix(trees, metric="kf", njobs=2, memmap=path)
+            marr.flush()
+            self.assertTrue(np.allclose(np.load(path), exp, atol=1e-5))
+            del marr
+
+        # identical trees have a distance of exactly zero, and small
+        # differences are not lost to rounding.
+        tree = trees[0]
+        tree2 = tree.set_node_data("dist", {0: tree[0].dist + 1e-6})
+        arr = toytree.distance.get_treedist_matrix(
+            [tree, trees[1], tree.copy(), tree2], metric="kf", dtype=np.float64)
+        self.assertEqual(arr[0, 2], 0)
+        self.assertEqual(arr[2, 0], 0)
+        self.assertTrue(np.allclose(arr[0, 3], 1e-6, rtol=1e-6, atol=0))
+
+        # rooting does not change the distance, only the edge lengths
+        tree = trees[0]
+        self.assertAlmostEqual(
+            toytree.distance.get_treedist_kf_branch_score(tree, tree.root("r3")), 0)
+        tree2 = tree.set_node_data("dist", {0: tree[0].dist + 3})
+        self.assertAlmostEqual(
+            toytree.distance.get_treedist_kf_branch_score(tree, tree2), 3)
+
+
+class TestTreedistRF(unittest.TestCase):
+    def setUp(self):
+        self.tree = toytree.rtree.unittree(12, seed=123)
+        self.trees = [toytree.rtree.unittree(12, seed=i) for i in range(6)]
+        self.trees[1] = self.trees[1].mod.collapse_nodes(14, 16)
+        self.trees[2] = self.trees[2].unroot()
+        self.trees[3] = self.tree.root("r5")
+
+    def test_one_to_many_matches_bipartition_sets(self):
+        """Cluster table RF matches symmetric difference of bipartitions."""
+        from toytree.distance._src.treedist import _get_bitmask_set, _get_rf_distance
+        for tree in self.trees:
+            for normalize in (False, True):
+                exp = [
+                    _get_rf_distance(_get_bitmask_set(tree), _get_bitmask_set(i), normalize)
+                    for i in self.trees
+                ]
+                arr = toytree.distance.get_treedist_rf_one_to_many(
+                    tree, toytree.mtree(self.trees), normalize=normalize)
+                self.assertTrue(np.allclose(arr, exp))
+        self.assertEqual(toytree.distance.get_treedist_rf(self.tree, self.trees[3]), 0)
+
+    def test_one_to_many_tip_mismatch(self):
+        """Trees with different tip names raise an error."""
+        other = self.tree.mod.drop_tips("r0")
+        with self.assertRaises(toytree.utils.ToytreeError):
+            toytree.distance.get_treedist_rf_one_to_many(self.tree, [other])
+
+
+class TestQuartetComparison(unittest.TestCase):
+    def test_counts_match_enumeration(self):
+        """Counted quartets match those from enumerating all quartets."""
+        from toytree.distance._src.quartet_dist import (
+            get_quartet_comparison,
+            get_quartet_resolutions_table,
+            _get_quartet_comparison_from_tables,
+        )
+        trees = [toytree.rtree.unittree(9, seed=i) for i in range(4)]
+        trees[1] = trees[1].mod.collapse_nodes(10, 12)
+        trees[2] = trees[2].unroot()
+        trees.append(toytree.tree("((r0,r1,r2),(r3,r4,r5),(r6,r7,r8));"))
+        for tree1 in trees:
+            for tree2 in trees:
+                exp = _get_quartet_comparison_from_tables(
+                    get_quartet_resolutions_table(tree1),
+                    get_quartet_resolutions_table(tree2))
+                self.assertEqual(get_quartet_comparison(tree1, tree2), exp)
+
+
+class TestSplitSimilarity(unittest.TestCase):
+    def setUp(self):
+        # trees from ?TreeDist::SharedPhylogeneticInfo
+        self.tree1 = toytree.tree('((((a, b), c), d), (e, (f, (g, h))));')
+        self.tree2 = toytree.tree('(((a, b), (c, d)), ((e, f), (g, h)));')
+
+    def test_matrix_matches_pairwise(self):
+        """Vectorized split similarity matches scores of each pair."""
+        from toytree.distance._src import treedist_utils as utils
+        funcs = {
+            "spi": utils._get_two_splits_shared_phylo_info,
+            "mci": utils._get_two_splits_entropy_info,
+            "msi": utils._get_two_splits_matching_split_phylo_info,
+            "ms": utils._get_two_splits_matching_split_dist,
+            "nye": utils._get_two_splits_nye_similarity,
+        }
+        tree1 = toytree.rtree.unittree(12, seed=123)
+        tree2 = toytree.rtree.unittree(12, seed=321).mod.collapse_nodes(14, 16)
+        for biparts1, biparts2 in [
+            (list(tree1.iter_bipartitions()), list(tree2.iter_bipartitions())),
+            (list(tree1.iter_bipartitions()), list(tree1.iter_bipartitions())),
+        ]:
+            incs = utils._get_incidence_matrices(biparts1, biparts2)
+            for metric, func in funcs.items():
+                arr = utils._get_split_similarity_matrix(*incs, metric)
+                exp = [[func(i, j) for j in biparts2] for i in biparts1]
+                self.assertTrue(np.allclose(arr, exp))
+
+    def test_treedist_values(self):
+        """Generalized RF values match those from R TreeDist."""
+        from toytree.distance._src import treedist_utils as utils
+        self.assertAlmostEqual(utils.get_trees_shared_phylo_info(self.tree1, self.tree2), 13.7528, places=3)
+        self.assertAlmostEqual(utils.get_trees_shared_phylo_info_dist(self.tree1, self.tree2), 14.3993, places=3)
+        self.assertAlmostEqual(utils.get_trees_mutual_clust_info(self.tree1, self.tree2), 3.0314, places=3)
+        self.assertAlmostEqual(utils.get_trees_matching_split_info(self.tree1, self.tree2), 17.0925, places=3)
+        self.assertAlmostEqual(toytree.distance.get_treedist_rfg_spi(self.tree1, self.tree1), 0)
+
+    def test_large_trees(self):
+        """Phylo info does not overflow for large trees."""
+        tree1 = toytree.rtree.unittree(300, seed=123)
+        tree2 = toytree.rtree.unittree(300, seed=321)
+        dist = toytree.distance.get_treedist_rfg_spi(tree1, tree2, normalize=True)
+        self.assertTrue(0 < dist < 1)
+
+
+
+class TestTreeMoveDists(unittest.TestCase):
+    def setUp(self):
+        self.tree1 = toytree.tree("((a,b),(c,(d,(e,f))));")
+        self.tree2 = toytree.tree("((a,(b,c)),(d,(e,f)));")
+
+    def test_nni_bounds(self):
+        """NNI bounds are 0 for same trees and 1 for one NNI apart."""
+        nni = toytree.distance.get_treedist_nni(self.tree1, self.tree1.unroot())
+        self.assertEqual(nni.tolist(), [0, 0])
+        tree = toytree.tree("((a,c),(b,(d,(e,f))));")
+        nni = toytree.distance.get_treedist_nni(self.tree1, tree)
+        self.assertEqual(nni.tolist(), [1, 1])
+        nni = toytree.distance.get_treedist_nni(self.tree1, self.tree2)
+        rf = toytree.distance.get_treedist_rf(self.tree1, self.tree2)
+        self.assertEqual(nni["lower"], rf / 2)
+        self.assertGreaterEqual(nni["upper"], nni["lower"])
+
+    def test_spr(self):
+        """SPR distance is 0 for same trees, and exact for one move."""
+        self.assertEqual(toytree.distance.get_treedist_spr(self.tree1, self.tree1.root("d")), 0)
+        self.assertEqual(toytree.distance.get_treedist_spr(self.tree1, self.tree2), 1)
+        tree3 = toytree.tree("((a,f),(c,(b,(e,d))));")
+        dist = toytree.distance.get_treedist_spr(self.tree1, tree3)
+        self.assertGreater(dist, 1)
+        self.assertEqual(toytree.distance.get_treedist_spr(self.tree1, tree3, max_dist=1), np.inf)
+
+    def test_spr_exact_small_trees(self):
+        """Search agrees with exact SPR distances by breadth first search."""
+        from toytree.distance._src.tree_move_dists import (
+            _get_state, _get_masks, _get_split_counts, _iter_spr_moves,
+            _apply_spr_move, _get_state_newick)
+        tree = toytree.rtree.rtree(6, seed=123)
+        labels = sorted(tree.get_tip_labels())
+        state = _get_state(tree, {j: 1 << i for i, j in enumerate(labels)})
+        dists = {frozenset(_get_split_counts(state, _get_masks(state))): (0, state)}
+        front = [state]
+        for dist in range(1, 4):
+            new_front = []
+            for state in front:
+                for _, s, t in _iter_spr_moves(state, _get_masks(state), {}, set()):
+                    new = _apply_spr_move(state, s, t)
+                    key = frozenset(_get_split_counts(new, _get_masks(new)))
+                    if key not in dists:
+                        dists[key] = (dist, new)
+                        new_front.append(new)
+            front = new_front
+        self.assertEqual(len(dists), 105)
+        for dist, state in dists.values():
+            other = toytree.tree(_get_state_newick(state, labels))
+            self.assertEqual(toytree.distance.get_treedist_spr(tree, other), dist)
+
+    def test_polytomy_raises(self):
+        """Tree move distances require bifurcating trees."""
+        tree = toytree.tree("((a,b,c),(d,(e,f)));")
+        with self.assertRaises(toytree.utils.ToytreeError):
+            toytree.distance.get_treedist_nni(self.tree1, tree)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -6,12 +6,22 @@ Methods
 -------
 iter_bipartitions
 
+Bitmasks
+--------
+With `type="bitmask"` each bipartition is encoded as a single int in
+which bit i is set if the i-th tip label (in a fixed ordering of tip
+labels) is on one side of the split. Masks are built bottom-up by
+OR-ing the masks of child Nodes, and compared or hashed as ints, which
+is much faster than comparing sets of str names.
 """
 
-from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable, Sequence
+from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable, Sequence, Union
+import numpy as np
 from loguru import logger
 from toytree import Node, ToyTree
 from toytree.core.apis import TreeEnumAPI, add_subpackage_method, add_toytree_method
+from toytree.core.cache import get_cached, _get_tip_features_key
+from toytree.utils import ToytreeError
 
 logger = logger.bind(name="toytree")
 Query = TypeVar("Query")
@@ -22,6 +32,82 @@ __all__ = [
 ]
 
 
+def _iter_bipartition_bitmasks(
+    tree: ToyTree,
+    include_singleton_partitions: bool = False,
+    sort: bool = False,
+    tip_labels: Optional[Sequence[str]] = None,
+) -> Iterator[int]:
+    """Generator to yield bipartitions as int bitmasks over tip labels.
+
+    Bipartitions are yielded in the same idx order as
+    `_iter_bipartition_sets`. If sort=False each mask has bits set
+    for the tips below the edge (child side). If sort=True the mask
+    is canonicalized by complementing it (relative to the tips in
+    the tree) if needed, such that it is the smaller side, or if
+    the same size, the side with the lowest set bit.
+
+    Parameters
+    ----------
+    tip_labels: Sequence[str] or None
+        The tip label ordering, where the i-th label is bit i. Trees
+        compared by bitmasks must use the same ordering. Default is
+        the sorted tip labels of the tree. Labels can include names
+        that are not in the tree.
+    """
+    if tip_labels is None:
+        tip_labels = sorted(tree.get_tip_labels())
+    bits = {name: 1 << i for i, name in enumerate(tip_labels)}
+
+    # fill masks for tips then OR child masks in idx order.
+    nodes = tree._idx_dict
+    masks = [0] * tree.nnodes
+    for idx in range(tree.ntips):
+        try:
+            masks[idx] = bits[nodes[idx]._name]
+        except KeyError as inst:
+            raise ToytreeError(
+                f"tip label {nodes[idx]._name} is not in tip_labels") from inst
+    for idx in range(tree.ntips, tree.nnodes):
+        mask = 0
+        for child in nodes[idx]._children:
+            mask |= masks[child._idx]
+        masks[idx] = mask
+    full = masks[-1]
+
+    # do not include root node, or the one redundant split at the
+    # root of a rooted tree.
+    topnode = tree.nnodes - 2 if tree.is_rooted() else tree.nnodes - 1
+    start = 0 if include_singleton_partitions else tree.ntips
+    for idx in range(start, topnode):
+        mask = masks[idx]
+        if sort:
+            other = full ^ mask
+            bsize = bin(mask).count("1")
+            osize = bin(other).count("1")
+            if (osize < bsize) or (osize == bsize and (other & -other) < (mask & -mask)):
+                mask = other
+        yield mask
+
+
+def _bitmasks_to_array(masks: Sequence[int], ntips: int) -> np.ndarray:
+    """Return a (nmasks, ntips) uint8 array of 0/1 from int bitmasks."""
+    nbytes = (ntips + 7) // 8
+    buff = b"".join(i.to_bytes(nbytes, "little") for i in masks)
+    arr = np.frombuffer(buff, dtype=np.uint8).reshape(len(masks), nbytes)
+    return np.unpackbits(arr, axis=1, bitorder="little")[:, :ntips]
+
+
+def _bitmask_to_names(mask: int, tip_labels: Sequence[str]) -> frozenset:
+    """Return a frozenset of the tip labels whose bits are set in mask."""
+    names = []
+    while mask:
+        low = mask & -mask
+        names.append(tip_labels[low.bit_length() - 1])
+        mask ^= low
+    return frozenset(names)
+
+
 @add_subpackage_method(TreeEnumAPI)
 def _iter_bipartition_sets(
     tree: ToyTree,
@@ -121,9 +207,10 @@ def iter_bipartitions(
     feature: Optional[str] = "name",
     include_singleton_partitions: bool = False,
     include_internal_nodes: bool = False,
-    type: Callable = set,
+    type: Union[Callable, str] = set,
     sort: bool = False,
-) -> Iterator[Tuple[Sequence, Sequence]]:
+    tip_labels: Optional[Sequence[str]] = None,
+) -> Iterator[Union[Tuple[Sequence, Sequence], int]]:
     """Generator of bipartitions (Nodes on either side of edges).
 
     Bipartitions represent the splits in a tree. Many algorithms compare
@@ -140,6 +227,9 @@ def iter_bipartitions(
     the argument `sort`.
     - The type used to represent a partition can be toggled using the
     argument `type`. Common formats are `set` or `tuple`.
+    - `type="bitmask"` instead yields each bipartition as a single int
+    with bits set for tips on one side of the split. This is the
+    fastest format for comparing or counting splits among trees.
 
     Parameters
     ----------
@@ -158,11 +248,16 @@ def iter_bipartitions(
         bipartition, but internal Nodes can be included as well. In
         this case the results are easier to interpret if the returned
         values have unique features (e.g., feature=None or 'idx').
-    type: Callable
+    type: Callable or str
         The type of collection used to represent a partition. Default
         is `set` to return a tuple of sets, but another useful option
         is `tuple`, which returns a tuple of tuples. The latter
-        collection can be converted into a set of bipartitions.
+        collection can be converted into a set of bipartitions. If
+        "bitmask" each bipartition is returned as an int, where bit i
+        is set if the i-th tip label is in the partition below the
+        edge, or if sort=True, in the smaller partition (ties are
+        broken by the lowest bit). The `feature` arg is ignored, and
+        `include_internal_nodes` is not supported.
     sort: bool
         If False, bipartitions are returned as (child, parent) order
         given the topology and rooting in Node idx order traversal. If
@@ -171,6 +266,10 @@ def iter_bipartitions(
         lowest alphanumeric tip name, e.g., ({'a', 'b'}, {'c', 'd'}).
         If the requested partition `type` is sortable (i.e., not a set)
         then items within a partition are also consistently sorted.
+    tip_labels: Sequence[str] or None
+        Only used with type="bitmask". The ordering of tip labels that
+        bits represent. Default is the sorted tip labels of the tree.
+        Use the same ordering to compare bitmasks among trees.
 
     Examples
     --------
@@ -208,7 +307,50 @@ def iter_bipartitions(
     >>> x = set(tree.root('a').iter_bipartitions(type=tuple, sort=True))
     >>> y = set(tree.root('e').iter_bipartitions(type=tuple, sort=True))
     >>> assert x == y
+
+    >>> # bitmasks over sorted tip names (a=1, b=2, c=4, ...)
+    >>> list(tree.iter_bipartitions(type="bitmask", sort=True))
+    >>> # [12, 48, 3]
     """
+    # bipartitions of immutable types are cached on the tree, keyed by
+    # the args and the tip features they depend on.
+    cacheable = (
+        (type in (tuple, frozenset, "bitmask"))
+        and (feature is not None)
+        and (not include_internal_nodes)
+    )
+    if cacheable:
+        key = (
+            "bipartitions", feature, include_singleton_partitions, type, sort,
+            None if tip_labels is None else tuple(tip_labels),
+            _get_tip_features_key(tree, "name", feature),
+        )
+        yield from get_cached(tree, key, lambda: tuple(_iter_bipartitions(
+            tree, feature, include_singleton_partitions, include_internal_nodes,
+            type, sort, tip_labels)))
+    else:
+        yield from _iter_bipartitions(
+            tree, feature, include_singleton_partitions, include_internal_nodes,
+            type, sort, tip_labels)
+
+
+def _iter_bipartitions(
+    tree: ToyTree,
+    feature: Optional[str],
+    include_singleton_partitions: bool,
+    include_internal_nodes: bool,
+    type: Union[Callable, str],
+    sort: bool,
+    tip_labels: Optional[Sequence[str]],
+) -> Iterator[Union[Tuple[Sequence, Sequence], int]]:
+    """Generator of bipartitions, without caching (see iter_bipartitions)."""
+    if type == "bitmask":
+        if include_internal_nodes:
+            raise ToytreeError("type='bitmask' only represents tip Nodes.")
+        yield from _iter_bipartition_bitmasks(
+            tree, include_singleton_partitions, sort, tip_labels)
+        return
+
     kwargs = dict(
         tree=tree,
         feature=feature,
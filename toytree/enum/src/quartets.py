@@ -16,6 +16,9 @@ Get fast unordered sets of all combinations of 4 tip Nodes in a tree
 Get name-ordered tuples of Nodes for each quartet induced by bipartitions in a tree.
 >>> tree.enum.iter_quartets()                   # ((0, 1), (2, 3)), ...
 
+Get chunks of quartets as (k, 4) arrays of tip idxs, where each row is ab|cd.
+>>> tree.enum.iter_quartet_arrays()             # array([[0, 1, 2, 3], ...]), ...
+
 See Also
 --------
 Get number of quartets induced by the splits in a tree.
@@ -40,6 +43,7 @@ Not supported:
 
 from typing import TypeVar, Iterator, Tuple, Optional, Set, Callable
 import itertools
+import numpy as np
 from loguru import logger
 from toytree import Node, ToyTree
 from toytree.core.apis import TreeEnumAPI, add_subpackage_method, add_toytree_method
@@ -52,6 +56,7 @@ __all__ = [
     "_iter_unresolved_quartet_sets",
     "_iter_quartet_sets",
     "iter_quartets",
+    "iter_quartet_arrays",
 ]
 
 
@@ -134,20 +139,143 @@ def _iter_quartet_sets(
             for i, j, x, y in pairgen:
                 yield i, j, x, y
 
-    # generate full collection of quartets from bipartitions
+    # generate full collection of quartets from bipartitions, where
+    # each quartet is generated only once (see `iter_quartet_arrays`).
+    else:
+        nodes = tree[:tree.ntips]
+        if feature is not None:
+            nodes = [getattr(node, feature) for node in nodes]
+        for arr in iter_quartet_arrays(tree):
+            for i, j, x, y in arr.tolist():
+                yield nodes[i], nodes[j], nodes[x], nodes[y]
+
+
+def _get_pair_product(pairs0: np.ndarray, pairs1: np.ndarray) -> np.ndarray:
+    """Return (n0 * n1, 4) array of all combinations of two pair arrays."""
+    return np.concatenate([
+        np.repeat(pairs0, pairs1.shape[0], axis=0),
+        np.tile(pairs1, (pairs0.shape[0], 1)),
+    ], axis=1)
+
+
+def _iter_pair_product_blocks(
+    pairs0: np.ndarray, pairs1: np.ndarray, max_size: int,
+) -> Iterator[np.ndarray]:
+    """Yield blocks of rows of the product of two pair arrays."""
+    step0 = max(1, max_size // max(1, pairs1.shape[0]))
+    step1 = max(1, min(max_size, pairs1.shape[0]))
+    for start0 in range(0, pairs0.shape[0], step0):
+        for start1 in range(0, pairs1.shape[0], step1):
+            yield _get_pair_product(
+                pairs0[start0:start0 + step0], pairs1[start1:start1 + step1])
+
+
+def _get_cross_pairs(*tips: np.ndarray) -> np.ndarray:
+    """Return (n, 2) array of sorted pairs of tips from different groups."""
+    pairs = [
+        np.stack(np.meshgrid(i, j, indexing="ij"), axis=-1).reshape(-1, 2)
+        for i, j in itertools.combinations(tips, 2)
+    ]
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int32)
+    return np.sort(np.concatenate(pairs), axis=1).astype(np.int32)
+
+
+def _iter_bipartition_quartet_blocks(tree: ToyTree, max_size: int) -> Iterator[np.ndarray]:
+    """Yield blocks of quartets induced by bipartitions, each only once.
+
+    A resolved quartet ab|cd is yielded at the Node that is the MRCA
+    of a and b, for which c and d are not descendants. For one pair
+    this MRCA is always below the other pair, but if the MRCA of c
+    and d also excludes a and b (the two clades are disjoint) then it
+    is only yielded at the one visited first in idx order. Thus at
+    each Node a and b are sampled from two different children, and c
+    and d from any two different clades hanging off of the path to
+    the root, or from within a single clade that is visited later.
+    """
+    tip_ranges = tree._get_lca_index().tip_ranges
+    for node in tree[tree.ntips:tree.nnodes - 1]:
+        # pairs of tips below this Node in different child clades
+        below = [np.arange(*tip_ranges[i._idx] + (0, 1)) for i in node._children]
+        pairs0 = _get_cross_pairs(*below)
+
+        # clades outside of this Node and whether they are before it
+        start = tip_ranges[node._idx, 0]
+        outside = []
+        child, parent = node, node._up
+        while parent is not None:
+            for sister in parent._children:
+                if sister is not child:
+                    outside.append(np.arange(*tip_ranges[sister._idx] + (0, 1)))
+            child, parent = parent, parent._up
+        pairs1 = [_get_cross_pairs(*outside)]
+        for tips in outside:
+            if tips[0] > start:
+                idxs = np.triu_indices(tips.size, 1)
+                pairs1.append(np.stack([tips[idxs[0]], tips[idxs[1]]], axis=1))
+        pairs1 = np.concatenate(pairs1).astype(np.int32)
+        yield from _iter_pair_product_blocks(pairs0, pairs1, max_size)
+
+
+def _iter_quadripartition_quartet_blocks(tree: ToyTree, max_size: int) -> Iterator[np.ndarray]:
+    """Yield blocks of quartets induced by quadripartitions."""
+    kwargs = dict(feature="idx", type=set, sort=False)
+    for (i, j), (x, y) in tree.enum.iter_quadripartitions(**kwargs):
+        pairs0 = _get_cross_pairs(np.array(sorted(i)), np.array(sorted(j)))
+        pairs1 = _get_cross_pairs(np.array(sorted(x)), np.array(sorted(y)))
+        yield from _iter_pair_product_blocks(pairs0, pairs1, max_size)
+
+
+@add_subpackage_method(TreeEnumAPI)
+def iter_quartet_arrays(
+    tree: ToyTree,
+    chunksize: int = 100_000,
+    quadripartitions: bool = False,
+) -> Iterator[np.ndarray]:
+    """Generator to yield chunks of quartets as arrays of tip idxs.
+
+    Each chunk is an int32 array of shape (k, 4), where k is at most
+    `chunksize` (only the last chunk can be shorter), and each row
+    (a, b, c, d) represents a quartet `ab|cd` induced by an edge in
+    the tree, with a < b and c < d. Each quartet is generated exactly
+    once without storing those that were already observed, so memory
+    use is bounded by the chunksize (and O(ntips^2) per Node) rather
+    than by the number of quartets, which grows as O(ntips^4).
+
+    Parameters
+    ----------
+    chunksize: int
+        Max number of quartets in each yielded array.
+    quadripartitions: bool
+        If True then quartets are only returned that are induced by
+        quadripartitite splits in a the tree.
+
+    Example
+    -------
+    >>> tree = toytree.rtree.unittree(50, seed=123)
+    >>> for arr in tree.enum.iter_quartet_arrays(chunksize=10_000):
+    >>>     names = np.array(tree.get_tip_labels())[arr]
+    """
+    if quadripartitions:
+        blocks = _iter_quadripartition_quartet_blocks(tree, chunksize)
     else:
-        observed = set()
-        for below, above in tree.iter_bipartitions(**kwargs):
-            # generator to sample 2 from either side of each bipart
-            pairgen = itertools.product(
-                itertools.combinations(below, 2),
-                itertools.combinations(above, 2),
-            )
-            for (i, j), (x, y) in pairgen:
-                qrt = frozenset((i, j, x, y))
-                if qrt not in observed:
-                    yield i, j, x, y
-                    observed.add(qrt)
+        blocks = _iter_bipartition_quartet_blocks(tree, chunksize)
+
+    # concatenate small blocks into chunks of chunksize
+    chunks = []
+    size = 0
+    for block in blocks:
+        chunks.append(block)
+        size += block.shape[0]
+        if size >= chunksize:
+            arr = np.concatenate(chunks)
+            while arr.shape[0] >= chunksize:
+                yield arr[:chunksize]
+                arr = arr[chunksize:]
+            chunks = [arr]
+            size = arr.shape[0]
+    if size:
+        yield np.concatenate(chunks)
 
 
 @add_toytree_method(ToyTree)
@@ -210,35 +338,30 @@ def iter_quartets(
 
     >>> # get quartets for each (child, parent) edge in idx order
     >>> list(tree.iter_quartets())
-    >>> # [({'c', 'd'}, {'e', 'f'}),
+    >>> # [({'c', 'd'}, {'a', 'e'}),
     >>> #  ({'c', 'd'}, {'a', 'f'}),
-    >>> #  ({'c', 'd'}, {'b', 'f'}),
-    >>> #  ({'c', 'd'}, {'a', 'e'}),
     >>> #  ({'c', 'd'}, {'b', 'e'}),
+    >>> #  ({'c', 'd'}, {'b', 'f'}),
     >>> #  ({'c', 'd'}, {'a', 'b'}),
-    >>> #  ({'e', 'f'}, {'a', 'd'}),
-    >>> #  ({'e', 'f'}, {'c', 'd'}),
-    >>> #  ({'e', 'f'}, {'b', 'd'}),
+    >>> #  ({'c', 'd'}, {'e', 'f'}),
     >>> #  ({'e', 'f'}, {'a', 'c'}),
-    >>> #  ({'e', 'f'}, {'a', 'b'}),
+    >>> #  ({'e', 'f'}, {'a', 'd'}),
     >>> #  ({'e', 'f'}, {'b', 'c'}),
-    >>> #  ({'d', 'e'}, {'a', 'b'}),
-    >>> #  ({'d', 'f'}, {'a', 'b'}),
-    >>> #  ({'c', 'd'}, {'a', 'b'}),
+    >>> #  ({'e', 'f'}, {'b', 'd'}),
     >>> #  ({'e', 'f'}, {'a', 'b'}),
     >>> #  ({'c', 'e'}, {'a', 'b'}),
-    >>> #  ({'c', 'f'}, {'a', 'b'})]
+    >>> #  ({'c', 'f'}, {'a', 'b'}),
+    >>> #  ({'d', 'e'}, {'a', 'b'}),
+    >>> #  ({'d', 'f'}, {'a', 'b'})]
 
     >>> # get same quartets consistently ordered and in simpler format
     >>> sorted(tree.iter_quartets(type=tuple, sort=True, collapse=True))
     >>> # [('a', 'b', 'c', 'd'),
-    >>> #  ('a', 'b', 'c', 'd'),
     >>> #  ('a', 'b', 'c', 'e'),
     >>> #  ('a', 'b', 'c', 'f'),
     >>> #  ('a', 'b', 'd', 'e'),
     >>> #  ('a', 'b', 'd', 'f'),
     >>> #  ('a', 'b', 'e', 'f'),
-    >>> #  ('a', 'b', 'e', 'f'),
     >>> #  ('a', 'c', 'e', 'f'),
     >>> #  ('a', 'd', 'e', 'f'),
     >>> #  ('a', 'e', 'c', 'd'),
@@ -247,7 +370,6 @@ def iter_quartets(
     >>> #  ('b', 'd', 'e', 'f'),
     >>> #  ('b', 'e', 'c', 'd'),
     >>> #  ('b', 'f', 'c', 'd'),
-    >>> #  ('c', 'd', 'e', 'f'),
     >>> #  ('c', 'd', 'e', 'f')]
     """
     # disallowed combinations
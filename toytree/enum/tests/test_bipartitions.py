@@ -134,6 +134,26 @@ class TestBipartitions(unittest.TestCase):
         self.assertEqual(b1, b2)
         self.assertEqual(b2, b3)
 
+    def test_iter_bipartitions_bitmask(self):
+        """Bitmasks over sorted tip names match sorted frozensets."""
+        names = sorted(self.tree1.get_tip_labels())
+        for tree in self.trees:
+            for sort in (False, True):
+                masks = iter_bipartitions(tree, type="bitmask", sort=sort)
+                sets = iter_bipartitions(tree, type=frozenset, sort=sort)
+                for mask, bipart in zip(masks, sets):
+                    part = {j for i, j in enumerate(names) if mask & (1 << i)}
+                    self.assertEqual(part, bipart[0])
+
+    def test_iter_bipartitions_bitmask_root_equality(self):
+        """Canonical bitmasks are the same regardless of rooting."""
+        b1 = set(self.tree1.iter_bipartitions(type="bitmask", sort=True))
+        b2 = set(self.tree2.iter_bipartitions(type="bitmask", sort=True))
+        b3 = set(self.tree3.iter_bipartitions(type="bitmask", sort=True))
+        self.assertEqual(b1, {0b001100, 0b110000, 0b000011})
+        self.assertEqual(b1, b2)
+        self.assertEqual(b2, b3)
+
 
 if __name__ == "__main__":
 
@@ -37,9 +37,11 @@ test_list
     test_list_quad
 """
 
+import itertools
 import unittest
 import toytree
-from toytree.enum import _iter_unresolved_quartet_sets, _iter_quartet_sets, iter_quartets
+import numpy as np
+from toytree.enum import _iter_unresolved_quartet_sets, _iter_quartet_sets, iter_quartets, iter_quartet_arrays
 
 
 class TestQuartets(unittest.TestCase):
@@ -287,6 +289,29 @@ class TestQuartets(unittest.TestCase):
         parts = list(_iter_unresolved_quartet_sets(self.tree1, feature = 'name'))
         self.assertEqual(parts, PARTS)
 
+    def test_iter_quartet_arrays(self):
+        """Chunks of quartets contain each induced quartet exactly once."""
+        trees = self.trees + [
+            toytree.rtree.unittree(12, seed=123).unroot(),
+            toytree.rtree.unittree(12, seed=123).mod.collapse_nodes(13, 15),
+        ]
+        for tree in trees:
+            chunks = list(iter_quartet_arrays(tree, chunksize=7))
+            self.assertTrue(all(i.shape[0] == 7 for i in chunks[:-1]))
+            arr = np.concatenate(chunks)
+            self.assertTrue(np.all(arr[:, 0] < arr[:, 1]))
+            self.assertTrue(np.all(arr[:, 2] < arr[:, 3]))
+            qrts = [frozenset((frozenset(i[:2]), frozenset(i[2:]))) for i in arr.tolist()]
+            self.assertEqual(len(qrts), len(set(qrts)))
+
+            # same quartets as sampling 2 tips from each side of each split
+            expected = set()
+            for below, above in tree.iter_bipartitions(feature="idx", type=set):
+                for i in itertools.combinations(below, 2):
+                    for j in itertools.combinations(above, 2):
+                        expected.add(frozenset((frozenset(i), frozenset(j))))
+            self.assertEqual(set(qrts), expected)
+
 
 if __name__ == "__main__":
 
@@ -8,9 +8,11 @@
 from toytree.infer.src.upgma import upgma_tree
 from toytree.infer.src.neighbor_joining import neighbor_joining_tree
 from toytree.infer.src.consensus import get_consensus_tree, get_consensus_features
+from toytree.infer.src.parsimony import get_parsimony_score, Parsimony
+from toytree.infer.src.parsimony_search import parsimony_tree_search
 
 # requires sympy which is not yet in conda recipe, so for now
 # you need to call the following to access the likelihood code:
 # >>> from toytree.infer.src import maximum_likelihood
-# >>> from toytree.infer.src.maximum_likelihood import JC69, K80, TN93, get_tree_likelihood, get_tree_likelihood_plot_gen
+# >>> from toytree.infer.src.maximum_likelihood import JC69, K80, TN93, get_tree_likelihood, get_tree_loglikelihood, get_tree_likelihood_plot_gen
 
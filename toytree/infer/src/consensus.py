@@ -33,9 +33,10 @@ TODO
 
 """
 
-from typing import TypeVar, Union, List, Dict
+from typing import TypeVar, Union, List, Dict, Iterator
 import numpy as np
 from toytree.core import ToyTree, Node
+from toytree.enum.src.bipartitions import _bitmask_to_names
 from loguru import logger
 
 MultiTree = TypeVar("MultiTree")
@@ -62,7 +63,7 @@ def check_trees_set_for_ultrametric(trees: List[ToyTree]) -> None:
             raise ValueError(msg)
 
 
-def get_clade_frequencies(trees: Union[MultiTree, List[ToyTree]]) -> Dict[frozenset, float]:
+def get_clade_frequencies(trees: Union[MultiTree, List[ToyTree], Iterator[ToyTree]]) -> Dict[frozenset, float]:
     """Return a dict mapping bipartitions to their frequencies and dists.
 
     This performs one pass through each tree to get its bipartitions
@@ -72,24 +73,34 @@ def get_clade_frequencies(trees: Union[MultiTree, List[ToyTree]]) -> Dict[frozen
 
     Parameters
     ----------
-    trees: MultiTree | list[ToyTree]
+    trees: MultiTree | list[ToyTree] | Iterator[ToyTree]
         A collection of ToyTrees (list or MultiTree object) sharing the
-        same tip labels.
+        same tip labels, or an iterator of ToyTrees (e.g., from
+        `toytree.io.iter_trees`) which is consumed in a single pass.
     """
     # require all trees to share the same tips
     # ... TODO: use MultiTree... or do this outside this func.
 
-    # dict to store clade occurrences. Set full tip set to freq=1.0.
-    ntrees = len(trees)
-    all_tips = frozenset(trees[0].get_tip_labels())
-    clades = {all_tips: {"count": ntrees}}
+    # dict to store clade occurrences keyed by int bitmasks over the
+    # sorted tip names. Set full tip set to freq=1.0 (its count is set
+    # to ntrees after the pass over all trees).
+    ntrees = 0
+    tip_labels = None
+    clades = {}
 
     # iterate over the input tree set
     for tre in trees:
-
-        # iterate over splits in the tree as (fset, fset)
-        iter_biparts = tre.iter_bipartitions("name", True, False, type=frozenset, sort=True)
-        for node, bipart in zip(tre, iter_biparts):
+        ntrees += 1
+        if tip_labels is None:
+            tip_labels = sorted(tre.get_tip_labels())
+            all_tips = (1 << len(tip_labels)) - 1
+            clades[all_tips] = {"count": 0}
+
+        # iterate over splits in the tree as canonical int bitmasks
+        iter_biparts = tre.iter_bipartitions(
+            include_singleton_partitions=True, type="bitmask", sort=True,
+            tip_labels=tip_labels)
+        for node, part in zip(tre, iter_biparts):
 
             # get node dist; extra if root edge and tree is rooted.
             dist = node._dist
@@ -98,13 +109,19 @@ def get_clade_frequencies(trees: Union[MultiTree, List[ToyTree]]) -> Dict[frozen
                     dist = sum(node._dist for i in node._up.children)
 
             # store the partition count and dist
-            part = bipart[0]
             if part not in clades:
                 clades[part] = {"count": 1, "dist": [dist]}
             else:
                 clades[part]["count"] += 1
                 clades[part]["dist"].append(dist)
 
+    if not ntrees:
+        raise ValueError("cannot get clade frequencies from an empty set of trees.")
+    clades[all_tips]["count"] = ntrees
+
+    # convert bitmask keys to frozensets of tip names
+    clades = {_bitmask_to_names(i, tip_labels): j for i, j in clades.items()}
+
     # sort clades by occurrence
     sclades = sorted(clades, key=lambda x: clades[x]["count"], reverse=True)
 
@@ -323,8 +340,9 @@ def get_consensus_features(
     ----------
     tree: ToyTree
         The tree can be the MJ consensus tree or a user input tree.
-    trees: MultiTree | list[ToyTree]
-        A list of trees from which features will be extracted. Support
+    trees: MultiTree | list[ToyTree] | Iterator[ToyTree]
+        A list or iterator of trees from which features will be
+        extracted, in a single pass. Support
         is always measured. Edge lengths are extracted as 'dists' or
         'heights' depending on the option 'rooted'.
     features: None | list[str]
@@ -369,8 +387,10 @@ def map_unrooted_tree_supports_and_dists_to_unrooted_tree(
     # iterate over all input trees
     data = {}
     tips = {}
+    ntrees = 0
     for tre in trees:
-        
+        ntrees += 1
+
         # get this trees non-singleton biparts
         biparts2 = tre.iter_bipartitions("name", False, False, type=frozenset, sort=True)
         
@@ -418,7 +438,7 @@ def map_unrooted_tree_supports_and_dists_to_unrooted_tree(
     # iterate over input tree nodes and splits
     for node, bipart in zip(tree[tree.ntips:], biparts):
         if bipart in data:
-            node.support = data[bipart]["count"] / len(trees)
+            node.support = data[bipart]["count"] / ntrees
             setattr(node, "dist_mean", np.mean(data[bipart]["dist"]))
             setattr(node, "dist_min", np.min(data[bipart]["dist"]))
             setattr(node, "dist_max", np.max(data[bipart]["dist"]))
@@ -452,9 +472,6 @@ def map_rooted_tree_supports_and_heights_to_rooted_tree(
     """
 
     """
-    # check that rooted is valid
-    check_trees_set_for_ultrametric(trees)
-
     # create a copy of the input tree and set support values to zero
     tree = tree.copy().set_node_data("support", default=np.nan)
 
@@ -464,7 +481,12 @@ def map_rooted_tree_supports_and_heights_to_rooted_tree(
     # iterate over all input trees
     data = {}
     # tips = {}
+    ntrees = 0
     for tre in trees:
+        ntrees += 1
+
+        # check that rooted is valid
+        check_trees_set_for_ultrametric([tre])
 
         # get this trees clades
         tclades = {i: frozenset(i.get_leaf_names()) for i in tre[tre.ntips:]}
@@ -480,7 +502,7 @@ def map_rooted_tree_supports_and_heights_to_rooted_tree(
     # iterate over input tree nodes and splits
     for node, clade in zip(tree[tree.ntips:], clades):
         if clade in data:
-            node.support = data[clade]["count"] / len(trees)
+            node.support = data[clade]["count"] / ntrees
             setattr(node, "height_mean", np.mean(data[clade]["height"]))
             setattr(node, "height_min", np.min(data[clade]["height"]))
             setattr(node, "height_max", np.max(data[clade]["height"]))
@@ -491,7 +513,7 @@ def map_rooted_tree_supports_and_heights_to_rooted_tree(
     return tree
 
 
-def get_consensus_tree(trees: Union[MultiTree, List[ToyTree]], min_freq: float=0.0) -> ToyTree:
+def get_consensus_tree(trees: Union[MultiTree, List[ToyTree], Iterator[ToyTree]], min_freq: float=0.0) -> ToyTree:
     """Return an exteded majority-rule consensus tree from a list of trees.
 
     The trees must contain the same set of tips. The returned tree will
@@ -505,8 +527,9 @@ def get_consensus_tree(trees: Union[MultiTree, List[ToyTree]], min_freq: float=0
 
     Parameters
     ----------
-    trees: MultiTree | list[ToyTree]
-        A MultiTree or list of ToyTrees sharing the same tip labels.
+    trees: MultiTree | list[ToyTree] | Iterator[ToyTree]
+        A MultiTree or list of ToyTrees sharing the same tip labels, or
+        an iterator of ToyTrees that is consumed in a single pass.
     min_freq: float
         A minimum frequency cutoff for a split to occur across the set
         of trees for it to be included in the consensus tree.
@@ -68,11 +68,16 @@ logger = logger.bind(name="toytree")
 def get_weighted_quartets_from_trees(
     trees: Union[MultiTree, list[ToyTree]],
     normalize: bool = False,
+    chunksize: int = 100_000,
 ) -> dict[tuple[frozenset,frozenset],float]:
     """Return {quartet: weight, ...} from a sequence of trees.
 
     The weight of each quartet is calculated as the number or
-    proportion of trees that contain that quartet.
+    proportion of trees that contain that quartet. Quartets are
+    enumerated from each tree in chunks of arrays of tip idxs, and
+    each chunk is merged into sorted counts of int64 codes as it
+    arrives, such that memory is bounded by the number of distinct
+    quartets plus one chunk, not by the number of trees.
 
     Parameters
     ----------
@@ -80,15 +85,46 @@ def get_weighted_quartets_from_trees(
         An input set of one or more ToyTree objects.
     normalize_by_ntrees: bool
         If True weights are returned as a frequency instead of a count.
+    chunksize: int
+        Max number of quartets enumerated from a tree at a time.
     """
-    # build weighted graph from quartets
-    qrt_counts = {}
+    # encode quartets ab|cd as ints using the sorted order of names
+    names = sorted(set().union(*(tree.get_tip_labels() for tree in trees)))
+    ranks = {name: idx for idx, name in enumerate(names)}
+    nnames = len(names)
+
+    # count the quartets in each tree, merging each chunk into the
+    # sorted array of unique codes as it arrives.
+    codes = np.zeros(0, dtype=np.int64)
+    counts = np.zeros(0, dtype=np.int64)
     for tree in trees:
-        for qrt in tree.enum.iter_quartets(type=frozenset, sort=True):
-            if qrt not in qrt_counts:
-                qrt_counts[qrt] = 1
-            else:
-                qrt_counts[qrt] += 1
+        tree_ranks = np.array([ranks[i] for i in tree.get_tip_labels()], dtype=np.int64)
+        for arr in tree.enum.iter_quartet_arrays(chunksize=chunksize):
+            qrts = tree_ranks[arr]
+            qrts[:, :2].sort(axis=1)
+            qrts[:, 2:].sort(axis=1)
+            swap = qrts[:, 0] > qrts[:, 2]
+            qrts[swap] = qrts[swap][:, [2, 3, 0, 1]]
+            chunk = ((qrts[:, 0] * nnames + qrts[:, 1]) * nnames + qrts[:, 2]) * nnames + qrts[:, 3]
+
+            # each quartet occurs once per tree, so a chunk has no
+            # repeats. Increment counts of known codes, insert new.
+            chunk.sort()
+            pos = np.searchsorted(codes, chunk)
+            known = pos < codes.size
+            known[known] = codes[pos[known]] == chunk[known]
+            counts[pos[known]] += 1
+            codes = np.insert(codes, pos[~known], chunk[~known])
+            counts = np.insert(counts, pos[~known], 1)
+
+    # convert codes to (frozenset, frozenset) of names
+    qrt_counts = {}
+    for code, count in zip(codes.tolist(), counts.tolist()):
+        code, idx3 = divmod(code, nnames)
+        code, idx2 = divmod(code, nnames)
+        idx0, idx1 = divmod(code, nnames)
+        qrt = (frozenset((names[idx0], names[idx1])), frozenset((names[idx2], names[idx3])))
+        qrt_counts[qrt] = count
 
     # get weights as a proportion.
     if normalize:
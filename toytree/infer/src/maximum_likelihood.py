@@ -3,18 +3,24 @@
 """Maximum likelihood tree inference.
 
 A didactic version with visualizations for learning ML. Not 
-optimized for speed.
+optimized for speed, except for `get_tree_loglikelihood`, which
+computes the likelihood of all sites of an alignment by vectorized
+pruning over unique site patterns.
 """
 
 from typing import Iterator, Callable, Generator, List
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 from loguru import logger
 from numpy.typing import ArrayLike
 import numpy as np
+import pandas as pd
 import toyplot
 import toytree
+from toytree.utils import ToytreeError
+from toytree.infer.src.parsimony import _get_children_idxs, _get_state_bitmasks, _get_site_patterns
 
 logger = logger.bind(name="toytree")
 
@@ -102,6 +108,23 @@ class SubstitutionModel(ABC):
     def get_p_matrix_function(self):
         """Return a function to get P matrix given Q and d."""
 
+    @abstractmethod
+    def get_rate_matrix_array(self, *args):
+        """Return numeric rate matrix (Q) and equilibrium frequencies."""
+
+    def _get_normalized_rate_matrix(self, subs: dict, pi: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+        """Return Q as a float array where Q[i, j] is the rate from
+        state i to j (in BASE_ORDER) scaled to one expected change per
+        unit time, and pi as a float array.
+        """
+        q_matrix = np.array(self._q_matrix.subs(subs), dtype=float)
+        # some symbolic Q matrices are written with columns summing to 0.
+        if not np.allclose(q_matrix.sum(axis=1), 0):
+            q_matrix = q_matrix.T
+        pi = np.array(pi, dtype=float)
+        q_matrix /= -(np.diag(q_matrix) @ pi)
+        return q_matrix, pi
+
     @abstractmethod
     def get_pairwise_loglike_function(self, *args):
         """Return a function to return likelihood given a distance."""
@@ -228,6 +251,12 @@ class JC69(SubstitutionModel):
                              [p1, p1, p1, p0]])
         return _p_matrix_quick_func
 
+    def get_rate_matrix_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return numeric rate matrix (Q) and equilibrium frequencies,
+        scaled such that branch lengths are expected changes per site.
+        """
+        return self._get_normalized_rate_matrix({self._mu: 1}, self._PI)
+
 
 class K80(SubstitutionModel):
     """Kimura 1980 Substitution Model.
@@ -388,6 +417,17 @@ class K80(SubstitutionModel):
                                  [p2, p2, p1, p0]])
         return _p_matrix_quick_func
 
+    def get_rate_matrix_array(self, kappa: float = 2.) -> tuple[np.ndarray, np.ndarray]:
+        """Return numeric rate matrix (Q) and equilibrium frequencies,
+        scaled such that branch lengths are expected changes per site.
+
+        Parameters
+        ----------
+        kappa: float
+            transitional sites over transversional sites.
+        """
+        return self._get_normalized_rate_matrix({self._alpha: kappa, self._beta: 1}, self._PI)
+
 
 class TN93(SubstitutionModel):
     """Tamura and Nei (1993) Substitution Model.
@@ -600,6 +640,25 @@ class TN93(SubstitutionModel):
         else:
             return sympy.lambdify([self._d, self._kappa_1, self._kappa_2] + self._PI, p_matrix)
 
+    def get_rate_matrix_array(
+        self,
+        kappa_ls: tuple[float, float] = (2., 2.),
+        pi_ls: tuple[float, float, float, float] = (0.25, 0.25, 0.25, 0.25),
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return numeric rate matrix (Q) and equilibrium frequencies,
+        scaled such that branch lengths are expected changes per site.
+
+        Parameters
+        ----------
+        kappa_ls: tuple[float, float]
+            kappa_1 (alpha_1/beta) and kappa_2 (alpha_2/beta).
+        pi_ls: tuple[float, float, float, float]
+            Equilibrium frequencies of nucleotides in BASE_ORDER.
+        """
+        subs = {self._alpha_1: kappa_ls[0], self._alpha_2: kappa_ls[1], self._beta: 1}
+        subs.update(zip(self._PI, pi_ls))
+        return self._get_normalized_rate_matrix(subs, pi_ls)
+
 
 def node_conditional_probability(
     node: toytree.Node,
@@ -696,6 +755,141 @@ def get_tree_likelihood(
     return (root_prob * pi_list).sum()
 
 
+######################################################
+#
+# VECTORIZED PRUNING OVER ALL SITE PATTERNS
+#
+######################################################
+
+
+# partial likelihoods of tips in BASE_ORDER for each IUPAC bitmask
+# (A=1, C=2, G=4, T=8) as used in parsimony.
+TIP_PARTIALS = np.array([
+    [(mask >> bit) & 1 for bit in (3, 1, 0, 2)] for mask in range(16)
+], dtype=float)
+
+
+def get_tree_loglikelihood(
+    tree: toytree.ToyTree,
+    data: ArrayLike,
+    model: SubstitutionModel,
+    **model_params,
+) -> float:
+    """Return the log-likelihood of an alignment given a tree and model.
+
+    Felsenstein's pruning algorithm is applied to all unique site
+    patterns of the alignment at once, with partial likelihoods of
+    each Node stored as an array of shape (npatterns, 4), and the
+    log-likelihood of each pattern is weighted by its count. Tips can
+    have IUPAC ambiguity codes, which have a partial likelihood of 1
+    for each of the bases they represent. Transition probability
+    matrices are computed from an eigendecomposition of the rate
+    matrix, once for each unique edge length. Partial likelihoods are
+    rescaled at every Node to avoid underflow on large trees.
+
+    Edge lengths (Node .dist) are in units of expected substitutions
+    per site.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree with edge lengths.
+    data: dict | pd.DataFrame | ArrayLike
+        A dict mapping tip names to DNA sequences, a DataFrame of
+        single characters with tip names as index, or a sequence of
+        DNA strings (or 2-D array of characters) in tip idx order.
+    model: SubstitutionModel
+        A JC69, K80 or TN93 model instance.
+    **model_params:
+        Parameters of the model's `get_rate_matrix_array` function,
+        e.g., kappa=2.0 for K80, or kappa_ls and pi_ls for TN93.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(10, treeheight=0.2, seed=123)
+    >>> seqs = {i: "ACGTTA" for i in tree.get_tip_labels()}
+    >>> get_tree_loglikelihood(tree, seqs, K80(), kappa=2.0)
+    """
+    masks, counts = _get_tip_patterns(tree, data)
+    q_matrix, pi = model.get_rate_matrix_array(**model_params)
+    evals, evecs, ievecs = _get_eigen_system(tuple(q_matrix.ravel()), tuple(pi))
+    dists = np.array([tree[i]._dist for i in range(tree.nnodes - 1)], dtype=float)
+    p_matrices = _get_p_matrices(evals, evecs, ievecs, dists)
+
+    # postorder pruning, storing partials of Nodes whose parent has not
+    # yet been visited. Tips are looked up from P-transformed tables.
+    npatterns = masks.shape[1]
+    lnscale = np.zeros(npatterns)
+    partials = {}
+    for idx, children in enumerate(_get_children_idxs(tree), start=tree.ntips):
+        partial = np.ones((npatterns, 4))
+        for child in children:
+            if child < tree.ntips:
+                partial *= (TIP_PARTIALS @ p_matrices[child].T)[masks[child]]
+            else:
+                partial *= partials.pop(child) @ p_matrices[child].T
+        # patterns that are impossible on the tree (all partials are
+        # zero, e.g., different states on a zero-length path) are not
+        # rescaled, and have a log-likelihood of -inf.
+        scale = partial.max(axis=1)
+        scale[scale == 0] = 1.
+        partial /= scale[:, None]
+        lnscale += np.log(scale)
+        partials[idx] = partial
+    with np.errstate(divide="ignore"):
+        site_loglik = np.log(partials[tree.nnodes - 1] @ pi) + lnscale
+    return float(site_loglik @ counts)
+
+
+def _get_tip_patterns(tree: toytree.ToyTree, data: ArrayLike) -> tuple[np.ndarray, np.ndarray]:
+    """Return IUPAC bitmasks of unique site patterns of shape
+    (ntips, npatterns) with rows in tip idx order, and their counts.
+    """
+    # dict of sequences -> list of strings in tip idx order.
+    if isinstance(data, dict):
+        try:
+            data = [str(data[i]) for i in tree.get_tip_labels()]
+        except KeyError as exc:
+            raise ToytreeError(f"tip name {exc} not in data.") from exc
+    masks, _ = _get_state_bitmasks(data, data_as_dna=True)
+    if masks.shape[0] != tree.ntips:
+        raise ToytreeError(
+            f"data has {masks.shape[0]} rows but tree has {tree.ntips} tips.")
+    if isinstance(data, pd.DataFrame):
+        rows = {j: i for i, j in enumerate(data.index)}
+        try:
+            masks = masks[[rows[tree[i].name] for i in range(tree.ntips)]]
+        except KeyError as exc:
+            raise ToytreeError(f"tip name {exc} not in data.") from exc
+    return _get_site_patterns(masks, informative_only=False)
+
+
+@lru_cache(maxsize=64)
+def _get_eigen_system(q_values: tuple, pi: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return eigenvalues, eigenvectors and inverse eigenvectors of a
+    reversible rate matrix, such that Q = U diag(w) U^-1.
+
+    The matrix is symmetrized by the square roots of pi, such that a
+    symmetric (stable) eigendecomposition can be used.
+    """
+    q_matrix = np.array(q_values).reshape(4, 4)
+    root_pi = np.sqrt(np.array(pi))
+    sym = root_pi[:, None] * q_matrix / root_pi[None, :]
+    evals, vecs = np.linalg.eigh((sym + sym.T) / 2)
+    return evals, vecs / root_pi[:, None], vecs.T * root_pi[None, :]
+
+
+def _get_p_matrices(evals: np.ndarray, evecs: np.ndarray, ievecs: np.ndarray, dists: np.ndarray) -> np.ndarray:
+    """Return (ndists, 4, 4) transition probability matrices, computed
+    once for each unique edge length. Zero-length edges are given an
+    exact identity matrix, rather than one with rounding errors."""
+    udists, inverse = np.unique(dists, return_inverse=True)
+    pmats = np.einsum("ij,dj,jk->dik", evecs, np.exp(np.outer(udists, evals)), ievecs)
+    pmats = np.maximum(pmats, 0)
+    pmats[udists == 0] = np.eye(4)
+    return pmats[inverse]
+
+
 ######################################################
 #
 # VISUALIZATION FUNCTIONS
@@ -2,9 +2,25 @@
 
 """Distance-based tree inference.
 
+Neighbor-joining is implemented as an in-place engine on a single
+copy of the distance matrix. Row sums are cached and updated as Nodes
+are joined, and a joined pair is deleted by overwriting one with the
+new Node and swapping the last row/column into the other, such that
+the active matrix shrinks without reallocation. The pair to join is
+found by a bounded search (as in RapidNJ, Simonsen et al. 2008): each
+row has a lower bound on its Q-values from its minimum distance and
+the max row sum, and only rows whose bound is below a known Q-value
+are searched.
+
+References
+----------
+- Saitou N, Nei M (1987). "The neighbor-joining method: a new method
+  for reconstructing phylogenetic trees." Mol Biol Evol 4(4): 406-425.
+- Simonsen M, Mailund T, Pedersen CNS (2008). "Rapid neighbour-joining."
+  Algorithms in Bioinformatics, LNCS 5251: 113-122.
 """
 
-from typing import Tuple, Iterator, Union, TypeVar
+from typing import Tuple, Iterator, Iterable, Union, TypeVar, List, Sequence
 import numpy as np
 import pandas as pd
 from loguru import logger
@@ -61,35 +77,35 @@ def neighbor_joining_tree(data: Array) -> toytree.ToyTree:
         logger.warning("identical names found in data, using int indices for upgma tree")
         index = range(data.shape[0])
 
-    # dict to store Nodes, starting with tips.
-    nodes = {i: toytree.Node(name=i) for i in index}
+    return _get_tree_from_joins(index, iter_nj_algorithm(arr))
 
-    # iterate generator function to get next pair of Nodes to join.
-    for i, j, v_i, v_j in iter_nj_algorithm(arr):
 
-        # get ordered Node names from the nodes dict.
-        names = list(nodes.keys())
-        # print(f"{names[i]}\t{names[j]}\t{v_i:.3f}\t{v_j:.3f}")
+def _get_tree_from_joins(
+    index: Sequence[str],
+    joins: Iterable[Tuple[int, int, float, float]],
+) -> toytree.ToyTree:
+    """Return a ToyTree built from the joins yielded by an NJ generator."""
+    # list to store Nodes by id, starting with tips.
+    nodes = [toytree.Node(name=i) for i in index]
 
-        # get Nodes with i, j names and pop from dict
-        node_i = nodes.pop(names[i])
-        node_j = nodes.pop(names[j])
+    # iterate generator function to get next pair of Nodes to join.
+    for i, j, v_i, v_j in joins:
+        node_i = nodes[i]
+        node_j = nodes[j]
+        node_i._dist = v_i
 
         # create new ancestral Node, store it in nodes, and connect.
-        if nodes:
-            new_name = f"{node_i.name}-{node_j.name}"
-            node_a = toytree.Node(name=new_name)
-            nodes[new_name] = node_a
+        if len(nodes) < 2 * len(index) - 2:
+            node_a = toytree.Node(name=f"{node_i.name}-{node_j.name}")
+            nodes.append(node_a)
 
             # connect i and j to it with edge lengths v_i and v_j
-            node_i._dist = v_i
             node_j._dist = v_j
             node_a._add_child(node_i)
             node_a._add_child(node_j)
 
         # connect final pair of Nodes
         else:
-            node_i._dist = v_i
             node_j._add_child(node_i)
 
     # conver treenode to a ToyTree
@@ -102,36 +118,181 @@ def neighbor_joining_tree(data: Array) -> toytree.ToyTree:
     return tree
 
 
+def _round_down_float32(values: np.ndarray) -> np.ndarray:
+    """Return values as float32 rounded down, for use as lower bounds."""
+    low = values.astype(np.float32)
+    mask = low > values
+    low[mask] = np.nextafter(low[mask], np.float32(-np.inf))
+    return low
+
+
 def iter_nj_algorithm(arr: Array) -> Iterator[Tuple[int, int, float, float]]:
-    """Generator function to yield node indices and branch lengths.
+    """Generator function to yield node ids and branch lengths.
 
     Each iteration of the neighbor-joining algorithm finds the pair
     of samples with the shortest average distance to all other
-    samples. This generator yields the indices (i, j) of the pair given
-    an input 2-D distance array, and the branch lengths (v_i, v_j) of
-    each of these to their parent node.
+    samples. This generator yields the ids (i, j) of the pair, and
+    the branch lengths (v_i, v_j) of each of these to their parent
+    node. Tips have ids 0..n-1 in the order of the input rows, and the
+    node created by the k-th join has id n + k. Ties are resolved by
+    joining the pair with the lowest (i, j) ids, and i < j.
+
+    The Q-value of a pair (r, c) among m Nodes is Q = (m - 2) * d_rc
+    - S_r - S_c, where S are row sums. Each row stores the ids of the
+    other Nodes sorted by distance (when the row was created), and
+    is scanned in increasing order of distance only until the bound
+    (m - 2) * d_rc - S_r - max(S) exceeds the lowest Q found. Scans
+    are vectorized over all rows in bands of increasing width. Memory
+    use is ~16 * n^2 bytes.
+
+    Parameters
+    ----------
+    arr: pd.DataFrame | np.ndarray
+        A symmetric (n, n) distance matrix. It is copied once.
     """
-    # iterate and reduce matrix until all Nodes are joined
+    dist = np.array(arr, dtype=np.float64)
+    nnodes = dist.shape[0]
+    if nnodes < 2:
+        return
+
+    # cached row sums, and inf on the diagonal
+    np.fill_diagonal(dist, 0)
+    sums = dist.sum(axis=1)
+    np.fill_diagonal(dist, np.inf)
+
+    # id of the Node at each position, and position of each id
+    ids = np.arange(nnodes)
+    posids = np.full(2 * nnodes - 1, -1)
+    posids[:nnodes] = ids
+
+    # each row sorted by distance, as ids and lower bounds of distances.
+    # the diagonal (inf) is sorted last and excluded by the row length.
+    order = np.argsort(dist, axis=1, kind="stable")
+    sids = order.astype(np.int32)
+    svals = _round_down_float32(np.take_along_axis(dist, order, axis=1))
+    del order
+    lengths = np.full(nnodes, nnodes - 1)
+    heads = np.zeros(nnodes, dtype=np.int64)
+    new_id = nnodes
+    size = nnodes
+
+    while size > 2:
+        mat = dist[:size, :size]
+        rsums = sums[:size]
+        smax = rsums.max()
+        scale = size - 2
+
+        # scan bands of sorted rows, and rows whose bound at the end
+        # of the band is <= the lowest Q-value so far scan further.
+        qbest = np.inf
+        ties: List[np.ndarray] = []
+        rows = np.arange(size)
+        starts = heads[:size].copy()
+        width = 8
+        while rows.size:
+            cols = starts[rows, None] + np.arange(width)
+            valid = cols < lengths[rows, None]
+            cols = np.minimum(cols, nnodes - 1)
+            cpos = posids[sids[rows[:, None], cols]]
+            valid &= cpos >= 0
+            cpos[~valid] = 0
+            qvals = scale * mat[rows[:, None], cpos] - rsums[rows, None] - rsums[cpos]
+            qvals[~valid] = np.inf
+            qmin = qvals.min()
+            if qmin < qbest:
+                qbest, ties = qmin, []
+            if qmin == qbest and qmin < np.inf:
+                ridx, cidx = np.nonzero(qvals == qmin)
+                ties.append(np.column_stack([rows[ridx], cpos[ridx, cidx]]))
+
+            # rows with entries after the band, whose bound is <= qbest
+            ends = starts[rows] + width - 1
+            more = ends < lengths[rows] - 1
+            ends = np.minimum(ends, nnodes - 1)
+            bounds = scale * svals[rows, ends].astype(np.float64) - rsums[rows] - smax
+            starts[rows] += width
+            rows = rows[more & (bounds <= qbest)]
+            width *= 2
+        pairs = np.concatenate(ties)
+
+        # select the pair with lowest ids, as (pi, pj) with ids[pi] < ids[pj]
+        pid = np.sort(ids[pairs], axis=1)
+        pi, pj = pairs[np.lexsort((pid[:, 1], pid[:, 0]))[0]]
+        if ids[pi] > ids[pj]:
+            pi, pj = pj, pi
+        id_i, id_j = ids[pi], ids[pj]
+
+        # branch lengths from i, j to the new Node
+        dij = mat[pi, pj]
+        v_i = 0.5 * dij + 0.5 * (rsums[pi] - rsums[pj]) / scale
+        v_j = dij - v_i
+        yield int(id_i), int(id_j), float(v_i), float(v_j)
+
+        # distances to the new Node, and update of cached row sums.
+        new = 0.5 * (mat[pi] + mat[pj] - dij)
+        new[pi] = new[pj] = 0
+        rsums += new - mat[pi] - mat[pj]
+        rsums[pi] = new.sum()
+
+        # the new Node replaces i, and j is removed below
+        new[pi] = new[pj] = np.inf
+        mat[pi] = new
+        mat[:, pi] = new
+        ids[pi] = new_id
+        posids[[id_i, id_j]] = -1
+        posids[new_id] = pi
+        new_id += 1
+
+        # sorted row of the new Node (the inf values of i, j are last)
+        order = np.argsort(new, kind="stable")[:size - 2]
+        sids[pi, :size - 2] = ids[order]
+        svals[pi, :size - 2] = _round_down_float32(new[order])
+        lengths[pi] = size - 2
+        heads[pi] = 0
+
+        # swap the last row/column into position j and shrink
+        last = size - 1
+        if pj != last:
+            mat[pj] = mat[last]
+            mat[:, pj] = mat[:, last]
+            mat[pj, pj] = np.inf
+            ids[pj] = ids[last]
+            posids[ids[pj]] = pj
+            sums[pj] = sums[last]
+            sids[pj] = sids[last]
+            svals[pj] = svals[last]
+            lengths[pj] = lengths[last]
+            heads[pj] = heads[last]
+        size -= 1
+
+        # skip dead ids at the start of sorted rows
+        rows = np.arange(size)
+        while rows.size:
+            heads_ = np.minimum(heads[rows], nnodes - 1)
+            dead = (heads[rows] < lengths[rows]) & (posids[sids[rows, heads_]] < 0)
+            rows = rows[dead]
+            heads[rows] += 1
+
+    # yield final pair
+    i, j = sorted(ids[:2])
+    yield int(i), int(j), float(dist[0, 1]), float(dist[0, 1])
+
+
+def _iter_nj_algorithm_reference(arr: Array) -> Iterator[Tuple[int, int, float, float]]:
+    """Generator of the original O(n^3) NJ algorithm, used to test and
+    benchmark `iter_nj_algorithm`. Yields the same ids as it.
+    """
+    ids = list(range(arr.shape[0]))
+    new_id = arr.shape[0]
     while 1:
-
-        # get neighbor values (u_i)
         uvals = arr.sum(axis=0) / (arr.shape[0] - 2)
-
-        # get c_arr as d_ij - u_i - u_j
         c_arr = arr - uvals - np.expand_dims(uvals, 1)
-
-        # mask diagonal and get (i,j) index of min off-diagonal value
         np.fill_diagonal(c_arr, np.inf)
         i, j = [i[0] for i in np.where(c_arr == c_arr.min())]
-
-        # get branch lengths from i,j to new internal Node
         v_i = 0.5 * arr[i, j] + 0.5 * (uvals[i] - uvals[j])
         v_j = 0.5 * arr[i, j] + 0.5 * (uvals[j] - uvals[i])
+        yield ids[i], ids[j], v_i, v_j
 
-        # yield the new Node info (i, j, v_i, v_j)
-        yield i, j, v_i, v_j
-
-        # update arr to remove i and j and insert ij ancestor dists.
         new_dim = arr.shape[0] - 1
         new_arr = np.zeros(shape=(new_dim, new_dim))
         mask = np.ones(arr.shape[0], dtype=bool)
@@ -139,10 +300,11 @@ def iter_nj_algorithm(arr: Array) -> Iterator[Tuple[int, int, float, float]]:
         new_arr[:new_dim - 1, :][:, :new_dim - 1] = arr[mask, :][:, mask]
         new_arr[-1, :-1] = new_arr[:-1, -1] = (arr[i] + arr[j] - arr[i, j])[mask] / 2.
         arr = new_arr
+        ids = [k for k in ids if k not in (ids[i], ids[j])] + [new_id]
+        new_id += 1
 
-        # if new arr size is 2 yield final pair and end.
         if new_dim == 2:
-            yield 0, 1, arr[0, 1], arr[0, 1]
+            yield ids[0], ids[1], arr[0, 1], arr[0, 1]
             break
 
 
@@ -2,19 +2,18 @@
 
 """Calculate parsimony score of a tree topology given data.
 
-TODO
-----
-- support DNA IUPAC models where ambiguous states are automatically
-expanded.
-- support non DNA (arbitrary multistate including binary) data.
-- vectorize to be faster.
-
-JIT-compiled version
----------------------
-- jit supports sets now, but they are being deprecated to introduce
-a new numba typed.set, but which does not yet exist. So until it does
-its not really worth spending time on...
-- https://numba.pydata.org/numba-doc/dev/reference/pysupported.html#set
+Data are encoded once as bitmasks, where each bit represents a state
+(e.g., A=1, C=2, G=4, T=8 for DNA), such that ambiguous data (e.g.,
+IUPAC codes R=A|G, or N=A|C|G|T) are represented by setting multiple
+bits. Alignment columns are compressed into unique site patterns with
+counts, and patterns that share a state across all tips (e.g.,
+constant sites) are dropped since they never require a change.
+
+Scores are computed in a single postorder traversal of the tree's
+Nodes in idx order, where each step is a vectorized operation over
+all site patterns at once. Fitch parsimony uses bitwise AND/OR of the
+state sets of children. Sankoff parsimony uses min-plus products of
+the costs of children with a user-defined cost matrix.
 
 References
 ----------
@@ -34,18 +33,36 @@ References
 - https://telliott99.blogspot.com/2010/03/fitch-and-sankoff-algorithms-for.html
 """
 
-from typing import TypeVar, Optional
+from typing import TypeVar, Optional, List, Tuple, Sequence, Union
+import numpy as np
+import pandas as pd
 from numpy.typing import ArrayLike
+from toytree.core.cache import get_cached
+from toytree.utils import ToytreeError
 
 ToyTree = TypeVar("ToyTree")
 
+__all__ = ["get_parsimony_score", "Parsimony"]
+
+DNA_STATES = ["A", "C", "G", "T"]
+IUPAC_BITS = {
+    "A": 1, "C": 2, "G": 4, "T": 8, "U": 8,
+    "R": 5, "Y": 10, "S": 6, "W": 9, "K": 12, "M": 3,
+    "B": 14, "D": 13, "H": 11, "V": 7,
+    "N": 15, "-": 15, "?": 15, ".": 15,
+}
+IUPAC_LOOKUP = np.zeros(256, dtype=np.uint8)
+for _char, _bits in IUPAC_BITS.items():
+    IUPAC_LOOKUP[ord(_char)] = _bits
+    IUPAC_LOOKUP[ord(_char.lower())] = _bits
+
 
 def get_parsimony_score(
     tree: ToyTree,
     data: ArrayLike,
-    weights: Optional[ArrayLike],
+    weights: Optional[ArrayLike] = None,
     data_as_dna: bool = True,
-):
+) -> Union[int, float]:
     """Return the parsimony score of a tree given a data matrix.
 
     The parsimony score is calculated by performing a post-order
@@ -59,110 +76,234 @@ def get_parsimony_score(
     counts as 1 (Fitch parsimony). If multiple states exist in the
     data matrix the sum of scores of each state is returned.
 
+    To score many trees on the same data use the `Parsimony` class,
+    which encodes the data only once.
+
     Parameters
     ----------
     tree: ToyTree
         A tree on which to calculate the parsimony score.
     data: ArrayLike
         A data matrix of shape (ntips, ntraits) containing discrete
-        values for one or more traits for each tip Node in idxorder.
+        values for one or more traits for each tip Node in idxorder,
+        or a sequence of ntips strings of equal length (e.g., DNA
+        sequences). If data is a DataFrame its index is used to match
+        rows to tip names.
     weights: None or ArrayLike
         The weights matrix must be square. If it is a dataframe then
         the row and column names will be used, else they should be
         ordered by state values alphanumerically (e.g., 0, 1, 2, 3 or
         'A', 'C', 'G', 'T'). The diagonal must be zero, and
-        off-diagonal as float or int types.
+        off-diagonal as float or int types. Rows are the ancestral
+        state and columns the descendant state.
     data_as_dna: bool
         If True then data values that are string types representing
         DNA IUPAC ambiguity codes (e.g., RWMYSK) will be expanded to a
         set of the two bases that they represent (e.g., W -> {A, T}).
 
-    Note
-    ----
-    This function uses numba jit-compilation for speed improvements.
-
-    References
-    ----------
-    - ...
-
     Examples
     --------
-    >>> ...
+    >>> tree = toytree.tree("((a,b),(c,d));")
+    >>> seqs = ["AAGT", "AGGT", "CGTT", "CRTA"]
+    >>> toytree.infer.get_parsimony_score(tree, seqs)
+    >>> # 4
     """
-    # get tree as an array of idxs in postorder traversal
-    traversal_order = np.array([i.idx for i in tree.traverse("postorder")])
-
-    # get data as a array of ints after expanding ambiguities
-    if data_as_dna:
-        pass
-    else:
-        pass
-
-    # calculate sum of scores and return
-    score = jit_compiled_fitch(
-        tree=traversal_order,
-        data=int_matrix,
-        weights=weights_matrix,
-    )
-    return score
+    return Parsimony(data, weights=weights, data_as_dna=data_as_dna).get_score(tree)
 
 
 class Parsimony:
-    """Infer a phylogenetic tree by Maximum Parsimony.
+    """Parsimony scorer of trees given a data matrix.
+
+    The data are encoded as site patterns of state bitmasks when the
+    class is initialized, and can then be used to score many trees.
+    See `get_parsimony_score` for a description of the arguments.
 
     Note
     ----
     The maximum parsimony algorithm does not infer rooted trees, i.e.,
     topologies re-rooted at any arbitrary edge will yield the same
-    parsimony score.
+    parsimony score (if the weights matrix is symmetric).
 
     Examples
     ---------
-    >>> toytree.set_log_level("DEBUG")  # print verbose information
-    >>> data = ...
-    >>> starting_tree = ... distance tree.
-    >>> tool = Parsimony(data)
-    >>> tool.get_score(tree=tree, )
+    >>> tree = toytree.rtree.unittree(10, seed=123)
+    >>> data = tree.pcm.simulate_discrete_data(nstates=4, nreplicates=100)
+    >>> tool = Parsimony(data.values)
+    >>> tool.get_score(tree)
     """
-    def __init__(self, data: ...):
-        self.data = data
-
-    def get_score(self, tree):
-        """Return parsimony score"""
-
-
-    def _fitch_algorithm(self):
-        """Implement the fitch algorithm.
-
+    def __init__(
+        self,
+        data: ArrayLike,
+        weights: Optional[ArrayLike] = None,
+        data_as_dna: bool = True,
+    ):
+        self.names = list(data.index) if isinstance(data, pd.DataFrame) else None
+        masks, self.states = _get_state_bitmasks(data, data_as_dna)
+        self.patterns, self.counts = _get_site_patterns(masks)
+        self.weights = None if weights is None else _get_cost_matrix(weights, self.states)
+
+    def get_score(self, tree: ToyTree) -> Union[int, float]:
+        """Return the Fitch (or Sankoff if weights) parsimony score."""
+        tips = self._get_tip_patterns(tree)
+        if self.weights is None:
+            return self._fitch_algorithm(tree, tips)
+        return self._sankoff_algorithm(tree, tips)
+
+    def _get_tip_patterns(self, tree: ToyTree) -> np.ndarray:
+        """Return the pattern rows ordered by tip idx of a tree."""
+        if self.patterns.shape[0] != tree.ntips:
+            raise ToytreeError(
+                f"data has {self.patterns.shape[0]} rows but tree has {tree.ntips} tips.")
+        if self.names is None:
+            return self.patterns
+        rows = {j: i for i, j in enumerate(self.names)}
+        try:
+            order = [rows[tree[i].name] for i in range(tree.ntips)]
+        except KeyError as exc:
+            raise ToytreeError(f"tip name {exc} not in the data index.") from exc
+        return self.patterns[order]
+
+    def _fitch_algorithm(self, tree: ToyTree, tips: np.ndarray) -> int:
+        """Return the Fitch parsimony score.
+
+        State sets of Nodes are bitmasks. The state set of a Node is
+        the intersection of its children's sets, or the union if the
+        intersection is empty, which counts as one change. At a
+        polytomy the set is the states present in the most children,
+        and the number of changes is the number of other children.
         """
-
-    def _sankoff_algorithm(self):
-        """Implement the Sankoff algorithm.
+        states = np.empty((tree.nnodes, tips.shape[1]), dtype=tips.dtype)
+        states[:tree.ntips] = tips
+        changes = np.zeros(tips.shape[1], dtype=np.int64)
+        for idx, children in enumerate(_get_children_idxs(tree), start=tree.ntips):
+            if len(children) == 2:
+                left, right = states[children[0]], states[children[1]]
+                inter = left & right
+                empty = inter == 0
+                states[idx] = np.where(empty, left | right, inter)
+                changes += empty
+            else:
+                bits = (1 << np.arange(len(self.states))).astype(tips.dtype)
+                counts = np.array([
+                    sum((states[i] & bit) != 0 for i in children) for bit in bits
+                ], dtype=np.int64)
+                most = counts.max(axis=0)
+                states[idx] = np.bitwise_or.reduce(
+                    np.where(counts == most, bits[:, None], 0).astype(tips.dtype), axis=0)
+                changes += len(children) - most
+        return int(changes @ self.counts)
+
+    def _sankoff_algorithm(self, tree: ToyTree, tips: np.ndarray) -> float:
+        """Return the Sankoff parsimony score.
 
         The strength of the Sankoff algorithm is that it allows a
         variety of cost matrices to be used. This is in principal
         closer to ML, where we would define a substitution model.
         Here the cost matrix is not inferred, but a priori defined
-        by the user.
-
-        """
-
-    def _tree_move(self, method: str):
-        """Return a ToyTree that is one 'move' from the current tree.
-
-        >>> NNITreeSearcher(scorer)
+        by the user. Each Node stores the min cost of its subtree
+        given each state as an (nstates, npatterns) array, and the cost
+        of a child given the state of its parent is the min-plus
+        product of the cost matrix and the child's costs. Only costs of
+        Nodes whose parent has not yet been visited are stored.
         """
-        pass
-
-
-class Fitch:
-    """Implementation of the Fitch parsimony algorithm."""
-    pass
-
-
-def _validate_against_bio():
-    """Compare against Bio implementation for validation"""
-    pass
+        nstates = len(self.states)
+        costs = {}
+        for idx in range(tree.ntips):
+            costs[idx] = np.where(
+                tips[idx] & (1 << np.arange(nstates)).astype(tips.dtype)[:, None], 0., np.inf)
+        for idx, children in enumerate(_get_children_idxs(tree), start=tree.ntips):
+            cost = np.zeros((nstates, tips.shape[1]))
+            for child in children:
+                ccost = costs.pop(child)
+                cost += np.min(ccost[None, :, :] + self.weights[:, :, None], axis=1)
+            costs[idx] = cost
+        return float(costs[tree.nnodes - 1].min(axis=0) @ self.counts)
+
+
+def _get_children_idxs(tree: ToyTree) -> List[Tuple[int, ...]]:
+    """Return tuples of child idxs of internal Nodes in idx order."""
+    def func():
+        nodes = tree._idx_dict
+        return [
+            tuple(i._idx for i in nodes[idx]._children)
+            for idx in range(tree.ntips, tree.nnodes)
+        ]
+    return get_cached(tree, ("children_idxs",), func)
+
+
+def _get_state_bitmasks(data: ArrayLike, data_as_dna: bool) -> Tuple[np.ndarray, List]:
+    """Return (ntips, nsites) array of state bitmasks and the states.
+
+    String data are encoded as DNA with IUPAC codes if data_as_dna,
+    and otherwise each unique value is a state, sorted in order.
+    """
+    if isinstance(data, pd.DataFrame):
+        data = data.values
+    arr = np.asarray(data)
+    if arr.dtype.kind == "O" and arr.size and isinstance(arr.flat[0], (str, bytes)):
+        arr = arr.astype(type(arr.flat[0]))
+
+    # sequence strings -> (ntips, nsites) array of single characters.
+    if arr.ndim == 1 and arr.dtype.kind in "US":
+        if len({len(i) for i in arr}) != 1:
+            raise ToytreeError("sequences must all be the same length.")
+        # view fixed-width strings as single characters, without copy.
+        arr = np.ascontiguousarray(arr)
+        arr = arr.view(arr.dtype.byteorder + arr.dtype.kind + "1").reshape(arr.size, -1)
+    if arr.ndim != 2:
+        raise ToytreeError("data must be a 2-D matrix or a sequence of strings.")
+
+    # single characters -> uint8 codes -> IUPAC bitmasks.
+    if data_as_dna and arr.dtype.kind in "US" and arr.dtype.itemsize in (1, 4):
+        if arr.dtype.kind == "S":
+            codes = arr.view(np.uint8)
+        else:
+            codes = arr.view(np.uint32)
+            codes = np.where(codes < 256, codes, 0).astype(np.uint8)
+        masks = IUPAC_LOOKUP[codes]
+        if not masks.all():
+            bad = sorted(set(arr[masks == 0].tolist()))
+            raise ToytreeError(f"data contains non-IUPAC characters: {bad}")
+        return masks, DNA_STATES
+
+    states, inverse = np.unique(arr, return_inverse=True)
+    if states.size > 64:
+        raise ToytreeError("data cannot contain more than 64 states.")
+    dtype = next(i for i in (np.uint8, np.uint16, np.uint32, np.uint64) if np.iinfo(i).bits >= states.size)
+    masks = (np.ones(1, dtype=dtype) << inverse.astype(dtype)).reshape(arr.shape)
+    return masks, list(states)
+
+
+def _get_site_patterns(masks: np.ndarray, informative_only: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (ntips, npatterns) unique columns and their counts.
+
+    If informative_only, columns where all tips share a state, which
+    require no change under any model with zero cost on the diagonal,
+    are excluded.
+    """
+    if informative_only:
+        masks = masks[:, np.bitwise_and.reduce(masks, axis=0) == 0]
+    cols = np.ascontiguousarray(masks.T)
+    voids = cols.view(np.dtype((np.void, cols.dtype.itemsize * cols.shape[1]))).ravel()
+    _, first, counts = np.unique(voids, return_index=True, return_counts=True)
+    return masks[:, first], counts.astype(np.int64)
+
+
+def _get_cost_matrix(weights: ArrayLike, states: Sequence) -> np.ndarray:
+    """Return a float cost matrix ordered by states."""
+    if isinstance(weights, pd.DataFrame):
+        try:
+            weights = weights.loc[states, states]
+        except KeyError as exc:
+            raise ToytreeError(f"weights matrix must have rows and columns for states {states}.") from exc
+    arr = np.array(weights, dtype=float)
+    if arr.shape != (len(states), len(states)):
+        raise ToytreeError(
+            f"weights matrix must have shape ({len(states)}, {len(states)}) "
+            f"for states {states}.")
+    if np.any(np.diag(arr) != 0):
+        raise ToytreeError("weights matrix must have zeros on the diagonal.")
+    return arr
 
 
 if __name__ == "__main__":
@@ -0,0 +1,461 @@
+#!/usr/bin/env python
+
+"""Maximum parsimony tree search by hill-climbing with NNI and SPR.
+
+The search works on a binary tree rooted on the edge of the first tip,
+stored as lists of parent and child ids, and keeps two Fitch state
+arrays (bitmasks of shape (nnodes, npatterns)) for all Nodes:
+
+- down: the Fitch set of the subtree below a Node.
+- up: the Fitch set of the rest of the tree above a Node.
+
+Candidate moves are scored from these arrays without rebuilding or
+re-traversing trees. The change in score of an NNI on an edge depends
+only on the sets of the four subtrees around the edge. For an SPR the
+pruned tree is scored once (updating down sets on the path from the
+pruning point to the root, and recomputing up sets), after which the
+cost of regrafting the subtree on every edge is one vectorized
+operation, since inserting a subtree on an edge adds a change only
+where its set does not intersect the Fitch set of the edge. When a
+move is accepted only the down sets of Nodes on the paths from the
+changed Nodes to the root are updated.
+
+References
+----------
+- Goloboff PA (1996). "Methods for faster parsimony analysis."
+  Cladistics 12(3): 199-220.
+- Felsenstein J (2004). Inferring Phylogenies. Sinauer Associates.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+from loguru import logger
+import toytree
+from toytree.utils import ToytreeError
+from toytree.infer.src.parsimony import Parsimony
+from toytree.infer.src.neighbor_joining import neighbor_joining_tree
+
+logger = logger.bind(name="toytree")
+ToyTree = TypeVar("ToyTree")
+
+__all__ = ["parsimony_tree_search"]
+
+# (delta, pruned subtree id, id of Node below the regraft edge)
+Move = Tuple[int, int, int]
+_WORKER_STATE = {}
+
+
+def parsimony_tree_search(
+    data: ArrayLike,
+    tree: Optional[ToyTree] = None,
+    moves: str = "spr",
+    max_iter: Optional[int] = None,
+    max_time: Optional[float] = None,
+    njobs: int = 1,
+    data_as_dna: bool = True,
+) -> ToyTree:
+    """Return an unrooted ToyTree inferred by maximum parsimony.
+
+    A starting tree is improved by hill-climbing, where each iteration
+    applies the move that most decreases the Fitch parsimony score,
+    until no move improves the score or a budget is reached. With
+    moves="spr" the NNI neighborhood is searched first, and the SPR
+    neighborhood (which contains all NNI moves) only if no NNI move
+    improves the score. Polytomies in the starting tree are resolved
+    arbitrarily. Hill-climbing finds a local optimum, which is not
+    guaranteed to be a most parsimonious tree; results can be improved
+    by searching from multiple starting trees.
+
+    Parameters
+    ----------
+    data: ArrayLike
+        A data matrix of shape (ntips, ntraits), or a sequence of
+        ntips strings, as in `get_parsimony_score`. If data is a
+        DataFrame its index is used as tip names, and if a starting
+        tree is entered without a DataFrame then rows are matched to
+        its tips in idx order.
+    tree: ToyTree or None
+        A starting tree. If None a neighbor-joining tree inferred
+        from the number of changes between each pair of samples is
+        used.
+    moves: str
+        "nni" or "spr".
+    max_iter: int or None
+        The max number of moves to apply.
+    max_time: float or None
+        The max time in seconds, which is checked before each
+        iteration and, if njobs=1, between evaluating pruned subtrees.
+    njobs: int
+        Number of processes used to evaluate SPR moves. Parallel
+        evaluation only speeds up searches of large trees.
+    data_as_dna: bool
+        If True then string data are parsed as DNA with IUPAC
+        ambiguity codes (see `get_parsimony_score`).
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(20, seed=123)
+    >>> data = tree.pcm.simulate_discrete_data(nstates=4, nreplicates=200, tips_only=True)
+    >>> data.index = tree.get_tip_labels()
+    >>> mptree = toytree.infer.parsimony_tree_search(data, max_time=10)
+    >>> toytree.infer.get_parsimony_score(mptree, data)
+    """
+    if moves not in ("nni", "spr"):
+        raise ToytreeError(f"moves must be 'nni' or 'spr', not '{moves}'.")
+    tool = Parsimony(data, data_as_dna=data_as_dna)
+    ntips = tool.patterns.shape[0]
+    if tree is not None:
+        patterns = tool._get_tip_patterns(tree)
+        names = tree.get_tip_labels()
+    else:
+        patterns = tool.patterns
+        names = tool.names if tool.names is not None else list(range(ntips))
+    if len(set(names)) != len(names):
+        raise ToytreeError("tip names must be unique.")
+    if ntips < 4:
+        raise ToytreeError("tree search requires at least 4 samples.")
+    if tree is None:
+        tree = _get_nj_start_tree(patterns, tool.counts, names)
+
+    rows = {j: i for i, j in enumerate(names)}
+    children, root = _get_binary_children(tree, rows)
+    state = _FitchSearchState(patterns, tool.counts, children, root)
+    logger.info(f"parsimony search start score={state.score}")
+
+    start = time.perf_counter()
+    pool = None
+    if njobs > 1 and moves == "spr":
+        pool = ProcessPoolExecutor(
+            njobs, initializer=_init_search_worker, initargs=(patterns, tool.counts))
+    try:
+        niter = 0
+        while max_iter is None or niter < max_iter:
+            if max_time is not None and time.perf_counter() - start > max_time:
+                break
+            nni = state.get_best_nni()
+            if nni[0] < 0:
+                state.apply_nni(*nni)
+            elif moves == "spr":
+                spr = _get_best_spr(state, pool, njobs, start, max_time)
+                if spr[0] >= 0:
+                    break
+                state.apply_spr(*spr)
+            else:
+                break
+            niter += 1
+            logger.debug(f"parsimony search iteration {niter} score={state.score}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    logger.info(f"parsimony search end score={state.score}, iterations={niter}")
+    return state.get_tree(names)
+
+
+class _FitchSearchState:
+    """A binary rooted tree with Fitch down and up sets of all Nodes.
+
+    Tips have ids 0-ntips matching rows of the patterns array, and the
+    root has children (0, X) throughout the search, which excludes
+    moves that would change the root rather than the topology.
+    """
+    def __init__(self, patterns: np.ndarray, counts: np.ndarray, children: List[List[int]], root: int):
+        self.counts = counts
+        self.children = children
+        self.root = root
+        self.ntips = patterns.shape[0]
+        self.parent = [-1] * len(children)
+        for idx, ichildren in enumerate(children):
+            for child in ichildren:
+                self.parent[child] = idx
+        self.down = np.empty((len(children), patterns.shape[1]), dtype=patterns.dtype)
+        self.down[:self.ntips] = patterns
+        self.up = np.empty_like(self.down)
+        self.score = 0
+        for idx in self.get_preorder()[::-1]:
+            self.down[idx], empty = _fitch(*self.down[self.children[idx]])
+            self.score += int(empty @ counts)
+        self.update_up()
+
+    def get_preorder(self) -> List[int]:
+        """Return internal Node ids in preorder."""
+        order = []
+        stack = [self.root]
+        while stack:
+            idx = stack.pop()
+            order.append(idx)
+            stack.extend(i for i in self.children[idx] if i >= self.ntips)
+        return order
+
+    def get_postorder(self) -> List[int]:
+        """Return tip ids followed by internal ids in postorder."""
+        return list(range(self.ntips)) + self.get_preorder()[::-1]
+
+    def get_sister(self, idx: int) -> int:
+        left, right = self.children[self.parent[idx]]
+        return right if left == idx else left
+
+    def update_down_path(self, idx: int) -> None:
+        """Update down sets of a Node and its ancestors."""
+        while idx != -1:
+            self.down[idx] = _fitch(*self.down[self.children[idx]])[0]
+            idx = self.parent[idx]
+
+    def update_up(self, up: Optional[np.ndarray] = None) -> List[int]:
+        """Fill up sets of all Nodes and return the non-root ids."""
+        up = self.up if up is None else up
+        left, right = self.children[self.root]
+        up[left] = self.down[right]
+        up[right] = self.down[left]
+        nodes = [left, right]
+        for idx in self.get_preorder()[1:]:
+            left, right = self.children[idx]
+            up[left] = _fitch(up[idx], self.down[right])[0]
+            up[right] = _fitch(up[idx], self.down[left])[0]
+            nodes.extend((left, right))
+        return nodes
+
+    def get_best_nni(self) -> Move:
+        """Return (delta, child, edge) of the NNI that most decreases
+        the score, where child is swapped with the sister of edge.
+
+        The score of the arrangement ((A,B),(C,X)) around the edge
+        between internal Nodes v=(A,B) and its parent p=(v,C), where X
+        is the rest of the tree, is the sum of the changes within
+        each of the four subtrees, which do not change by NNI, and of
+        the changes joining them.
+        """
+        edges = [
+            i for i in range(self.ntips, len(self.children))
+            if i != self.root and self.parent[i] != self.root
+        ]
+        if not edges:
+            return (0, -1, -1)
+        lefts = [self.children[i][0] for i in edges]
+        rights = [self.children[i][1] for i in edges]
+        sisters = [self.get_sister(i) for i in edges]
+        outs = [self.parent[i] for i in edges]
+        dla, dlb, dlc, ulx = self.down[lefts], self.down[rights], self.down[sisters], self.up[outs]
+        current = _get_quartet_cost(dla, dlb, dlc, ulx, self.counts)
+        swap_left = _get_quartet_cost(dlc, dlb, dla, ulx, self.counts) - current
+        swap_right = _get_quartet_cost(dla, dlc, dlb, ulx, self.counts) - current
+        deltas = np.concatenate([swap_left, swap_right])
+        best = int(np.argmin(deltas))
+        child = (lefts + rights)[best]
+        return (int(deltas[best]), child, edges[best % len(edges)])
+
+    def apply_nni(self, delta: int, child: int, edge: int) -> None:
+        """Swap child of edge with the sister of edge."""
+        sister = self.get_sister(edge)
+        parent = self.parent[edge]
+        self.children[edge][self.children[edge].index(child)] = sister
+        self.children[parent][self.children[parent].index(sister)] = child
+        self.parent[sister] = edge
+        self.parent[child] = parent
+        self.update_down_path(edge)
+        self.update_up()
+        self.score += delta
+
+    def iter_spr_subtrees(self) -> List[int]:
+        """Return ids of subtrees that can be pruned."""
+        return [
+            i for i in range(len(self.children))
+            if i != self.root and self.parent[i] != self.root
+        ]
+
+    def get_best_spr(self, subtree: int, up: Optional[np.ndarray] = None) -> Move:
+        """Return (delta, subtree, edge) of the best regrafting of a
+        pruned subtree, on the edge above Node edge.
+
+        The tree is temporarily pruned to score all edges and then
+        restored. Inserting the subtree on an edge adds one change at
+        each pattern where its down set does not intersect the Fitch
+        set of the edge, which is the Fitch set of the down and up
+        sets of the Node below the edge in the pruned tree.
+        """
+        parent = self.parent[subtree]
+        sister = self.get_sister(subtree)
+        gparent = self.parent[parent]
+        up = np.empty_like(self.up) if up is None else up
+
+        # prune the subtree and its parent, and update down sets.
+        path = []
+        idx = gparent
+        while idx != -1:
+            path.append(idx)
+            idx = self.parent[idx]
+        saved = self.down[path].copy()
+        gchildren = self.children[gparent]
+        gchildren[gchildren.index(parent)] = sister
+        self.parent[sister] = gparent
+        self.update_down_path(gparent)
+
+        # cost of inserting on each edge except the edge to tip 0,
+        # which is the same edge as that to the other root child.
+        nodes = [i for i in self.update_up(up) if i != 0]
+        inter = self.down[nodes] & up[nodes]
+        edge_sets = np.where(inter == 0, self.down[nodes] | up[nodes], inter)
+        costs = ((edge_sets & self.down[subtree]) == 0) @ self.counts
+        current = costs[nodes.index(sister)]
+        costs[nodes.index(sister)] = np.iinfo(costs.dtype).max
+
+        # restore the tree.
+        gchildren[gchildren.index(sister)] = parent
+        self.parent[sister] = parent
+        self.down[path] = saved
+
+        best = int(np.argmin(costs))
+        return (int(costs[best] - current), subtree, nodes[best])
+
+    def apply_spr(self, delta: int, subtree: int, edge: int) -> None:
+        """Prune subtree and its parent, and regraft on the edge above edge."""
+        parent = self.parent[subtree]
+        sister = self.get_sister(subtree)
+        gparent = self.parent[parent]
+        gchildren = self.children[gparent]
+        gchildren[gchildren.index(parent)] = sister
+        self.parent[sister] = gparent
+
+        eparent = self.parent[edge]
+        echildren = self.children[eparent]
+        echildren[echildren.index(edge)] = parent
+        self.parent[parent] = eparent
+        self.children[parent] = [subtree, edge]
+        self.parent[edge] = parent
+
+        self.update_down_path(gparent)
+        self.update_down_path(parent)
+        self.update_up()
+        self.score += delta
+
+    def get_tree(self, names: Sequence) -> ToyTree:
+        """Return an unrooted ToyTree with tip names."""
+        nodes = {}
+        for idx in self.get_postorder():
+            if idx < self.ntips:
+                nodes[idx] = toytree.Node(name=names[idx])
+            else:
+                nodes[idx] = toytree.Node()
+                for child in self.children[idx]:
+                    nodes[idx]._add_child(nodes[child])
+        # unroot by attaching tip 0 to the other root child.
+        tip, other = self.children[self.root]
+        nodes[other]._add_child(nodes[tip]._detach())
+        return toytree.ToyTree(nodes[other]._detach())
+
+
+def _fitch(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return Fitch sets of parents of two arrays of sets, and a mask
+    of where a change is required."""
+    inter = left & right
+    empty = inter == 0
+    return np.where(empty, left | right, inter), empty
+
+
+def _get_quartet_cost(a: np.ndarray, b: np.ndarray, c: np.ndarray, x: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Return the weighted changes joining subtrees as ((a,b),(c,x))."""
+    ab, empty = _fitch(a, b)
+    cx, empty2 = _fitch(c, x)
+    return (empty.astype(np.int64) + empty2 + ((ab & cx) == 0)) @ counts
+
+
+def _get_best_spr(
+    state: _FitchSearchState,
+    pool: Optional[ProcessPoolExecutor],
+    njobs: int,
+    start: float,
+    max_time: Optional[float],
+) -> Move:
+    """Return the SPR move that most decreases the score."""
+    subtrees = state.iter_spr_subtrees()
+    if pool is not None:
+        chunks = [subtrees[i::njobs * 2] for i in range(njobs * 2)]
+        results = pool.map(
+            _get_best_spr_worker, chunks, repeat(state.children), repeat(state.root))
+        return min(results)
+    best = (0, -1, -1)
+    up = np.empty_like(state.up)
+    for subtree in subtrees:
+        if max_time is not None and time.perf_counter() - start > max_time:
+            break
+        best = min(best, state.get_best_spr(subtree, up))
+    return best
+
+
+def _init_search_worker(patterns: np.ndarray, counts: np.ndarray) -> None:
+    """Store the site patterns in a worker process once."""
+    _WORKER_STATE.update(patterns=patterns, counts=counts)
+
+
+def _get_best_spr_worker(subtrees: List[int], children: List[List[int]], root: int) -> Move:
+    state = _FitchSearchState(_WORKER_STATE["patterns"], _WORKER_STATE["counts"], children, root)
+    up = np.empty_like(state.up)
+    return min([(0, -1, -1)] + [state.get_best_spr(i, up) for i in subtrees])
+
+
+def _get_nj_start_tree(patterns: np.ndarray, counts: np.ndarray, names: Sequence) -> ToyTree:
+    """Return a NJ tree from the number of changes between pairs."""
+    dists = np.array([((patterns[i] & patterns) == 0) @ counts for i in range(patterns.shape[0])])
+    return neighbor_joining_tree(pd.DataFrame(dists, index=names, columns=names))
+
+
+def _get_binary_children(tree: ToyTree, rows: Dict) -> Tuple[List[List[int]], int]:
+    """Return lists of child ids of Nodes in a binary tree rooted on
+    the edge of tip 0, and the id of the root.
+
+    Tips have the ids in rows (by name), and polytomies are resolved
+    arbitrarily.
+    """
+    # undirected adjacency of Nodes, suppressing a degree-2 root.
+    ntips = tree.ntips
+    try:
+        ids = {tree[i]: rows[tree[i].name] for i in range(ntips)}
+    except KeyError as exc:
+        raise ToytreeError(f"tip name {exc} not in data.") from exc
+    neighbors = {}
+    for node in tree[ntips:]:
+        ids[node] = len(ids)
+        neighbors[ids[node]] = []
+    for node in tree[:-1]:
+        neighbors.setdefault(ids[node], []).append(ids[node._up])
+        neighbors[ids[node._up]].append(ids[node])
+    top = ids[tree.treenode]
+    if len(neighbors[top]) == 2:
+        left, right = neighbors.pop(top)
+        neighbors[left][neighbors[left].index(top)] = right
+        neighbors[right][neighbors[right].index(top)] = left
+
+    # orient away from a new root on the edge of tip 0, assigning new
+    # ids to internal Nodes and resolving polytomies as caterpillars.
+    children = [[] for _ in range(ntips)]
+
+    def add_node(kids: List[int]) -> int:
+        children.append(kids)
+        return len(children) - 1
+
+    stack = [(0, neighbors[0][0], None)]
+    root = add_node([0, None])
+    while stack:
+        parent_id, old, slot = stack.pop()
+        if old < ntips:
+            new = old
+        else:
+            kids = [i for i in neighbors[old] if i != parent_id]
+            new = add_node([None, None])
+            last = new
+            for kid in kids[:-2]:
+                nxt = add_node([None, None])
+                stack.append((old, kid, (last, 0)))
+                children[last][1] = nxt
+                last = nxt
+            stack.append((old, kids[-2], (last, 0)))
+            stack.append((old, kids[-1], (last, 1)))
+        if slot is None:
+            children[root][1] = new
+        else:
+            children[slot[0]][slot[1]] = new
+    return children, root
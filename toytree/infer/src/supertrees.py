@@ -13,6 +13,7 @@ import numpy as np
 from pandas import DataFrame
 from toytree.core import ToyTree
 from toytree.core.multitree import MultiTree
+from toytree.enum.src.bipartitions import _bitmasks_to_array
 
 
 def get_matrix_representation(tree: ToyTree, tip_labels: list[str], df: bool = False) -> np.ndarray:
@@ -33,18 +34,13 @@ def get_matrix_representation(tree: ToyTree, tip_labels: list[str], df: bool = F
         Return table as a pandas DataFrame with tip_labels as the index
         and columns corresponding to tree
     """
-    # get array filled w/ 1 for tips in each clade
-    data = []
-    for bipart in tree.enum.iter_bipartitions():
-        dat = np.zeros(len(tip_labels), dtype=int)
-        for i in bipart[0]:
-            dat[tip_labels.index(i)] = 1
-        data.append(dat)
+    # get array filled w/ 1 for tips in each clade, from bitmasks
+    # over the ordering of tip_labels.
+    masks = list(tree.enum.iter_bipartitions(type="bitmask", tip_labels=tip_labels))
+    data = _bitmasks_to_array(masks, len(tip_labels)).astype(int)
 
     # get mask of missing taxa in this tree
-    mask = np.zeros(len(tip_labels), dtype=np.bool_)
-    for i in set(tip_labels) - set(tree.get_tip_labels()):
-        mask[tip_labels.index(i)] = True
+    mask = ~np.isin(tip_labels, tree.get_tip_labels())
 
     # create a masked array to
     marr = np.ma.array(
@@ -56,7 +52,7 @@ def get_matrix_representation(tree: ToyTree, tip_labels: list[str], df: bool = F
     # convert to dataframe
     if df:
         return DataFrame(marr.T, index=tip_labels)
-    print(marr.T)
+    return marr.T
 
 
 if __name__ == "__main__":
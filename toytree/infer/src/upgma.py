@@ -1,19 +1,44 @@
 #!/usr/bin/env python
 
-"""Infer a tree from a distance matrix using UPGMA clustering.
-
+"""Infer a tree from a distance matrix by hierarchical clustering.
+
+Clustering uses the nearest-neighbor chain algorithm, which runs in
+O(n^2) time on a condensed (upper triangle) copy of the distance
+matrix. A chain of nearest neighbors is grown from any cluster until
+two clusters are each other's nearest neighbors, which are then
+merged. This finds the same clusters as merging the globally closest
+pair in each round for all supported linkage methods (UPGMA, WPGMA,
+single and complete), since these are all reducible.
+
+References
+----------
+- Murtagh F (1983). "A survey of recent advances in hierarchical
+  clustering algorithms." The Computer Journal 26(4): 354-359.
+- Mullner D (2011). "Modern hierarchical, agglomerative clustering
+  algorithms." arXiv:1109.2378.
 """
 
+from typing import Iterator, Sequence, Tuple
 import numpy as np
 import pandas as pd
 from loguru import logger
 import toytree
+from toytree.utils import ToytreeError
 
 
 logger = logger.bind(name="toytree")
 
+METHODS = {
+    "upgma": "average",
+    "average": "average",
+    "wpgma": "weighted",
+    "weighted": "weighted",
+    "single": "single",
+    "complete": "complete",
+}
+
 
-def upgma_tree(data: pd.DataFrame | np.ndarray) -> toytree.ToyTree:
+def upgma_tree(data: pd.DataFrame | np.ndarray, method: str = "upgma") -> toytree.ToyTree:
     """Return a ToyTree inferred by UPGMA from a distance matrix.
 
     Unweighted Pair Group Method with Arithmetic Mean (UPGMA) is a
@@ -21,13 +46,24 @@ def upgma_tree(data: pd.DataFrame | np.ndarray) -> toytree.ToyTree:
     trees from a distance matrix. It assumes a molecular clock (i.e.,
     all lineages evolve at a constant rate) and constructs an
     ultrametric tree where all leaves are equidistant from the root.
+    Other linkage methods can be selected with the `method` arg, in
+    which case the height of each Node is still half the distance
+    between the two clusters it joins.
 
     Parameters
     ----------
     data: pd.DataFrame | np.ndarray
         An input dataframe or array representing a symmetric distance
-        matrix. If no labels are provided (e.g., array) then tips are
-        named by their row index.
+        matrix, or a 1-D condensed distance vector (the upper triangle
+        of a matrix in row order, as returned by
+        `scipy.spatial.distance.pdist`), which uses half the memory.
+        If no labels are provided (e.g., array) then tips are named by
+        their row index.
+    method: str
+        The linkage method used to compute the distance from a new
+        cluster to other clusters. Options are "upgma" (or "average"),
+        "wpgma" (or "weighted"), "single" or "complete". These match
+        the methods of the same name in `scipy.cluster.hierarchy.linkage`.
 
     Examples
     --------
@@ -35,80 +71,39 @@ def upgma_tree(data: pd.DataFrame | np.ndarray) -> toytree.ToyTree:
     >>> tree = toytree.rtree.unittree(ntips=8, seed=123)
     >>> dist = tree.distance.get_tip_distance_matrix()
     >>> ntree = toytree.infer.upgma_tree(dist)
+    >>> # condensed input
+    >>> cond = dist[np.triu_indices(8, 1)]
+    >>> ntree = toytree.infer.upgma_tree(cond, method="wpgma")
     """
-    # convert data to an array for faster processing.
-    arr = np.array(data, dtype=float)
+    if method not in METHODS:
+        raise ToytreeError(f"method must be one of {list(METHODS)}, not '{method}'.")
+    cond, ntips = _get_condensed(data)
 
     # get names index from df or arr, do not allow replicate names
-    index = data.index if isinstance(data, pd.DataFrame) else range(data.shape[0])
+    index = data.index if isinstance(data, pd.DataFrame) else range(ntips)
     if len(index) != len(set(index)):
         logger.warning("identical names found in data, using int indices for upgma tree")
-        index = range(data.shape[0])
+        index = range(ntips)
 
-    # store tip Nodes, and add ntips attribute.
-    nodes = {}
+    # store tip Nodes by their cluster index.
+    nodes = []
     for name in index:
         node = toytree.Node(name=name, dist=0)
-        node._ntips = 1
-        nodes[name] = node
-
-    # loop to cluster and reduce matrix until only 1 sample left.
-    while arr.shape[0] > 1:
-
-        # get ordered names from nodes dict
-        names = list(nodes.keys())
-
-        # get index (i,j) of min_dist on off-diagonal (selects first one if tied)
-        np.fill_diagonal(arr, np.inf)
-        min_dist = np.min(arr)
-        idxs = [i[0] for i in np.where(arr == min_dist)]
-
-        # create new interior Node
-        new_name = f"i-{arr.shape[0]}"
-        inode = toytree.Node(name=new_name, dist=0)
-        nodes[new_name] = inode
-
-        # connect i,j to new Node with equal branch lengths
-        for idx in idxs:
-            name = names[idx]
-            node = nodes[name]
-            node._dist = (min_dist / 2) - node._height
+        node._height = 0
+        nodes.append(node)
+
+    # connect each merged pair to a new Node with equal branch lengths
+    # and store it at the index of the second cluster.
+    for nmerged, (i, j, dist) in enumerate(_iter_nn_chain_linkage(cond, ntips, METHODS[method])):
+        inode = toytree.Node(name=f"i-{ntips - nmerged}", dist=0)
+        for node in (nodes[i], nodes[j]):
+            node._dist = (dist / 2) - node._height
             inode._add_child(node)
-
-        # set height of new Node to be used by its parent to find dist.
-        inode._height = node._height + node._dist
-
-        # count n leaves descended from new Node
-        inode._ntips = sum(i._ntips for i in inode._children)
-
-        # update the distance matrix to remove i,j and add new Node.
-        new_dim = arr.shape[0] - 1
-        new_arr = np.zeros(shape=(new_dim, new_dim))
-
-        # index of rows to keep
-        nidxs = [i for i in range(arr.shape[0]) if i not in idxs]
-
-        # fill kept rows into the new_arr
-        new_arr[:new_dim - 1, :][:, :new_dim - 1] = arr[nidxs, :][:, nidxs]
-
-        # remove i,j from nodes, and get ntips of each.
-        nti = nodes.pop(names[idxs[0]])._ntips
-        ntj = nodes.pop(names[idxs[1]])._ntips
-
-        # get avg distance of new Node to every other Node.
-        diks = arr[idxs[0], nidxs]
-        djks = arr[idxs[1], nidxs]
-        wdiks = (nti / (nti + ntj)) * diks
-        wdjks = (ntj / (nti + ntj)) * djks
-        avg_dists = wdiks + wdjks
-        new_arr[-1, :-1] = avg_dists
-        new_arr[:-1, -1] = avg_dists
-
-        # advance internal node name counter
-        arr = new_arr
+        inode._height = dist / 2
+        nodes[j] = inode
 
     # convert treenode to a ToyTree
-    tree = toytree.ToyTree(nodes[new_name])
+    tree = toytree.ToyTree(inode)
 
     # collapse polytomies (zero-dist) edges
     to_collapse = [i for i in tree[:-1] if i._dist == 0]
@@ -117,6 +112,99 @@ def upgma_tree(data: pd.DataFrame | np.ndarray) -> toytree.ToyTree:
     return tree
 
 
+def _get_condensed(data: pd.DataFrame | np.ndarray) -> Tuple[np.ndarray, int]:
+    """Return a float copy of the condensed distances with one extra
+    inf value appended, and the number of samples.
+    """
+    arr = np.asarray(data)
+    if arr.ndim == 1:
+        ntips = int(round((1 + np.sqrt(1 + 8 * arr.size)) / 2))
+        if ntips * (ntips - 1) // 2 != arr.size:
+            raise ToytreeError(
+                f"condensed distances of length {arr.size} do not match "
+                "the upper triangle of a square matrix.")
+        cond = np.empty(arr.size + 1)
+        cond[:-1] = arr
+    elif arr.ndim == 2 and arr.shape[0] == arr.shape[1]:
+        ntips = arr.shape[0]
+        cond = np.empty(ntips * (ntips - 1) // 2 + 1)
+        pos = 0
+        for idx in range(ntips - 1):
+            cond[pos: pos + ntips - idx - 1] = arr[idx, idx + 1:]
+            pos += ntips - idx - 1
+    else:
+        raise ToytreeError("data must be a square matrix or condensed distances.")
+    if ntips < 2:
+        raise ToytreeError("data must contain distances among at least 2 samples.")
+    cond[-1] = np.inf
+    return cond, ntips
+
+
+def _iter_nn_chain_linkage(cond: np.ndarray, ntips: int, method: str) -> Iterator[Tuple[int, int, float]]:
+    """Yield (i, j, dist) for each merge of clusters i and j.
+
+    The merged cluster is stored at index j, and index i is removed.
+    Merges are yielded in the order they are found, which is not
+    necessarily in order of distance. The condensed distances are
+    modified in place. The last value of `cond` must be inf, and is
+    used as the distance of each cluster to itself.
+    """
+    # the distance between i < k is at cond[starts[i] + k].
+    tips = np.arange(ntips)
+    starts = tips * ntips - tips * (tips + 1) // 2 - tips - 1
+    selfpos = cond.size - 1
+    sizes = np.ones(ntips)
+    active = np.ones(ntips, dtype=bool)
+
+    def get_row_index(idx: int) -> np.ndarray:
+        """Return positions in cond of distances from cluster idx."""
+        rowidx = np.empty(ntips, dtype=np.int64)
+        rowidx[:idx] = starts[:idx] + idx
+        rowidx[idx] = selfpos
+        rowidx[idx + 1:] = starts[idx] + tips[idx + 1:]
+        return rowidx
+
+    chain = []
+    for _ in range(ntips - 1):
+        if not chain:
+            chain.append(int(np.argmax(active)))
+
+        # extend the chain until the last two are reciprocal nearest
+        # neighbors. Ties prefer the previous cluster in the chain,
+        # which is required for the chain to terminate.
+        while True:
+            x = chain[-1]
+            row = cond[get_row_index(x)]
+            y = int(np.argmin(row))
+            if len(chain) > 1 and row[chain[-2]] <= row[y]:
+                y = chain[-2]
+                break
+            chain.append(y)
+        dist = row[y]
+        chain.pop()
+        chain.pop()
+
+        # merge x and y, storing the new cluster at y.
+        xidx = get_row_index(x)
+        yidx = get_row_index(y)
+        dxs = cond[xidx]
+        dys = cond[yidx]
+        if method == "average":
+            new = (sizes[x] * dxs + sizes[y] * dys) / (sizes[x] + sizes[y])
+        elif method == "weighted":
+            new = (dxs + dys) / 2
+        elif method == "single":
+            new = np.minimum(dxs, dys)
+        else:
+            new = np.maximum(dxs, dys)
+        new[x] = new[y] = np.inf
+        cond[xidx] = np.inf
+        cond[yidx] = new
+        sizes[y] += sizes[x]
+        active[x] = False
+        yield x, y, dist
+
+
 if __name__ == "__main__":
 
     # example from Felsenstein
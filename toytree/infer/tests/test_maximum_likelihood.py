@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Unittests for vectorized likelihood calculations."""
+
+
+import unittest
+import toytree
+import numpy as np
+import pandas as pd
+from toytree.infer.src.maximum_likelihood import (
+    JC69, K80, TN93, get_tree_likelihood, get_tree_loglikelihood)
+
+
+class TestTreeLoglikelihood(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = toytree.rtree.unittree(12, treeheight=0.3, seed=123)
+        rng = np.random.default_rng(123)
+        self.seqs = {
+            i: "".join(rng.choice(list("ACGT"), size=40))
+            for i in self.tree.get_tip_labels()
+        }
+
+    def test_same_as_per_site(self):
+        # sum of per-site recursive log-likelihoods equals pruning.
+        model = K80()
+        _, pi = model.get_rate_matrix_array(kappa=2.)
+        func = model.get_p_matrix_function(kappa=2.)
+        old = sum(
+            np.log(get_tree_likelihood(self.tree, {i: j[s] for i, j in self.seqs.items()}, func, pi))
+            for s in range(40))
+        new = get_tree_loglikelihood(self.tree, self.seqs, model, kappa=2.)
+        self.assertAlmostEqual(old, new, places=6)
+
+    def test_data_formats_and_rooting(self):
+        # reversible models give the same value for any rooting.
+        df = pd.DataFrame([list(i) for i in self.seqs.values()], index=list(self.seqs))
+        loglik = get_tree_loglikelihood(self.tree, df, JC69())
+        rtree = self.tree.root(self.tree.get_tip_labels()[3])
+        self.assertAlmostEqual(loglik, get_tree_loglikelihood(rtree, self.seqs, JC69()), places=6)
+        arr = [self.seqs[self.tree[i].name] for i in range(self.tree.ntips)]
+        self.assertAlmostEqual(loglik, get_tree_loglikelihood(self.tree, arr, JC69()), places=6)
+
+    def test_tn93_and_ambiguous_sites(self):
+        seqs = {i: "N" + j[1:] for i, j in self.seqs.items()}
+        model = TN93()
+        full = get_tree_loglikelihood(self.tree, self.seqs, model, kappa_ls=(3., 2.), pi_ls=(.1, .2, .3, .4))
+        part = get_tree_loglikelihood(self.tree, seqs, model, kappa_ls=(3., 2.), pi_ls=(.1, .2, .3, .4))
+        self.assertTrue(full < part < 0)
+
+    def test_large_tree_does_not_underflow(self):
+        tree = toytree.rtree.unittree(1000, treeheight=5., seed=123)
+        seqs = {i: "ACGT" for i in tree.get_tip_labels()}
+        self.assertTrue(np.isfinite(get_tree_loglikelihood(tree, seqs, JC69())))
+
+    def test_impossible_site_and_missing_tip(self):
+        # different states on a zero-length path are impossible.
+        tree = toytree.tree("((a:0,b:0):1,c:1);")
+        loglik = get_tree_loglikelihood(tree, {"a": "AA", "b": "AC", "c": "AA"}, JC69())
+        self.assertEqual(loglik, -np.inf)
+        loglik = get_tree_loglikelihood(tree, {"a": "AA", "b": "AA", "c": "AC"}, JC69())
+        self.assertTrue(np.isfinite(loglik))
+        with self.assertRaises(toytree.utils.ToytreeError):
+            get_tree_loglikelihood(tree, {"a": "AA", "b": "AA"}, JC69())
+
+    def test_byte_strings(self):
+        arr = [self.seqs[self.tree[i].name].encode() for i in range(self.tree.ntips)]
+        self.assertAlmostEqual(
+            get_tree_loglikelihood(self.tree, self.seqs, JC69()),
+            get_tree_loglikelihood(self.tree, arr, JC69()), places=6)
+
+
+if __name__ == "__main__":
+    toytree.set_log_level("CRITICAL")
+    unittest.main()
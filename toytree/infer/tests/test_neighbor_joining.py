@@ -83,6 +83,32 @@ class TestNeighborJoining(unittest.TestCase):
         tree = toytree.infer.neighbor_joining_tree(df)
 
 
+    def test_additive_matrix_recovers_tree(self):
+        # NJ recovers the tree and edge lengths of an additive matrix.
+        tree = toytree.rtree.unittree(30, seed=123)
+        rng = np.random.default_rng(123)
+        tree = tree.set_node_data("dist", {i: rng.uniform(0.1, 1) for i in range(tree.nnodes)})
+        dist = tree.distance.get_tip_distance_matrix(df=True)
+        nj = toytree.infer.neighbor_joining_tree(dist)
+        self.assertEqual(toytree.distance.get_treedist_rf(tree, nj), 0)
+        distr = nj.distance.get_tip_distance_matrix(df=True).loc[dist.index, dist.columns]
+        self.assertTrue(np.allclose(distr.values, dist.values, atol=1e-4))
+
+
+    def test_same_as_original_algorithm(self):
+        # the search over sorted rows finds the same joins as a full
+        # search of the Q matrix on a noisy non-additive matrix.
+        from toytree.infer.src.neighbor_joining import (
+            iter_nj_algorithm, _iter_nj_algorithm_reference)
+        rng = np.random.default_rng(123)
+        arr = rng.uniform(1, 2, size=(60, 60))
+        arr = arr + arr.T
+        np.fill_diagonal(arr, 0)
+        joins = [set(i[:2]) for i in iter_nj_algorithm(arr)]
+        ref = [set(i[:2]) for i in _iter_nj_algorithm_reference(arr)]
+        self.assertEqual(joins[:-3], ref[:-3])
+
+
 if __name__ == "__main__":
     toytree.set_log_level("CRITICAL")
     unittest.main()
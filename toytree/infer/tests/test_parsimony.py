@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""Unittests for parsimony scores."""
+
+
+import unittest
+import toytree
+import numpy as np
+import pandas as pd
+
+
+def fitch_score_sets(tree, data):
+    """Return Fitch score computed one site at a time with sets."""
+    score = 0
+    for site in range(data.shape[1]):
+        sets = {}
+        for node in tree.traverse("postorder"):
+            if node.is_leaf():
+                sets[node] = {data[node.idx, site]}
+                continue
+            left, right = (sets[i] for i in node.children)
+            sets[node] = left & right
+            if not sets[node]:
+                sets[node] = left | right
+                score += 1
+    return score
+
+
+class TestParsimony(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = toytree.tree("((a,b),(c,d));")
+        self.seqs = ["AAGT", "AGGT", "CGTT", "CRTA"]
+
+    def test_fitch_dna_iupac(self):
+        score = toytree.infer.get_parsimony_score(self.tree, self.seqs)
+        self.assertEqual(score, 4)
+
+    def test_fitch_polytomy(self):
+        tree = toytree.tree("(a,b,c,d);")
+        score = toytree.infer.get_parsimony_score(tree, self.seqs)
+        self.assertEqual(score, 6)
+
+    def test_dataframe_matched_by_name(self):
+        df = pd.DataFrame([list(i) for i in self.seqs], index=list("abcd")).iloc[::-1]
+        score = toytree.infer.get_parsimony_score(self.tree, df)
+        self.assertEqual(score, 4)
+
+    def test_fitch_same_as_sets(self):
+        tree = toytree.rtree.rtree(20, seed=123)
+        rng = np.random.default_rng(123)
+        data = rng.integers(0, 3, size=(20, 200))
+        score = toytree.infer.get_parsimony_score(tree, data, data_as_dna=False)
+        self.assertEqual(score, fitch_score_sets(tree, data))
+
+    def test_sankoff_unit_costs_and_rooting(self):
+        tree = toytree.rtree.rtree(20, seed=123)
+        rng = np.random.default_rng(123)
+        data = np.array(list("ACGT"))[rng.integers(0, 4, size=(20, 200))]
+        data = pd.DataFrame(data, index=tree.get_tip_labels())
+        tool = toytree.infer.Parsimony(data, weights=1 - np.eye(4))
+        fitch = toytree.infer.get_parsimony_score(tree, data)
+        self.assertEqual(tool.get_score(tree), fitch)
+        tool.weights[[0, 1, 2, 3], [2, 3, 0, 1]] = 0.5
+        score = tool.get_score(tree)
+        self.assertLess(score, fitch)
+        self.assertAlmostEqual(score, tool.get_score(tree.root(5)))
+
+    def test_bad_characters(self):
+        with self.assertRaises(toytree.utils.ToytreeError):
+            toytree.infer.get_parsimony_score(self.tree, ["AAGT", "AGGT", "CGTT", "CXTA"])
+
+
+if __name__ == "__main__":
+    toytree.set_log_level("CRITICAL")
+    unittest.main()
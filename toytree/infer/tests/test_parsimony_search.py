@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+"""Unittests for parsimony tree search."""
+
+
+import unittest
+import toytree
+import numpy as np
+import pandas as pd
+from toytree.infer.src.parsimony import Parsimony
+from toytree.infer.src.parsimony_search import _FitchSearchState, _get_binary_children
+
+
+class TestParsimonySearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = toytree.rtree.unittree(20, seed=123)
+        self.data = self.tree.pcm.simulate_discrete_data(
+            nstates=4, nreplicates=200, tips_only=True, seed=123)
+        self.data.index = self.tree.get_tip_labels()
+        self.start = toytree.rtree.rtree(20, seed=123)
+        self.start = self.start.set_node_data(
+            "name", dict(zip(range(20), self.tree.get_tip_labels())))
+
+    def test_incremental_scores(self):
+        # scores updated by move deltas equal full rescoring.
+        tool = Parsimony(self.data, data_as_dna=False)
+        rows = {j: i for i, j in enumerate(tool.names)}
+        state = _FitchSearchState(
+            tool.patterns, tool.counts, *_get_binary_children(self.start, rows))
+        self.assertEqual(state.score, tool.get_score(self.start))
+        rng = np.random.default_rng(123)
+        for _ in range(10):
+            state.apply_nni(*state.get_best_nni())
+            self.assertEqual(state.score, tool.get_score(state.get_tree(tool.names)))
+            subtrees = state.iter_spr_subtrees()
+            move = state.get_best_spr(subtrees[rng.integers(len(subtrees))])
+            state.apply_spr(*move)
+            self.assertEqual(state.score, tool.get_score(state.get_tree(tool.names)))
+
+    def test_search_improves_score(self):
+        tool = Parsimony(self.data, data_as_dna=False)
+        nni = toytree.infer.parsimony_tree_search(
+            self.data, tree=self.start, moves="nni", data_as_dna=False)
+        spr = toytree.infer.parsimony_tree_search(
+            self.data, tree=self.start, data_as_dna=False)
+        self.assertLess(tool.get_score(nni), tool.get_score(self.start))
+        self.assertLessEqual(tool.get_score(spr), tool.get_score(nni))
+        self.assertEqual(sorted(spr.get_tip_labels()), sorted(self.tree.get_tip_labels()))
+        self.assertFalse(spr.is_rooted())
+
+    def test_budget_and_njobs(self):
+        tool = Parsimony(self.data, data_as_dna=False)
+        one = toytree.infer.parsimony_tree_search(
+            self.data, tree=self.start, max_iter=1, data_as_dna=False)
+        self.assertLess(tool.get_score(one), tool.get_score(self.start))
+        serial = toytree.infer.parsimony_tree_search(self.data, data_as_dna=False)
+        parallel = toytree.infer.parsimony_tree_search(self.data, data_as_dna=False, njobs=2)
+        self.assertEqual(toytree.distance.get_treedist_rf(serial, parallel), 0)
+
+
+if __name__ == "__main__":
+    toytree.set_log_level("CRITICAL")
+    unittest.main()
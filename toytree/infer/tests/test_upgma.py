@@ -84,6 +84,33 @@ class TestUPGMA(unittest.TestCase):
         tree = toytree.infer.upgma_tree(df)
 
 
+    def test_same_as_scipy_linkage(self):
+        # cophenetic distances match scipy for each linkage method.
+        from scipy.cluster.hierarchy import linkage, cophenet
+        rng = np.random.default_rng(123)
+        points = rng.normal(size=(40, 3))
+        dist = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+        cond = dist[np.triu_indices(40, 1)]
+        names = [str(i) for i in range(40)]
+        for method, smethod in [
+            ("upgma", "average"), ("wpgma", "weighted"),
+            ("single", "single"), ("complete", "complete"),
+        ]:
+            coph = cophenet(linkage(cond, method=smethod))
+            for data in (dist, cond):
+                tree = toytree.infer.upgma_tree(data, method=method)
+                distr = tree.distance.get_tip_distance_matrix(df=True).loc[names, names]
+                self.assertTrue(np.allclose(distr.values[np.triu_indices(40, 1)], coph))
+
+
+    def test_bad_input(self):
+        dist = np.zeros(5)
+        with self.assertRaises(toytree.utils.ToytreeError):
+            toytree.infer.upgma_tree(dist)
+        with self.assertRaises(toytree.utils.ToytreeError):
+            toytree.infer.upgma_tree(np.zeros(6), method="nj")
+
+
 if __name__ == "__main__":
     toytree.set_log_level("CRITICAL")
     unittest.main()
@@ -7,4 +7,5 @@
 from toytree.io.src.newick import parse_newick_string, parse_newick_string_custom
 from toytree.io.src.treeio import tree
 from toytree.io.src.mtreeio import mtree
+from toytree.io.src.parse import iter_trees
 from toytree.io.src.writer import write
@@ -4,16 +4,20 @@
 
 """
 
-from typing import Union, Collection
+from typing import Union, Collection, Iterator
 from pathlib import Path
 import pandas as pd
 from toytree.core.tree import ToyTree
 from toytree.core.multitree import MultiTree
-from toytree.io.src.parse import parse_multitree, parse_tree
+from toytree.io.src.parse import parse_multitree, parse_tree, parse_trees_parallel
 from toytree.utils import ToytreeError
 
 
-def mtree(data: Union[str, Path, Collection[ToyTree]], **kwargs) -> MultiTree:
+def mtree(
+    data: Union[str, Path, Collection[ToyTree]],
+    njobs: int = 1,
+    **kwargs,
+) -> MultiTree:
     """General class constructor to parse and return a MultiTree.
 
     Input arguments as a multi-newick string, filepath, Url, or
@@ -23,22 +27,35 @@ def mtree(data: Union[str, Path, Collection[ToyTree]], **kwargs) -> MultiTree:
     ----------
     data: str, Path, or Collection
         string, filepath, or URL for a newick or nexus formatted list
-        of trees, or a collection of ToyTree objects.
+        of trees, or a collection or iterator of ToyTree objects.
+    njobs: int
+        Number of processes on which to parse newick strings. Parsing
+        in parallel is faster when parsing many or very large trees.
 
     Examples
     --------
     >>> mtre = toytree.mtree("many_trees.nwk")
     >>> mtre = toytree.mtree("((a,b),c);\n((c,a),b);")
     >>> mtre = toytree.mtree([toytree.rtree.rtree(10) for i in range(5)])
+    >>> mtre = toytree.mtree(toytree.io.iter_trees("many_trees.nex", burnin=100))
+    >>> mtre = toytree.mtree("many_large_trees.nwk", njobs=8)
     """
     # parse the newick object into a list of Toytrees
     treelist = []
 
     # a single file path containing multline newicks or nexus.
     if isinstance(data, (Path, str)):
-        return parse_multitree(data, **kwargs)
+        return parse_multitree(data, njobs=njobs, **kwargs)
 
     # --- Collections of inputs --- #
+    # trees yielded from an iterator (e.g., `toytree.io.iter_trees`)
+    # are new objects, and so are stored without copying.
+    if isinstance(data, Iterator):
+        data = list(data)
+        assert data, "MultiTree is empty, parsing failed."
+        if isinstance(data[0], ToyTree):
+            return MultiTree(data)
+
     assert len(set(type(i) for i in data)) == 1, "input data cannot be multiple types."
 
     # handle ipcoal sim series
@@ -51,7 +68,10 @@ def mtree(data: Union[str, Path, Collection[ToyTree]], **kwargs) -> MultiTree:
         treelist = data
 
     elif isinstance(data[0], (str, Path)):
-        treelist = [parse_tree(i) for i in data]
+        if njobs > 1:
+            treelist = parse_trees_parallel(((i, {}) for i in data), njobs, **kwargs)
+        else:
+            treelist = [parse_tree(i, **kwargs) for i in data]
 
     else:
         raise ToytreeError("mtree input format not recognized.")
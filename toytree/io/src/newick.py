@@ -38,6 +38,7 @@ from toytree.utils import ToytreeError
 
 logger = logger.bind(name="toytree")
 PAIRS = {'(': '()', '[': '[]', '{': "{}"}
+NEWICK_DELIMS = re.compile(r"[(),\[]")
 COLON_OUTSIDE_SQUARE_BRACKETS = re.compile(r'(?<!\[):|:(?!\])')
 RESERVED_FEATURE_NAMES = ["idx", "height", "dist"]
 NHX_ERROR = """\
@@ -133,68 +134,125 @@ def _iter_split_non_nested(node_str: str, delim: str = ",") -> Iterator[str]:
             end += 1
 
 
-def _walk_newick_subtrees(
+def _iter_newick_tokens(newick: str) -> Iterator[str]:
+    """Generator of structural tokens and Node label strings.
+
+    Yields '(', ',' and ')' as single characters, and all text
+    between them (a Node label, dist, and square-bracket comments) as
+    a single str, in one left-to-right pass over the newick string.
+    Comments are skipped over as a whole so that any delimiters they
+    contain are not treated as structural tokens.
+    """
+    pos = 0
+    final = len(newick)
+    label = []
+    while pos < final:
+        match = NEWICK_DELIMS.search(newick, pos)
+
+        # remaining text is the label of the last (root) Node.
+        if match is None:
+            label.append(newick[pos:])
+            break
+
+        # store text preceding the delimiter as part of a label
+        char = match.group()
+        start = match.start()
+        if start > pos:
+            label.append(newick[pos:start])
+
+        # skip to the matching close of a comment block
+        if char == "[":
+            end = _find_closing(newick, start + 1, "[]")
+            label.append(newick[start:end + 1])
+            pos = end + 1
+            continue
+
+        # yield any label text followed by the structural token
+        if label:
+            yield "".join(label)
+            label = []
+        yield char
+        pos = start + 1
+
+    if label:
+        yield "".join(label)
+
+
+def _parse_newick_nodes(
     newick: str,
     aggregator: Callable[[str, Any, float, Any], Any] = None,
     dist_formatter: Callable[[str], float] = None,
     feat_formatter: Callable[[str], Any] = None
 ) -> Tuple[Any, Set[str]]:
-    """Recursive func (private) for extracting nested newick subtrees.
-
-    The return type depends on the aggregator function.
+    """Return the aggregated root object and set of edge features.
+
+    Iterative (non-recursive) stack machine over the newick tokens.
+    A list of finished child objects is kept for each open clade;
+    an object is created by the aggregator as soon as its label has
+    been read (postorder), so each clade is visited exactly once and
+    the newick string is never sliced. The return type depends on
+    the aggregator function.
     """
-    # split first node from the newick string (inner)root[x]:dist[y];
-    # leaving 'inner' which contains this Node's children.
-    inner, label, dist, nmeta, emeta = _node_str_to_data(newick)
-
-    # iterator of substrings split on ',' to separate children.
-    # ""                  no children
-    # ","                 two children w/ no info
-    # ",,"                multiple children w/ no info
-    # "a,b"               children with names
-    # "a:3,b:4"           children w/ names and dist"
-    # "a[...]:100[...]"   child w/ '' and meta
-    # "(c,d),e"           subtree and child(ren) w or w/o stuff
-    subtrees = _iter_split_non_nested(inner, delim=",")
-
-    # iterate over subtrees calling this function recursively on each
-    # and storing their data to their parent Node's child_data list.
     edge_features = set()
-    child_data = []
-    for child in subtrees:
-        args = (aggregator, dist_formatter, feat_formatter)
-        child_obj, features = _walk_newick_subtrees(child, *args)
-        child_data.append(child_obj)
-        edge_features.update(features)
-        # edge_features |= features
-
-    # str to float format the dist values
-    distance = 1. if dist is None else dist_formatter(dist)
 
-    # str to dict format the meta features
-    nmeta = {} if nmeta is None else feat_formatter(nmeta)
-    emeta = {} if emeta is None else feat_formatter(emeta)
-    edge_features.update(set(emeta))
-    # edge_features |= set(emeta)
+    # stack of child lists for each open '(' clade, w/ top-level last.
+    levels = [[]]
+    # children of the last closed clade waiting for its label.
+    closed = None
+    label = ""
+
+    def aggregate(label: str, children: List[Any]) -> Any:
+        """Return an aggregated object from a Node label string."""
+        name, dist, nmeta, emeta = _node_str_to_data(label)
+
+        # str to float format the dist values
+        distance = 1. if dist is None else dist_formatter(dist)
+
+        # str to dict format the meta features
+        nmeta = {} if nmeta is None else feat_formatter(nmeta)
+        emeta = {} if emeta is None else feat_formatter(emeta)
+        edge_features.update(emeta)
+        return aggregator(name, children, distance, {**nmeta, **emeta})
+
+    for token in _iter_newick_tokens(newick):
+        if token == "(":
+            if closed is not None or label:
+                raise ToytreeError(
+                    f"Newick string is malformed near: '{label}('")
+            levels.append([])
+
+        elif token in ",)":
+            children = [] if closed is None else closed
+            levels[-1].append(aggregate(label, children))
+            closed = None
+            label = ""
+            if token == ")":
+                if len(levels) == 1:
+                    raise ToytreeError("Newick string parentheses are imbalanced")
+                closed = levels.pop()
+        else:
+            label = token
 
-    # aggegator func converts nested data to dict, Node, or other format.
-    all_meta = {**nmeta, **emeta}
-    # all_meta = nmeta | emeta  # dict merge operator '|' only py3.9+
-    return aggregator(label, child_data, distance, all_meta), edge_features
+    # the final label belongs to the root, which must be the only
+    # object at the top level.
+    if len(levels) != 1 or levels[0]:
+        raise ToytreeError("Newick string must contain a single root Node")
+    children = [] if closed is None else closed
+    return aggregate(label, children), edge_features
 
 
-def _node_str_to_data(newick: str) -> Tuple[str, str, str, str, str]:
-    """Return data from a Node string (inner, label, dist, nmeta, emeta)
+def _node_str_to_data(outer: str) -> Tuple[str, str, str, str]:
+    """Return data from a Node string (label, dist, nmeta, emeta)
 
     """
-    # split this node from the rest of tree.
-    if newick.startswith("("):
-        eidx = _find_closing(newick)
-        outer = newick[eidx + 1:]
-        inner = newick[1: eidx]
-    else:
-        outer = newick
-        inner = ""
+    # fast path for labels without comments: label, label:dist
+    if "[" not in outer:
+        parts = outer.split(":")
+        if len(parts) == 1:
+            return outer, None, None, None
+        if len(parts) == 2:
+            return parts[0], parts[1], None, None
+        raise ToytreeError(f"Newick string is malformed near: '{outer}'")
 
     # extract info from Node and Edge if ":" occurs outside sq brackets
     # label:          -> (label, None)
@@ -220,7 +278,7 @@ def _node_str_to_data(newick: str) -> Tuple[str, str, str, str, str]:
     else:
         label, nmeta = _split_label_and_meta(outer)
         dist, emeta = None, None
-    return inner, label, dist, nmeta, emeta
+    return label, dist, nmeta, emeta
 
 
 def _split_label_and_meta(substring: str) -> Tuple[str, str]:
@@ -317,9 +375,12 @@ def parse_newick_string_custom(
 ) -> Tuple[ToyTree, List[str]]:
     """Return a ToyTree from a newick string.
 
-    Recursive function to build connected Nodes from nested data in
-    newick format, and return as a ToyTree. Features parsed from the
-    newick can be formatted with a custom formatter function, or using
+    Builds connected Nodes from nested data in newick format in a
+    single non-recursive pass, and returns as a ToyTree. This scales
+    linearly with the length of the newick string and is not limited
+    by the recursion limit on very deep (e.g., caterpillar) trees.
+    Features parsed from the newick can be formatted with a custom
+    formatter function, or using
     the default auto-formatting, which aims to infer the proper dtype
     based on the data.
 
@@ -353,8 +414,8 @@ def parse_newick_string_custom(
         similar to above but tries to infer value types.
     aggregator: Callable
         A custom function that takes (name, children, dist, features)
-        and returns a Node object. This is used to recursively build
-        the Node objects from tuples of extracted newick data.
+        and returns a Node object. This is called on each Node in
+        postorder to build the Node objects from extracted newick data.
     internal_labels: str or None
         Feature type of internal labels. If None it is inferred to be
         either 'name' or 'support' based on numeric or string types
@@ -379,7 +440,7 @@ def parse_newick_string_custom(
 
     # build the connected Nodes from newick w/ features saved.
     args = (newick, aggregator, dist_formatter, feat_formatter)
-    treenode, edge_features = _walk_newick_subtrees(*args)
+    treenode, edge_features = _parse_newick_nodes(*args)
 
     # set default root dist to 0 (Note: other Node's w/o dist default=1.)
     treenode._dist = 0.
@@ -416,7 +477,8 @@ def node_aggregator(
     node = Node(name=label)
     node._dist = distance
     for child in children:
-        node._add_child(child)
+        child._up = node
+    node._children = tuple(children)
 
     # if any metadata annotations (e.g., [&x=3]) store as features
     for key, value in features.items():
@@ -511,7 +573,7 @@ def parse_newick_string(
 ) -> ToyTree:
     """Return a ToyTree from a newick string.
 
-    Recursive function to build connected Nodes from nested data in
+    Iterative function to build connected Nodes from nested data in
     newick format, and return as a ToyTree. Features parsed from the
     newick can be formatted with a custom formatter function, or with
     the default auto-formatting, which aims to infer the proper dtype
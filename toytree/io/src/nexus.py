@@ -62,6 +62,18 @@ def extract_translate_info(trees_block: str) -> Mapping[int, str]:
     return translate_info
 
 
+def _parse_tree_statement(tree: str) -> Tuple[str, str]:
+    """Return (name, newick) from a joined 'tree ... = ...;' statement.
+
+    The optional * and [&R] tokens preceding the newick are ignored.
+    """
+    name_parts, data_parts = tree.split("=", 1)
+    start = data_parts.find("(")
+    data = data_parts[start:]
+    name = name_parts.strip().split()[-1]
+    return name, data
+
+
 def iter_trees(trees_block: str) -> Iterator[Tuple[str, str]]:
     """Generator to yield (name, newick) from trees block.
 
@@ -82,12 +94,53 @@ def iter_trees(trees_block: str) -> Iterator[Tuple[str, str]]:
                 tree.append(line.strip())
 
             # return (name, newick), ignore optional * and [&R]
-            tree = "".join(tree)
-            name_parts, data_parts = tree.split("=", 1)
-            start = data_parts.find("(")
-            data = data_parts[start:]
-            name = name_parts.strip().split()[-1]
-            yield name, data
+            yield _parse_tree_statement("".join(tree))
+
+
+def iter_newicks_and_translation_from_nexus_lines(
+    lines: Iterator[str],
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Generator of (newick, translation dict) from NEXUS file lines.
+
+    This is a streaming alternative to `get_newicks_and_translation
+    _from_nexus` that reads one statement at a time from the first
+    trees block, so that only a single tree statement is held in
+    memory. The translate statement, if present, is parsed with the
+    same function and the same dict is yielded with every newick.
+    """
+    lines = iter(lines)
+    trans_dict = {}
+    in_trees_block = False
+    for line in lines:
+        # skip ahead to the start of the trees block.
+        if not in_trees_block:
+            if re.match(r"\s*begin\s+trees\s*;", line, flags=re.IGNORECASE):
+                in_trees_block = True
+            continue
+
+        # the first trees block ends here.
+        if re.match(r"\s*end\s*;", line, flags=re.IGNORECASE):
+            return
+
+        # translate statement: parse to {label: value} when complete.
+        if re.match(r"\s*translate\b", line, flags=re.IGNORECASE):
+            statement = [line.strip()]
+            while not line.strip().endswith(";"):
+                line = next(lines)
+                statement.append(line.strip())
+            trans_dict = extract_translate_info("\n".join(statement))
+
+        # tree statement: join lines until complete and yield newick.
+        elif re.match(r"\s*TREE\s", line, flags=re.IGNORECASE):
+            tree = [line.strip()]
+            while not line.strip().endswith(";"):
+                line = next(lines)
+                tree.append(line.strip())
+            _, newick = _parse_tree_statement("".join(tree))
+            yield newick, trans_dict
+
+    if not in_trees_block:
+        raise IOError("NEXUS file must contain a 'begin trees' block.")
 
 
 def get_newicks_and_translation_from_nexus(data: str) -> Tuple[List[str], Dict[int, str]]:
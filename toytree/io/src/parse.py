@@ -4,16 +4,25 @@
 
 """
 
-from typing import Union, TypeVar, List, Tuple, Mapping
+from typing import Union, TypeVar, List, Tuple, Mapping, Iterator, Iterable, Dict, Any, Set
+import os
 import re
+import io
+from itertools import chain
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from loguru import logger
 import requests
 
 from toytree.core import ToyTree
+from toytree.core.arrays import TreeArrays
 from toytree.core.multitree import MultiTree
 from toytree.io.src.newick import parse_newick_string
-from toytree.io.src.nexus import get_newicks_and_translation_from_nexus
+from toytree.io.src.nexus import (
+    get_newicks_and_translation_from_nexus,
+    iter_newicks_and_translation_from_nexus_lines,
+)
 from toytree.io.src.utils import replace_whitespace
 
 logger = logger.bind(name="toytree")
@@ -21,6 +30,7 @@ logger = logger.bind(name="toytree")
 # for removing white_ space from newicks
 # WHITE_SPACE = re.compile(r"[\n\r\t ]+")
 ILLEGAL_NEWICK_CHARS = re.compile(r"[:;(),\[\]\t\n\r=]")
+WHITE_SPACE = re.compile(r"\s")
 
 # PEP 484 recommend capitalizing alias names
 Url = TypeVar("Url")
@@ -124,18 +134,234 @@ def parse_tree(data: Union[str, Url, Path], **kwargs) -> ToyTree:
     return translate_node_names(tree, tdict)
 
 
-def parse_multitree(data: Union[str, Url, Path], **kwargs) -> ToyTree:
+def parse_multitree(
+    data: Union[str, Url, Path],
+    njobs: int = 1,
+    burnin: int = 0,
+    thin: int = 1,
+    **kwargs,
+) -> MultiTree:
     """Return a MultiTree parsed from flexible input types.
 
+    Trees are streamed from the input (see `iter_trees`) so that the
+    full file string and list of newicks are never held in memory.
+    If njobs > 1 the newick strings are instead parsed in chunks on a
+    process pool (see `parse_trees_parallel`), using at most as many
+    processes as there are CPUs.
     """
-    strdata = parse_generic_to_str(data)
-    nwks, tdict = parse_data_from_str(strdata)
-    mtree = MultiTree([])
-    for nwk in nwks:
-        tree = parse_newick_string(nwk, **kwargs)
-        translate_node_names(tree, tdict)
-        mtree.treelist.append(tree)
-    return mtree
+    njobs = min(njobs, os.cpu_count() or 1)
+    if njobs > 1:
+        newicks = _iter_newicks(data, burnin, thin)
+        return MultiTree(parse_trees_parallel(newicks, njobs, **kwargs))
+    return MultiTree(list(iter_trees(data, burnin, thin, **kwargs)))
+
+
+def _parse_trees_to_arrays(
+    chunk: List[Tuple[str, Mapping[str, str]]], **kwargs,
+) -> List[Tuple[TreeArrays, Dict[int, Dict[str, Any]], Set[str]]]:
+    """Return a list of trees parsed from (data, tdict) tuples.
+
+    This is the function run by each worker in `parse_trees_parallel`.
+    Each tree is returned as a TreeArrays object, which is much faster
+    to pickle than a deeply nested graph of Node objects, plus a dict
+    of any additional Node features {idx: {feature: value}}, and the
+    tree's edge features.
+    """
+    results = []
+    for data, tdict in chunk:
+        tree = translate_node_names(parse_tree(data, **kwargs), tdict)
+        features = {}
+        for node in tree:
+            feats = {i: j for (i, j) in node._get_features().items() if i[0] != "_"}
+            if feats:
+                features[node._idx] = feats
+        results.append((tree.to_arrays(), features, tree.edge_features))
+    return results
+
+
+def _tree_from_arrays(
+    arrays: TreeArrays, features: Dict[int, Dict[str, Any]], edge_features: Set[str],
+) -> ToyTree:
+    """Return a ToyTree from the output of `_parse_trees_to_arrays`."""
+    tree = ToyTree.from_arrays(arrays)
+    for idx, feats in features.items():
+        tree[idx]._set_features(feats)
+    tree.edge_features = set(edge_features)
+    return tree
+
+
+def parse_trees_parallel(
+    data: Iterable[Tuple[str, Mapping[str, str]]],
+    njobs: int = 4,
+    **kwargs,
+) -> List[ToyTree]:
+    """Return a list of ToyTrees parsed in parallel on a process pool.
+
+    The input is split into contiguous chunks that are parsed on
+    separate processes, and returned as TreeArrays (see `ToyTree.
+    to_arrays`) from which ToyTrees are built in the input order by
+    `ToyTree.from_arrays`, without traversing them again.
+
+    Parameters
+    ----------
+    data: Iterable[Tuple[str, Mapping]]
+        An iterable of (data, translation dict) tuples, where data is
+        any input accepted by `toytree.tree`, and the translation
+        dict can be empty.
+    njobs: int
+        Number of processes to parse trees on.
+    **kwargs:
+        Additional args passed to `parse_newick_string`.
+    """
+    data = list(data)
+    nchunks = max(1, min(len(data), njobs * 4))
+    size = -(-len(data) // nchunks)
+    chunks = [data[i:i + size] for i in range(0, len(data), size)]
+    func = partial(_parse_trees_to_arrays, **kwargs)
+
+    with ProcessPoolExecutor(njobs) as pool:
+        return [
+            _tree_from_arrays(*result)
+            for results in pool.map(func, chunks)
+            for result in results
+        ]
+
+
+def iter_lines_generic(data: Union[str, Url, Path]) -> Iterator[str]:
+    """Generator of lines of str data from a file, url, or str.
+
+    This is a lazy alternative to `parse_generic_to_str` that reads
+    input one line at a time, keeping memory bounded for large files.
+    """
+    # Path: open file and yield lines.
+    if isinstance(data, Path):
+        if not data.exists():
+            raise IOError(f"Path {data} does not exist.")
+        with open(data, 'r', encoding='utf-8') as indata:
+            yield from indata
+        return
+
+    # an open file-like object
+    if hasattr(data, "readline"):
+        yield from data
+        return
+
+    # str: check if it is newick/nexus data, then URI, then Path.
+    if isinstance(data, str):
+        data = data.strip()
+        if not data:
+            yield "(0);"
+        elif (";" in data) or (data[0] in ("(", "#")):
+            yield from io.StringIO(data)
+        elif data.startswith("http"):
+            with requests.get(data, stream=True) as response:
+                response.raise_for_status()
+                yield from response.iter_lines(decode_unicode=True)
+        elif Path(data).exists():
+            with open(data, 'r', encoding="utf-8") as indata:
+                yield from indata
+        else:
+            raise IOError(
+                "Tree input appears to be a file path "
+                f"but does not exist: '{data}'")
+        return
+
+    # if entered as bytes convert to str and restart
+    if isinstance(data, bytes):
+        yield from iter_lines_generic(data.decode())
+        return
+    raise TypeError(f"Error parsing unrecognized tree data input: {data}.")
+
+
+def iter_newicks_and_translation_from_lines(
+    lines: Iterator[str],
+) -> Iterator[Tuple[str, Mapping[str, str]]]:
+    """Generator of (newick, translation dict) from lines of str data.
+
+    NEXUS data yields newicks from tree statements and the translate
+    dict; other data yields each newick with all whitespace removed,
+    where a newick can span multiple lines until ending in ';'.
+    """
+    # peek at the first non-empty line to detect NEXUS format.
+    lines = iter(lines)
+    for first in lines:
+        if first.strip():
+            break
+    else:
+        return
+    lines = chain([first], lines)
+
+    if first.strip()[:6].upper() == "#NEXUS":
+        yield from iter_newicks_and_translation_from_nexus_lines(lines)
+        return
+
+    newick = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        newick.append(line)
+        if line.endswith(";"):
+            yield WHITE_SPACE.sub("", "".join(newick)), {}
+            newick = []
+    if newick:
+        yield WHITE_SPACE.sub("", "".join(newick)), {}
+
+
+def iter_trees(
+    data: Union[str, Url, Path],
+    burnin: int = 0,
+    thin: int = 1,
+    **kwargs,
+) -> Iterator[ToyTree]:
+    """Generator of ToyTrees parsed lazily from flexible input types.
+
+    Newick lines, or NEXUS tree statements, are read and parsed one
+    at a time so that memory use is bounded by the size of a single
+    tree, rather than the whole file. This is useful for very large
+    sets of trees such as a BEAST or MrBayes posterior sample. Names
+    are translated using the NEXUS translate block if present. Trees
+    that are skipped by `burnin` or `thin` are not parsed.
+
+    Parameters
+    ----------
+    data: str, Path, or Url
+        A filepath, Url, open file, or str of newick or nexus data.
+    burnin: int
+        The number of trees to skip from the start of the input.
+    thin: int
+        Yield only every thin-th tree after the burnin.
+    **kwargs:
+        Additional args passed to `parse_newick_string`, such as
+        `feature_prefix` or `internal_labels`.
+
+    Examples
+    --------
+    >>> trees = toytree.io.iter_trees("posterior.nex", burnin=1000, thin=10)
+    >>> ctree = toytree.infer.get_consensus_tree(trees)
+    >>> mtree = toytree.mtree(toytree.io.iter_trees("trees.nwk", thin=100))
+    """
+    for newick, tdict in _iter_newicks(data, burnin, thin):
+        tree = parse_newick_string(newick, **kwargs)
+        yield translate_node_names(tree, tdict)
+
+
+def _iter_newicks(
+    data: Union[str, Url, Path],
+    burnin: int = 0,
+    thin: int = 1,
+) -> Iterator[Tuple[str, Mapping[str, str]]]:
+    """Generator of (newick, tdict) from input after burnin and thin."""
+    if burnin < 0:
+        raise ValueError("burnin must be >= 0")
+    if thin < 1:
+        raise ValueError("thin must be >= 1")
+    lines = iter_lines_generic(data)
+    newicks = iter_newicks_and_translation_from_lines(lines)
+    for idx, (newick, tdict) in enumerate(newicks):
+        if idx < burnin or (idx - burnin) % thin:
+            continue
+        yield newick, tdict
 
 
 def parse_tree_object(data: Union[str, Url, Path], **kwargs) -> Union[ToyTree, MultiTree]:
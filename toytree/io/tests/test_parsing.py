@@ -11,8 +11,138 @@
 """
 
 import unittest
+import numpy as np
+import toytree
+from toytree.utils import ToytreeError
 
 
+class TestParseNewickString(unittest.TestCase):
+    def setUp(self):
+        self.ntips = 5000
+        self.caterpillar = "(" * (self.ntips - 1) + "r0:1," + ",".join(
+            f"r{i}:1):1" for i in range(1, self.ntips - 1)
+        ) + f",r{self.ntips - 1}:1);"
+
+    def test_deep_caterpillar(self):
+        """Deep trees should not hit the recursion limit."""
+        tree = toytree.io.parse_newick_string(self.caterpillar)
+        self.assertEqual(tree.ntips, self.ntips)
+        self.assertEqual(tree.nnodes, 2 * self.ntips - 1)
+        self.assertEqual(tree.treenode.height, self.ntips - 1)
+
+    def test_round_trip(self):
+        """Newick written from a tree should parse to the same data."""
+        tree = toytree.rtree.bdtree(ntips=30, seed=123)
+        ptree = toytree.tree(tree.write())
+        self.assertEqual(tree.get_tip_labels(), ptree.get_tip_labels())
+        self.assertEqual(tree.get_topology_id(), ptree.get_topology_id())
+        self.assertTrue(np.allclose(
+            tree.get_node_data("dist"), ptree.get_node_data("dist")))
+
+    def test_internal_labels(self):
+        """Numeric internal labels are parsed as support unless set."""
+        newick = "((a:1,b:2)90:3,(c:1,d:1)80:3);"
+        tree = toytree.tree(newick)
+        self.assertEqual(tree[4].support, 90)
+        self.assertEqual(tree[4].name, "")
+        tree = toytree.tree(newick, internal_labels="name")
+        self.assertEqual(tree[4].name, "90")
+
+    def test_comments_with_delimiters(self):
+        """Commas, colons and parens inside comments are not split."""
+        newick = "((a:1[&x={1,2}],b:1[&y=(3)])N[&z=1]:2[&w=4],c:3);"
+        tree = toytree.tree(newick)
+        self.assertEqual(tree.ntips, 3)
+        self.assertEqual(tree[0].x, "{1,2}")
+        self.assertEqual(tree[1].y, "(3)")
+        self.assertEqual(tree[3].name, "N")
+        self.assertEqual(tree[3].z, 1)
+        self.assertEqual(tree[3].dist, 2)
+        self.assertIn("w", tree.edge_features)
+
+    def test_nhx(self):
+        """NHX metadata with custom prefix, delim and assignment."""
+        newick = "((a:1[&&NHX:S=human:E=1],b:1[&&NHX:S=mouse])[&&NHX:D=Y]:1,c:2);"
+        tree = toytree.tree(
+            newick, feature_prefix="&&NHX:", feature_delim=":", feature_assignment="=")
+        self.assertEqual(tree[0].S, "human")
+        self.assertEqual(tree[0].E, 1)
+        self.assertEqual(tree[3].D, "Y")
+
+    def test_malformed(self):
+        """Imbalanced or multi-rooted newicks raise ToytreeError."""
+        for newick in ["((a,b),c;", "(a,b),(c,d);", "(a,b))c(;"]:
+            with self.assertRaises(ToytreeError):
+                toytree.io.parse_newick_string(newick)
+
+
+class TestIterTrees(unittest.TestCase):
+    def setUp(self):
+        self.nexus = """\
+#NEXUS
+begin trees;
+    translate
+           1       apple,
+           2       blueberry,
+           3       cantaloupe,
+           4       durian
+           ;
+    tree tree0 = [&U] ((1,2),(3,4));
+    tree tree1 = [&U] ((1,3),
+        (2,4));
+    tree tree2 = [&U] ((1,2),(3,4));
+    tree tree3 = [&U] ((1,4),(3,2));
+end;
+"""
+        self.newick = "\n".join(
+            toytree.rtree.unittree(8, seed=i).write() for i in range(10))
+
+    def test_nexus_translate(self):
+        """Tree statements are yielded with names translated."""
+        trees = list(toytree.io.iter_trees(self.nexus))
+        self.assertEqual(len(trees), 4)
+        self.assertEqual(
+            set(trees[1].get_tip_labels()),
+            {"apple", "blueberry", "cantaloupe", "durian"})
+        self.assertTrue(trees[1].is_monophyletic("apple", "cantaloupe"))
+
+    def test_burnin_thin(self):
+        """burnin skips trees from the start, thin keeps every n-th."""
+        trees = list(toytree.io.iter_trees(self.newick, burnin=2, thin=3))
+        expected = toytree.mtree(self.newick)[2::3]
+        self.assertEqual(len(trees), len(expected))
+        for tre, exp in zip(trees, expected):
+            self.assertEqual(tre.get_topology_id(), exp.get_topology_id())
+
+    def test_same_as_mtree(self):
+        """Streamed trees match those parsed from the full string."""
+        mtree1 = toytree.mtree(self.newick)
+        mtree2 = toytree.mtree(toytree.io.iter_trees(self.newick))
+        self.assertEqual(len(mtree1), len(mtree2))
+        for tre1, tre2 in zip(mtree1, mtree2):
+            self.assertEqual(tre1.write(), tre2.write())
+
+    def test_consensus_from_iterator(self):
+        """Consensus can consume a generator of trees in one pass."""
+        ctree1 = toytree.infer.get_consensus_tree(toytree.mtree(self.newick))
+        ctree2 = toytree.infer.get_consensus_tree(toytree.io.iter_trees(self.newick))
+        self.assertTrue(ctree1.get_node_data().equals(ctree2.get_node_data()))
+
+    def test_parallel_same_as_serial(self):
+        """Trees parsed on a process pool match those parsed serially."""
+        # call the pool directly, since mtree uses at most one process per CPU.
+        from toytree.io.src.parse import parse_trees_parallel, _iter_newicks
+        mtree1 = toytree.mtree(self.nexus)
+        mtree2 = parse_trees_parallel(_iter_newicks(self.nexus, 0, 1), njobs=2)
+        for tre1, tre2 in zip(mtree1, mtree2):
+            self.assertEqual(tre1.write(), tre2.write())
+            self.assertEqual(tre1.get_node_data().to_string(), tre2.get_node_data().to_string())
+        nhx = "((a[&&NHX:x=1],b)90:2[&&NHX:y=2],c);"
+        mtree3 = parse_trees_parallel([(nhx, {}), (nhx, {})], njobs=2, feature_prefix="&&NHX:")
+        tre = toytree.tree(nhx, feature_prefix="&&NHX:")
+        for tre3 in mtree3:
+            self.assertEqual(tre3.write(features=["x", "y"]), tre.write(features=["x", "y"]))
+
 
 if __name__ == "__main__":
 
@@ -42,9 +42,13 @@ Add a parent-child pair to split an existing branch into two children (new child
 Add a parent-child clade pair to split an existing branch.
 >>> add_internal_node_and_subtree()
 
+Apply many inplace edits to a tree with a single update at the end.
+>>> with edit_session(tree): ...
+
 """
 
-from typing import Optional, TypeVar, Tuple, Callable, Union
+from typing import Optional, TypeVar, Tuple, Callable, Union, Iterator
+from contextlib import contextmanager
 from loguru import logger
 import numpy as np
 from toytree.core.apis import TreeModAPI, add_subpackage_method, add_toytree_method
@@ -72,6 +76,7 @@ __all__ = [
     "add_internal_node_and_subtree",
     "remove_nodes",
     "merge_nodes",
+    "edit_session",
 ]
 
 
@@ -288,11 +293,14 @@ def remove_nodes(tree: ToyTree, *query: Query, preserve_dists: bool = True, inpl
         tree = tree.copy()
         nodes = [tree[i.idx] for i in nodes]
 
+    # only the clade above the MRCA of the removed Nodes is updated.
+    clade = tree.get_mrca_node(*nodes)._up if nodes else None
+
     # postorder idx traversal
     for node in tree:
         if node in nodes:
             node._delete(preserve_dists, prevent_unary=False)
-    tree._update()
+    tree._update(clade)
     return tree
 
 
@@ -368,7 +376,7 @@ def rotate_node(tree: ToyTree, *query: Query, inplace: bool = False) -> ToyTree:
         tree = tree.copy()
         node = tree[node.idx]
     node._children = tuple(node.children[::-1])
-    tree._update()
+    tree._update(node)
     return tree
 
 
@@ -877,7 +885,7 @@ def add_internal_node(
     new_node._up = parent
     new_node._children = (node, )
     node._up = new_node
-    tree._update()
+    tree._update(parent)
     return tree
 
 
@@ -948,9 +956,11 @@ def add_child_node(
     # create the new Node that will be a child.
     new_node = Node(name=name if name is not None else "", dist=dist)
 
-    # add as a new child to end of parent's children
+    # add as a new child to end of parent's children, and update the
+    # clade of the parent, or of its parent if it was a tip.
+    clade = node if node._children else node._up
     node._add_child(new_node)
-    tree._update()
+    tree._update(clade)
     return tree
 
 
@@ -1184,7 +1194,7 @@ def add_internal_node_and_subtree(
 
     # set the subtree stem dist
     subtree.treenode._dist = subtree_stem_dist
-    tree._update()
+    tree._update(parent)
     return tree
 
 
@@ -1398,6 +1408,47 @@ def _resolve_nodes(
     return left, right
 
 
+
+@add_subpackage_method(TreeModAPI)
+@contextmanager
+def edit_session(tree: ToyTree) -> Iterator[ToyTree]:
+    """Context manager to apply many edits to a tree with one update.
+
+    Each function that modifies a tree topology must update the idx
+    labels, heights, and coordinates of its Nodes, which requires a
+    traversal of the whole tree. Within an edit session these updates
+    are deferred, and performed once when the session closes, such
+    that applying many edits to a large tree is much faster. If the
+    tree is indexed during the session (e.g., `tree[3]`, `tree.nnodes`,
+    `tree.get_nodes()`) the deferred update is performed first, such
+    that idx labels are always valid when used.
+
+    Only edits applied to this tree inplace are deferred, since
+    functions that return a modified copy of the tree update the copy.
+    Sessions can be nested, in which case the update is performed
+    when the outermost session closes.
+
+    Parameters
+    ----------
+    tree: ToyTree
+        A tree to apply inplace edits to.
+
+    Examples
+    --------
+    >>> tree = toytree.rtree.unittree(100, seed=123)
+    >>> nodes = tree[tree.ntips:-1]
+    >>> with tree.mod.edit_session():
+    >>>     for node in nodes:
+    >>>         tree.mod.rotate_node(node, inplace=True)
+    """
+    tree._nsessions += 1
+    try:
+        yield tree
+    finally:
+        tree._nsessions -= 1
+        if not tree._nsessions and tree._dirty:
+            tree._update_full()
+
 if __name__ == "__main__":
 
     import toytree
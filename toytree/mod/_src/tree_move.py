@@ -308,8 +308,8 @@ def move_nni(
     parent._remove_child(sister)
     new_node._add_child(sister)
 
-    # update Node idxs and coordinates
-    tree._update()
+    # update Node idxs and coordinates of the parent clade
+    tree._update(parent)
 
     # optionally add style highlights
     if highlight:
@@ -380,8 +380,8 @@ def move_spr(
     # cannot be root, or a desc on the subtree Node, or the subtree itself.
     edges = (
         set(range(tree.nnodes)) -
-        set((i._idx for i in subtree._iter_descendants())) -
-        set((i._idx for i in subtree._iter_sisters())) -
+        set((i._idx for i in subtree.iter_descendants())) -
+        set((i._idx for i in subtree.iter_sisters())) -
         set((subtree._up._idx, )) -
         set((subtree._idx, ))
     )
@@ -395,6 +395,24 @@ def move_spr(
     new_node_parent = new_sister._up
     old_node = subtree._up
     old_node_parent = old_node._up
+
+    # get the clade containing the move, the MRCA of the prune and
+    # regraft points, or its parent if the MRCA is one of them, to
+    # update only its Nodes after the move.
+    ancestors = set(id(i) for i in old_node.iter_ancestors(include_self=True))
+    for clade in new_sister.iter_ancestors(include_self=True):
+        if id(clade) in ancestors:
+            break
+    if clade is old_node or clade is new_sister:
+        clade = clade._up
+
+    # a full update is needed if the prune or regraft point is the
+    # root or a unary Node, since the root can change or Nodes can be
+    # detached outside of the clade.
+    root = tree.treenode
+    for node in (old_node, new_sister, new_node_parent):
+        if node is None or node is root or len(node._children) == 1:
+            clade = None
     new_node._up = new_node_parent
     new_node._children = (subtree, new_sister)
 
@@ -424,7 +442,7 @@ def move_spr(
     # if new_sister is now the root.
     elif new_sister == tree.treenode:
         tree.treenode = new_node
-    tree._update()
+    tree._update(clade if tree.treenode is root else None)
 
     # optional: color edges of the subtree that was moved.
     if highlight:
@@ -439,7 +457,7 @@ def move_spr(
         tree.style.use_edge_lengths = False
 
         # tree.get_mrca_node(*tips)
-        for node in subtree._iter_descendants():
+        for node in subtree.iter_descendants():
             tree.style.edge_colors[node.idx] = toytree.color.COLORS2[3]
             tree.style.node_colors[node.idx] = toytree.color.COLORS2[3]
         tree.style.node_colors[new_node.idx] = toytree.color.COLORS2[3]
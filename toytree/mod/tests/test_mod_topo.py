@@ -9,12 +9,15 @@
 - toytree.mod.remove_unary_nodes
 - toytree.mod.add_internal_node
 - toytree.mod.drop_tips
+- toytree.mod.edit_session
 """
 
 import unittest
+import numpy as np
 from loguru import logger
 from toytree.utils.src.logger_setup import capture_logs
 import toytree
+from toytree.mod._src.tree_move import move_spr
 
 logger.bind(name="toytree")
 
@@ -395,6 +398,99 @@ class TestModBisect(unittest.TestCase):
         self.assertEqual(tree[2].dist, 1)
 
 
+def get_node_state(tree):
+    """Return idx, height, x, name and child idxs of all Nodes."""
+    return [
+        (i._idx, float(i._height), float(i._x), i.name, [j._idx for j in i.children])
+        for i in tree
+    ]
+
+
+class TestModEditSession(unittest.TestCase):
+    def setUp(self):
+        self.tree = toytree.tree(toytree.rtree.bdtree(30, seed=123).write())
+
+    def test_edit_session_docs_match(self):
+        """API and submodule documentations updated to match."""
+        adoc = [i.strip() for i in self.tree.mod.edit_session.__doc__.split("\n")]
+        sdoc = [i.strip() for i in toytree.mod.edit_session.__doc__.split("\n")]
+        self.assertEqual(adoc, sdoc)
+
+    def test_local_update_matches_full_update(self):
+        """Clade updates after rotations match a full update."""
+        rng = np.random.default_rng(123)
+        tree = self.tree.copy()
+        for idx in rng.integers(tree.ntips, tree.nnodes, size=50):
+            tree.mod.rotate_node(int(idx), inplace=True)
+            full = tree.copy()
+            full._update_full()
+            self.assertEqual(get_node_state(tree), get_node_state(full))
+
+    def test_local_update_after_adding_and_removing_nodes(self):
+        """Clade updates after SPR moves, and adding or removing Nodes,
+        match a full update, and are used for edits in one clade."""
+        tree = self.tree.copy()
+        for seed in range(30):
+            tree = move_spr(tree, seed=seed)
+            full = tree.copy()
+            full._update_full()
+            self.assertEqual(get_node_state(tree), get_node_state(full))
+
+        edits = [
+            lambda t: t.mod.add_child_node(t.ntips + 3, name="c", inplace=True),
+            lambda t: t.mod.add_child_node(2, name="t", inplace=True),
+            lambda t: t.mod.add_internal_node(5, name="i", inplace=True),
+            lambda t: t.mod.add_internal_node_and_subtree(
+                8, subtree=toytree.rtree.unittree(4), inplace=True),
+            lambda t: t.mod.remove_nodes(0, inplace=True),
+            lambda t: t.mod.remove_nodes(t.ntips + 5, inplace=True),
+        ]
+        for edit in edits:
+            edit(tree)
+            full = tree.copy()
+            full._update_full()
+            self.assertEqual(get_node_state(tree), get_node_state(full))
+
+        # SPR on a tree with a unary root uses a full update.
+        tree = toytree.tree("(((n0:0.8166):0.5,((r3:0.25,r4:0.25):0.25,r5:0.5):0.25):0);")
+        tree = move_spr(tree, seed=2866)
+        self.assertEqual(tree.nnodes, len(list(tree.treenode.traverse())))
+        full = tree.copy()
+        full._update_full()
+        self.assertEqual(get_node_state(tree), get_node_state(full))
+
+        # a local update is used when a tip is added to an inner clade
+        tree = self.tree.copy()
+        clade = tree[tree.ntips + 3]
+        clade._add_child(toytree.Node("new"))
+        self.assertTrue(tree._update_clade(clade))
+        self.assertEqual(tree.ntips, self.tree.ntips + 1)
+
+    def test_edit_session_defers_update(self):
+        """Edits in a session are applied with one update at the end."""
+        tree = self.tree.copy()
+        expected = self.tree.copy()
+        nodes = [tree[i] for i in range(tree.ntips, tree.nnodes)]
+        with tree.mod.edit_session():
+            for node in nodes:
+                tree.mod.rotate_node(node, inplace=True)
+            self.assertTrue(tree._dirty)
+        self.assertFalse(tree._dirty)
+        for idx in range(expected.ntips, expected.nnodes):
+            expected.mod.rotate_node(idx, inplace=True)
+        self.assertEqual(get_node_state(tree), get_node_state(expected))
+
+    def test_edit_session_indexing_updates(self):
+        """Indexing a tree during a session updates idx labels first."""
+        tree = self.tree.copy()
+        with toytree.mod.edit_session(tree):
+            tree.mod.add_child_node(tree.ntips, name="new", inplace=True)
+            self.assertTrue(tree._dirty)
+            self.assertEqual(tree.ntips, self.tree.ntips + 1)
+            self.assertFalse(tree._dirty)
+            self.assertIn("new", tree.get_tip_labels())
+
+
 if __name__ == '__main__':
 
     toytree.set_log_level("CRITICAL")
@@ -410,6 +506,7 @@ if __name__ == '__main__':
         load.loadTestsFromTestCase(TestModPrune),
         load.loadTestsFromTestCase(TestModDropTips),
         load.loadTestsFromTestCase(TestModBisect),
+        load.loadTestsFromTestCase(TestModEditSession),
         # l.loadTestsFromTestCase(TestModResolvePolytomies),        
 
         load.loadTestsFromTestCase(TestModAddInternalNode),
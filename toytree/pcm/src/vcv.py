@@ -15,13 +15,15 @@ References
 
 """
 
-from typing import Union
-import itertools
+from typing import Union, Optional
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import toytree
 from toytree import ToyTree
 from toytree.core.apis import add_subpackage_method, PhyloCompAPI
+from toytree.utils.src.arrays import get_output_array, iter_row_blocks
+from toytree.distance._src.nodedist import _get_root_dists, _fill_mrca_root_dists
 
 
 __all__ = [
@@ -40,6 +42,8 @@ __all__ = [
 def get_vcv_matrix_from_tree(
     tree: ToyTree,
     df: bool = False,
+    dtype: np.dtype = np.float64,
+    memmap: Optional[Union[str, Path]] = None,
 ) -> Union[np.ndarray, pd.DataFrame]:
     """Return a variance-covariance matrix (DataFrame) from a ToyTree.
 
@@ -50,12 +54,23 @@ def get_vcv_matrix_from_tree(
     and covariances of a continuous trait evolving on a tree under
     Brownian motion.
 
+    The matrix is filled in O(ntips^2) time by writing the root
+    distance of each internal Node into the blocks of the matrix
+    shared by its descendant clades.
+
     Parameters
     ----------
     tree: toytree.ToyTree
         A tree on which to compute the VCV.
     df: bool
         True returns pandas DataFrame, else returns numpy ndarray.
+    dtype: np.dtype
+        A float dtype for the matrix. Using np.float32 halves memory.
+    memmap: str, Path or None
+        Optional path to a .npy file to which the matrix is written
+        as a memory-mapped array, for very large trees. The returned
+        array is a np.memmap that can be re-opened later with
+        `np.load(path, mmap_mode="r")`.
 
     Example
     -------
@@ -68,21 +83,8 @@ def get_vcv_matrix_from_tree(
     >>> # r3  0.0  0.0  0.0  3.0  1.0
     >>> # r4  0.0  0.0  0.0  1.0  3.0
     """
-    # get node distance matrix
-    dmat = tree.distance.get_node_distance_matrix()
-
-    # fill vcv array with shared dists (mrca to root)
-    vcv = np.zeros((tree.ntips, tree.ntips))
-    for tip1, tip2 in itertools.combinations(range(tree.ntips), 2):
-
-        # get mrca node and its dist to root (co-variances)
-        mrca = tree.get_mrca_node(tip1, tip2)
-        vcv[tip1, tip2] = dmat[mrca.idx, tree.treenode.idx]
-        vcv[tip2, tip1] = vcv[tip1, tip2]
-
-    # fill diagonal with each tips dist from the root
-    for node in tree[:tree.ntips]:
-        vcv[node._idx, node._idx] = dmat[node._idx, -1]
+    vcv = get_output_array((tree.ntips, tree.ntips), dtype, memmap)
+    _fill_mrca_root_dists(tree, vcv, _get_root_dists(tree), tips_only=True)
 
     # return as ndarray or dataframe
     if not df:
@@ -97,6 +99,8 @@ def get_vcv_matrix_from_tree(
 def get_corr_matrix_from_tree(
     tree: ToyTree,
     df: bool = False,
+    dtype: np.dtype = np.float64,
+    memmap: Optional[Union[str, Path]] = None,
 ) -> Union[np.ndarray, pd.DataFrame]:
     r"""Return a correlation matrix (DataFrame) from a ToyTree.
 
@@ -109,6 +113,13 @@ def get_corr_matrix_from_tree(
     ----------
     tree: toytree.ToyTree
         A tree on which to compute the correlation matrix.
+    df: bool
+        True returns pandas DataFrame, else returns numpy ndarray.
+    dtype: np.dtype
+        A float dtype for the matrix. Using np.float32 halves memory.
+    memmap: str, Path or None
+        Optional path to a .npy file to which the matrix is written
+        as a memory-mapped array. See `get_vcv_matrix_from_tree`.
 
     Example
     -------
@@ -121,12 +132,16 @@ def get_corr_matrix_from_tree(
     >>> # r3  0.000000  0.000000  0.000000  1.000000  0.333333
     >>> # r4  0.000000  0.000000  0.000000  0.333333  1.000000
     """
-    vcv = get_vcv_matrix_from_tree(tree)
-    diag_std = np.sqrt(np.diag(vcv))
-    outer = np.outer(diag_std, diag_std)
-    corr = vcv / outer
-    # correct rounding point errors
-    corr[vcv == 0] = 0.
+    # fill the VCV then scale it in place, in blocks of rows.
+    corr = get_vcv_matrix_from_tree(tree, dtype=dtype, memmap=memmap)
+    diag_std = np.sqrt(np.diag(corr)).astype(np.float64)
+    for rows in iter_row_blocks(*corr.shape):
+        block = corr[rows]
+        zeros = block == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block /= np.outer(diag_std[rows], diag_std)
+        # correct rounding point errors
+        block[zeros] = 0.
     if not df:
         return corr
     names = tree.get_tip_labels()
@@ -134,20 +149,33 @@ def get_corr_matrix_from_tree(
 
 
 @add_subpackage_method(PhyloCompAPI)
-def get_distance_matrix_from_vcv_matrix(vcv: Union[np.ndarray, pd.DataFrame]) -> Union[np.ndarray, pd.DataFrame]:
+def get_distance_matrix_from_vcv_matrix(
+    vcv: Union[np.ndarray, pd.DataFrame],
+    memmap: Optional[Union[str, Path]] = None,
+) -> Union[np.ndarray, pd.DataFrame]:
     """Returns the Euclidean distance between tips from a VCV matrix.
 
     The Euclidean distance is computed as:
         V[i, i] + V[j, j] - (2 * V[i, j])
+
+    Parameters
+    ----------
+    vcv: ArrayLike
+        A variance-covariance matrix as a np.ndarray or pd.DataFrame.
+        The returned matrix has the same float dtype.
+    memmap: str, Path or None
+        Optional path to a .npy file to which the matrix is written
+        as a memory-mapped array.
     """
     names = None
     if isinstance(vcv, pd.DataFrame):
         names = vcv.index
-    vcv = np.array(vcv)
-    dists = np.zeros_like(vcv)
-    for i in range(dists.shape[0]):
-        for j in range(dists.shape[0]):
-            dists[i, j] = vcv[i, i] + vcv[j, j] - (2 * vcv[i, j])
+    vcv = np.asarray(vcv)
+    dtype = vcv.dtype if vcv.dtype.kind == "f" else np.float64
+    dists = get_output_array(vcv.shape, dtype, memmap)
+    diag = np.diag(vcv)
+    for rows in iter_row_blocks(*vcv.shape):
+        dists[rows] = diag[rows, None] + diag[None, :] - 2 * vcv[rows]
     if names is not None:
         dists = pd.DataFrame(dists, index=names, columns=names)
     return dists
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+"""Test conversion of trees to VCV, correlation and distance matrices.
+
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import toytree
+
+
+def get_vcv_by_pairs(tree):
+    """Return VCV from the root distance of the MRCA of each tip pair."""
+    rdists = tree.distance.get_node_distance_matrix()[:, -1]
+    vcv = np.zeros((tree.ntips, tree.ntips))
+    for tip1 in range(tree.ntips):
+        for tip2 in range(tree.ntips):
+            vcv[tip1, tip2] = rdists[tree.get_mrca_node(tip1, tip2).idx]
+    return vcv
+
+
+class TestVCV(unittest.TestCase):
+    def setUp(self):
+        self.trees = [
+            toytree.rtree.bdtree(30, seed=123),
+            toytree.rtree.imbtree(20, treeheight=4),
+            toytree.rtree.unittree(25, seed=123).unroot(),
+            toytree.tree("((a:1,b:2,c:3):1,(d:1,(e:1,f:2,g:1):2):1,h:4);"),
+        ]
+
+    def test_vcv_matrix(self):
+        """Clade-block VCV matches shared root dists of tip MRCAs."""
+        for tree in self.trees:
+            vcv = toytree.pcm.get_vcv_matrix_from_tree(tree)
+            self.assertTrue(np.allclose(vcv, get_vcv_by_pairs(tree)))
+
+    def test_vcv_matrix_float32_and_memmap(self):
+        """VCV can be float32 and written to a memory-mapped file."""
+        tree = self.trees[0]
+        vcv = toytree.pcm.get_vcv_matrix_from_tree(tree)
+        vcv32 = toytree.pcm.get_vcv_matrix_from_tree(tree, dtype=np.float32)
+        self.assertEqual(vcv32.dtype, np.float32)
+        self.assertTrue(np.allclose(vcv, vcv32, atol=1e-5))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "vcv.npy")
+            mvcv = toytree.pcm.get_vcv_matrix_from_tree(tree, memmap=path)
+            mvcv.flush()
+            self.assertTrue(np.allclose(np.load(path), vcv))
+            del mvcv
+
+    def test_corr_and_distance_matrix(self):
+        """Correlation and distance matrices computed from VCV."""
+        for tree in self.trees:
+            vcv = get_vcv_by_pairs(tree)
+            std = np.sqrt(np.diag(vcv))
+            corr = toytree.pcm.get_corr_matrix_from_tree(tree)
+            self.assertTrue(np.allclose(corr, vcv / np.outer(std, std)))
+            dist = toytree.pcm.get_distance_matrix_from_vcv_matrix(vcv)
+            tdist = toytree.distance.get_tip_distance_matrix(tree)
+            self.assertTrue(np.allclose(dist, tdist))
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""Allocation of large output arrays in memory or on disk.
+
+Functions that return an (n, n) matrix for large trees can use
+`get_output_array` to write results into a memory-mapped .npy file
+instead of RAM, which can later be re-opened with
+`np.load(path, mmap_mode="r")`.
+"""
+
+from typing import Optional, Tuple, Union
+from pathlib import Path
+import numpy as np
+from toytree.utils.src.exceptions import ToytreeError
+
+__all__ = ["get_output_array", "iter_row_blocks"]
+
+
+def get_output_array(
+    shape: Tuple[int, ...],
+    dtype: np.dtype = np.float64,
+    memmap: Optional[Union[str, Path]] = None,
+) -> np.ndarray:
+    """Return a zero-filled array, optionally memory-mapped to a file.
+
+    Parameters
+    ----------
+    shape: Tuple[int, ...]
+        Shape of the array.
+    dtype: np.dtype
+        A numeric dtype for the array, e.g., np.float64 or np.float32.
+    memmap: str, Path or None
+        If None an array is allocated in memory. Else a path to a .npy
+        file that is created (or overwritten) and memory-mapped.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "iuf":
+        raise ToytreeError(f"dtype must be a numeric type, not {dtype}.")
+    if memmap is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(
+        str(memmap), mode="w+", dtype=dtype, shape=shape)
+
+
+def iter_row_blocks(nrows: int, ncols: int, max_size: int = 2**22):
+    """Yield slices of rows such that each block has <= max_size cells.
+
+    This bounds the size of temporary arrays when filling large
+    (or memory-mapped) matrices with vectorized expressions.
+    """
+    step = max(1, max_size // max(1, ncols))
+    for start in range(0, nrows, step):
+        yield slice(start, min(start + step, nrows))
@@ -0,0 +1,804 @@
+#!/usr/bin/env python
+
+"""Benchmarks of performance-critical toytree functions.
+
+Each benchmark prints timings of a fast implementation, usually next
+to a slower reference method that it replaced, and checks that the
+results are the same. Random trees are built from newick strings by
+`get_random_newick`, which joins random pairs of clades and is fast
+even for very large trees. This module is not imported by toytree.
+
+Examples
+--------
+Run all benchmarks, or only some by name.
+$ python -m toytree.utils.src.benchmarks
+$ python -m toytree.utils.src.benchmarks nj upgma parsimony
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, Optional, Sequence, Union
+import gc
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import toytree
+
+
+def get_random_newick(
+    ntips: int,
+    rng: Optional[np.random.Generator] = None,
+    dist: Union[None, float, str] = None,
+    balanced: bool = False,
+) -> str:
+    """Return a newick string with tips named r0 to r{ntips - 1}.
+
+    Parameters
+    ----------
+    ntips: int
+        Number of tips in the tree.
+    rng: np.random.Generator or None
+        Random generator used to join random pairs of clades and to
+        sample edge lengths. A new one with seed=123 by default.
+    dist: None, float or "exp"
+        No edge lengths (None), a fixed edge length, or edge lengths
+        sampled from an exponential distribution ("exp").
+    balanced: bool
+        If True the tree is built by joining adjacent pairs of clades
+        in rounds, such that it is balanced up to the last odd clades.
+    """
+    rng = rng if rng is not None else np.random.default_rng(123)
+
+    def _label(clade: str) -> str:
+        if dist is None:
+            return clade
+        length = rng.exponential() if dist == "exp" else dist
+        return f"{clade}:{length:.4g}"
+
+    clades = [_label(f"r{i}") for i in range(ntips)]
+    if balanced:
+        while len(clades) > 1:
+            clades = [
+                _label(f"({clades[i]},{clades[i + 1]})") if i + 1 < len(clades) else clades[i]
+                for i in range(0, len(clades), 2)
+            ]
+    else:
+        while len(clades) > 1:
+            idx0, idx1 = sorted(rng.choice(len(clades), 2, replace=False))
+            clade1 = clades.pop(idx1)
+            clades[idx0] = _label(f"({clades[idx0]},{clade1})")
+    return clades[0] + ";"
+
+
+def get_random_tree(ntips: int, rng: Optional[np.random.Generator] = None, **kwargs) -> toytree.ToyTree:
+    """Return a ToyTree parsed from `get_random_newick`."""
+    return toytree.tree(get_random_newick(ntips, rng, **kwargs))
+
+
+###################################################
+# core
+###################################################
+
+def benchmark_newick(ntips: int = 10_000, nreps: int = 5) -> None:
+    """Print parsing throughput (trees/sec) on balanced and caterpillar
+    newick strings with `ntips` tips."""
+    from toytree.io.src.newick import parse_newick_string
+
+    # caterpillar: (((r0,r1),r2),r3)...
+    cat = "(" * (ntips - 1) + "r0:1," + ",".join(
+        f"r{i}:1):1" for i in range(1, ntips - 1)) + f",r{ntips - 1}:1);"
+    bal = get_random_newick(ntips, dist=1, balanced=True)
+
+    for label, newick in [("balanced", bal), ("caterpillar", cat)]:
+        start = time.perf_counter()
+        for _ in range(nreps):
+            parse_newick_string(newick)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12} ntips={ntips} {nreps / elapsed:.2f} trees/sec")
+
+
+def benchmark_parse_multitree(ntrees: int = 100, ntips: int = 1000, njobs: int = 4) -> None:
+    """Print serial vs parallel parsing times of a multi-newick string,
+    and the time to build ToyTrees from the TreeArrays returned by the
+    worker processes, which is the serial part of parallel parsing.
+    """
+    from toytree.io.src.parse import (
+        parse_multitree, parse_trees_parallel, _parse_trees_to_arrays, _tree_from_arrays)
+
+    newicks = [toytree.rtree.bdtree(ntips, seed=i).write() for i in range(ntrees)]
+    t0 = time.perf_counter()
+    serial = parse_multitree("\n".join(newicks))
+    t1 = time.perf_counter()
+    parallel = parse_trees_parallel([(i, {}) for i in newicks], njobs=njobs)
+    t2 = time.perf_counter()
+    assert [i.write() for i in serial] == [i.write() for i in parallel]
+    results = _parse_trees_to_arrays([(i, {}) for i in newicks])
+    t3 = time.perf_counter()
+    [_tree_from_arrays(*i) for i in results]
+    t4 = time.perf_counter()
+    print(
+        f"{ntrees} trees x {ntips} tips: serial={t1 - t0:.2f}s, "
+        f"njobs={njobs}={t2 - t1:.2f}s ({(t1 - t0) / (t2 - t1):.2f}x on "
+        f"{os.cpu_count()} CPUs), building trees from arrays={t4 - t3:.2f}s"
+    )
+
+
+def benchmark_tree_arrays(ntips: int = 100_000) -> None:
+    """Print conversion times and memory of arrays vs Node objects."""
+    from toytree.core.arrays import TreeArrays
+
+    tree = get_random_tree(ntips, dist="exp")
+    t0 = time.perf_counter()
+    arrs = tree.to_arrays()
+    t1 = time.perf_counter()
+    rtree = toytree.ToyTree.from_arrays(arrs)
+    t2 = time.perf_counter()
+    assert rtree.write() == tree.write()
+
+    rng = np.random.default_rng(123)
+    pairs = rng.integers(0, tree.ntips, size=(10_000, 2))
+    t3 = time.perf_counter()
+    arrs.get_node_distances(pairs)
+    t4 = time.perf_counter()
+    for idx0, idx1 in pairs[:100]:
+        tree.distance.get_node_distance(int(idx0), int(idx1))
+    t5 = time.perf_counter()
+    for idx0, idx1 in pairs[:1000].tolist():
+        arrs.get_node_distance(idx0, idx1)
+        arrs.get_node_path_length(idx0, idx1)
+    t6 = time.perf_counter()
+
+    nbytes = sum(getattr(arrs, i).nbytes for i in TreeArrays._FIELDS)
+    nbytes += sum(sys.getsizeof(i) for i in arrs.names)
+    print(f"{ntips} tips, {tree.nnodes} nodes")
+    print(f"to_arrays: {t1 - t0:.3f}s, from_arrays: {t2 - t1:.3f}s")
+    print(f"arrays memory: {nbytes / tree.nnodes:.1f} bytes/node")
+    print(f"node distances: {(t4 - t3) / len(pairs) * 1e6:.2f}us/pair (arrays), "
+          f"{(t5 - t4) / 100 * 1e6:.2f}us/pair (ToyTree)")
+    print(f"single queries of distance and path length: {(t6 - t5) / 1000 * 1e6:.2f}us/pair (arrays)")
+
+
+def benchmark_node_memory(ntips: int = 100_000) -> None:
+    """Print memory allocated per Node in a large ToyTree."""
+    gc.collect()
+    tracemalloc.start()
+    tree = toytree.rtree.imbtree(ntips)
+    size0, _ = tracemalloc.get_traced_memory()
+    tree.features
+    tree[0].color = "red"
+    size1, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{tree.nnodes} nodes: {size0 / tree.nnodes:.1f} bytes/node")
+    print(f"after reading and setting features: {size1 / tree.nnodes:.1f} bytes/node")
+
+
+def benchmark_copy(ntips: Sequence[int] = (1_000, 10_000), nreps: int = 10) -> None:
+    """Print time to copy a tree using ToyTree.copy vs. deepcopy."""
+    for ntip in ntips:
+        # a balanced tree with features (deepcopy recurses too deep
+        # for large caterpillar trees).
+        tree = get_random_tree(ntip, dist=1, balanced=True)
+        tree.set_node_data("trait", range(tree.nnodes), inplace=True)
+
+        times = []
+        for func in (deepcopy, toytree.ToyTree.copy, partial(toytree.ToyTree.copy, deep=True)):
+            start = time.perf_counter()
+            for _ in range(nreps):
+                func(tree)
+            times.append((time.perf_counter() - start) / nreps)
+        print(
+            f"{ntip} tips: deepcopy={times[0] * 1e3:.1f}ms, "
+            f"copy={times[1] * 1e3:.1f}ms ({times[0] / times[1]:.1f}x), "
+            f"copy(deep=True)={times[2] * 1e3:.1f}ms ({times[0] / times[2]:.1f}x)"
+        )
+
+
+def benchmark_edits(ntips: int = 50_000, nedits: int = 200) -> None:
+    """Print time to apply many rotations to a large tree with a full
+    update per edit, a local clade update per edit, or in a session,
+    and to add tips with a full or local update.
+    """
+    from toytree.core.node import Node
+    from toytree.mod._src.mod_topo import rotate_node, add_child_node, edit_session
+
+    tree = get_random_tree(ntips, dist=1, balanced=True)
+    rng = np.random.default_rng(123)
+    nodes = [tree[i] for i in rng.integers(tree.ntips, tree.nnodes - 1, size=nedits)]
+
+    start = time.perf_counter()
+    for node in nodes:
+        node._children = node._children[::-1]
+        tree._update()
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for node in nodes:
+        rotate_node(tree, node, inplace=True)
+    local = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with edit_session(tree):
+        for node in nodes:
+            node._children = node._children[::-1]
+            tree._update()
+    session = time.perf_counter() - start
+    print(
+        f"{nedits} rotations on {ntips} tips: full={full:.2f}s, "
+        f"local={local:.3f}s ({full / local:.0f}x), "
+        f"session={session:.3f}s ({full / session:.0f}x)"
+    )
+
+    # adding tips to random internal Nodes shifts the idxs of Nodes
+    # after the edited clade, but does not need a traversal.
+    start = time.perf_counter()
+    for node in nodes:
+        node._add_child(Node("new", dist=1))
+        tree._update_full()
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for node in nodes:
+        add_child_node(tree, node, name="new", inplace=True)
+    local = time.perf_counter() - start
+    print(
+        f"{nedits} added tips on {ntips} tips: full={full:.2f}s, "
+        f"local={local:.2f}s ({full / local:.1f}x)"
+    )
+
+
+def benchmark_lca(ntips: int = 10_000, npairs: int = 100_000) -> None:
+    """Print time for MRCA queries with and without an LCAIndex."""
+    from toytree.core.lca import LCAIndex
+
+    rng = np.random.default_rng(123)
+    tree = get_random_tree(ntips, rng, dist=1)
+    pairs = rng.integers(0, tree.nnodes, size=(npairs, 2))
+
+    start = time.perf_counter()
+    index = LCAIndex(tree)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.get_mrca_idxs(pairs)
+    bulk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for idx0, idx1 in pairs[:1000].tolist():
+        index.get_mrca_idx(idx0, idx1)
+    single = (time.perf_counter() - start) / 1000
+
+    start = time.perf_counter()
+    for idx0, idx1 in pairs[:1000].tolist():
+        nodes = (tree[idx0], tree[idx1])
+        min(set.intersection(*(set(i.iter_ancestors(include_self=True)) for i in nodes)))
+    sets = (time.perf_counter() - start) / 1000
+    print(
+        f"{ntips} tips: build={build * 1e3:.1f}ms, "
+        f"bulk={bulk / npairs * 1e9:.0f}ns/pair, "
+        f"single={single * 1e6:.1f}us/pair, "
+        f"ancestor sets={sets * 1e6:.1f}us/pair"
+    )
+
+
+def benchmark_topology_hash(ntrees: int = 200, ntips: int = 200) -> None:
+    """Compare the time to compute topology ids and topology hashes,
+    and to find unique topologies by hash with exact comparison.
+    """
+    from toytree.core.topology_hash import get_topology_hash
+
+    trees = [toytree.rtree.rtree(ntips, seed=i % 50) for i in range(ntrees)]
+    t0 = time.perf_counter()
+    ids = {i._get_topology_id("name", False) for i in trees}
+    t1 = time.perf_counter()
+    hashes = {get_topology_hash(i) for i in trees}
+    t2 = time.perf_counter()
+    assert len(ids) == len(hashes)
+    print(
+        f"{ntrees} trees x {ntips} tips, {len(hashes)} unique: "
+        f"topology_id={t1 - t0:.2f}s, topology_hash={t2 - t1:.2f}s")
+
+    for exact in (False, True):
+        mtree = toytree.mtree([i.copy() for i in trees])
+        start = time.perf_counter()
+        unique = mtree.get_unique_topologies(exact=exact)
+        elapsed = time.perf_counter() - start
+        assert len(unique) == len(ids)
+        print(f"get_unique_topologies(exact={exact}): {elapsed:.2f}s")
+
+    mtree = toytree.mtree([trees[0].copy() for i in range(ntrees)])
+    start = time.perf_counter()
+    assert mtree.all_tree_topologies_same()
+    print(f"all_tree_topologies_same (all same): {time.perf_counter() - start:.2f}s")
+
+
+###################################################
+# distances and matrices
+###################################################
+
+def benchmark_vcv(ntips: int = 2_000) -> None:
+    """Print time to build a VCV with the old pairwise MRCA method vs
+    the clade-block fill.
+    """
+    from toytree.pcm.src.vcv import get_vcv_matrix_from_tree
+
+    tree = get_random_tree(ntips, dist="exp")
+
+    # old method: full node distance matrix and pairwise MRCA loop
+    t0 = time.perf_counter()
+    rdists = tree.distance.get_node_distance_matrix()[:, -1]
+    old = np.zeros((tree.ntips, tree.ntips))
+    for tip1 in range(tree.ntips):
+        for tip2 in range(tip1 + 1, tree.ntips):
+            mrca = tree.get_mrca_node(tip1, tip2)
+            old[tip1, tip2] = old[tip2, tip1] = rdists[mrca._idx]
+    old[np.diag_indices(tree.ntips)] = rdists[:tree.ntips]
+    t1 = time.perf_counter()
+    new = get_vcv_matrix_from_tree(tree)
+    t2 = time.perf_counter()
+    assert np.allclose(old, new)
+    get_vcv_matrix_from_tree(tree, dtype=np.float32)
+    t3 = time.perf_counter()
+    print(f"{ntips} tips: pairwise={t1 - t0:.2f}s, blocks={t2 - t1:.3f}s, "
+          f"blocks float32={t3 - t2:.3f}s")
+
+
+def benchmark_distance_matrix(ntips: int = 2_000) -> None:
+    """Print time to compute Node and tip distance matrices with the
+    old postorder clade-list loops vs the block fill.
+    """
+    from toytree.distance._src.nodedist import (
+        get_node_distance_matrix, get_tip_distance_matrix)
+
+    tree = get_random_tree(ntips, dist="exp")
+
+    # old method: loops over clade lists, then O(n^2) reordering.
+    t0 = time.perf_counter()
+    arr = np.zeros((tree.nnodes, tree.nnodes))
+    clade_map = {}
+    reorder = []
+    for idx, node in enumerate(tree.traverse("postorder")):
+        clade_map[node] = [idx]
+        reorder.append(node.idx)
+        for child in node._children:
+            clade = clade_map[child]
+            clade_map[node].extend(clade)
+            arr[clade, idx] = arr[clade, max(clade)] + child._dist
+        for ch0, ch1 in itertools.combinations(node._children, 2):
+            for c in clade_map[ch0]:
+                arr[c, clade_map[ch1]] = arr[c, idx] + arr[clade_map[ch1], idx]
+    arr[np.tril_indices_from(arr)] = arr.T[np.tril_indices_from(arr)]
+    idxorder = [reorder.index(i) for i in range(tree.nnodes)]
+    arr = arr[idxorder][:, idxorder]
+    t1 = time.perf_counter()
+    new = get_node_distance_matrix(tree)
+    t2 = time.perf_counter()
+    tips = get_tip_distance_matrix(tree)
+    t3 = time.perf_counter()
+    assert np.allclose(arr, new)
+    assert np.allclose(arr[:ntips, :ntips], tips)
+    print(
+        f"{ntips} tips: old={t1 - t0:.2f}s, nodes={t2 - t1:.3f}s "
+        f"({new.nbytes / 1e6:.0f}MB), tips={t3 - t2:.3f}s ({tips.nbytes / 1e6:.0f}MB)")
+
+
+def benchmark_bipartitions(ntips: int = 1_000, nreps: int = 3) -> None:
+    """Print time to get and compare bipartitions of two trees as
+    frozensets of names vs as int bitmasks.
+    """
+    rng = np.random.default_rng(0)
+    trees = [get_random_tree(ntips, rng) for _ in range(2)]
+
+    t0 = time.perf_counter()
+    for _ in range(nreps):
+        sets = [set(i.iter_bipartitions(type=frozenset, sort=True)) for i in trees]
+        len(sets[0] ^ sets[1])
+    t1 = time.perf_counter()
+    for _ in range(nreps):
+        sets = [set(i.iter_bipartitions(type="bitmask", sort=True)) for i in trees]
+        len(sets[0] ^ sets[1])
+    t2 = time.perf_counter()
+    print(
+        f"{ntips} tips RF: frozensets={(t1 - t0) / nreps:.3f}s, "
+        f"bitmasks={(t2 - t1) / nreps:.3f}s")
+
+
+def benchmark_treedist_matrix(ntrees: int = 100, ntips: int = 30, njobs: int = 4) -> None:
+    """Print time to compute an RF matrix by calling get_treedist_rf on
+    every pair vs get_treedist_matrix with cached bipartitions.
+    """
+    from toytree.distance._src.treedist import get_treedist_rf, get_treedist_matrix
+
+    trees = [toytree.rtree.unittree(ntips, seed=i) for i in range(ntrees)]
+    t0 = time.perf_counter()
+    for idx in range(ntrees):
+        for jdx in range(idx + 1, ntrees):
+            get_treedist_rf(trees[idx], trees[jdx])
+    t1 = time.perf_counter()
+    get_treedist_matrix(trees, metric="rf")
+    t2 = time.perf_counter()
+    get_treedist_matrix(trees, metric="rf", njobs=njobs)
+    t3 = time.perf_counter()
+    print(
+        f"{ntrees} trees x {ntips} tips RF: pairwise={t1 - t0:.2f}s, "
+        f"matrix={t2 - t1:.2f}s, matrix njobs={njobs}={t3 - t2:.2f}s")
+
+
+def benchmark_rf_one_to_many(ntrees: int = 100, ntips: int = 1000) -> None:
+    """Print time to compute RF from one tree to many by comparing
+    bitmask sets vs a cluster table of the reference tree.
+    """
+    from toytree.distance._src.treedist import (
+        _get_bitmask_set, _get_rf_distance, get_treedist_rf_one_to_many)
+
+    rng = np.random.default_rng(123)
+    tree = get_random_tree(ntips, rng)
+    trees = [get_random_tree(ntips, rng) for _ in range(ntrees)]
+    t0 = time.perf_counter()
+    set1 = _get_bitmask_set(tree)
+    [_get_rf_distance(set1, _get_bitmask_set(i), False) for i in trees]
+    t1 = time.perf_counter()
+    get_treedist_rf_one_to_many(tree, trees)
+    t2 = time.perf_counter()
+    print(
+        f"{ntrees} trees x {ntips} tips RF one-to-many: "
+        f"bitmask sets={t1 - t0:.2f}s, cluster table={t2 - t1:.2f}s")
+
+
+def benchmark_kf_matrix(ntrees: int = 2000, ntips: int = 50, njobs: int = 4) -> None:
+    """Print time to compute a KF branch score matrix by comparing edge
+    length dicts of every pair vs blockwise sparse matrix products.
+    """
+    from toytree.distance._src.treedist import (
+        get_treedist_matrix, _get_kf_edge_lengths, _get_kf_distance)
+
+    rng = np.random.default_rng(123)
+    base = [toytree.rtree.rtree(ntips, seed=i) for i in range(20)]
+    trees = []
+    for idx in range(ntrees):
+        tree = base[idx % 20].copy()
+        for node in tree[:-1]:
+            node._dist = rng.exponential(0.1)
+        trees.append(tree)
+
+    nsub = min(200, ntrees)
+    t0 = time.perf_counter()
+    data = [_get_kf_edge_lengths(i) for i in trees[:nsub]]
+    for idx in range(nsub):
+        for jdx in range(idx + 1, nsub):
+            _get_kf_distance(data[idx], data[jdx])
+    t1 = time.perf_counter()
+    get_treedist_matrix(trees, metric="kf")
+    t2 = time.perf_counter()
+    get_treedist_matrix(trees, metric="kf", njobs=njobs)
+    t3 = time.perf_counter()
+    print(
+        f"KF {nsub} trees x {ntips} tips pairwise dicts={t1 - t0:.2f}s; "
+        f"{ntrees} trees sparse matrix={t2 - t1:.2f}s, njobs={njobs}={t3 - t2:.2f}s")
+
+
+def benchmark_quartets(ntips: int = 1000, nsmall: int = 30) -> None:
+    """Print time to compare quartets by counting versus enumerating."""
+    from toytree.distance._src.quartet_dist import (
+        _get_quartet_comparison_from_tables, get_quartet_comparison,
+        get_quartet_resolutions_table)
+
+    rng = np.random.default_rng(123)
+    tree1, tree2 = get_random_tree(nsmall, rng), get_random_tree(nsmall, rng)
+    start = time.perf_counter()
+    _get_quartet_comparison_from_tables(
+        get_quartet_resolutions_table(tree1),
+        get_quartet_resolutions_table(tree2))
+    old = time.perf_counter() - start
+    start = time.perf_counter()
+    get_quartet_comparison(tree1, tree2)
+    new = time.perf_counter() - start
+    print(f"{nsmall} tips: enumerate={old:.2f}s, count={new:.3f}s")
+
+    tree1, tree2 = get_random_tree(ntips, rng), get_random_tree(ntips, rng)
+    start = time.perf_counter()
+    data = get_quartet_comparison(tree1, tree2)
+    new = time.perf_counter() - start
+    print(f"{ntips} tips ({data['Q']} quartets): count={new:.2f}s")
+
+
+def benchmark_split_matching(ntips: int = 500, nsmall: int = 100) -> None:
+    """Print time to fill split similarity matrices by pair or by array."""
+    from toytree.distance._src.treedist_utils import (
+        _get_two_splits_shared_phylo_info,
+        _get_two_splits_entropy_info,
+        _get_two_splits_matching_split_phylo_info,
+        _get_split_similarity_matrix,
+        _get_incidence_matrices,
+        get_trees_shared_phylo_info_dist,
+        get_trees_mutual_clust_info_dist,
+    )
+
+    rng = np.random.default_rng(123)
+    funcs = {
+        "spi": _get_two_splits_shared_phylo_info,
+        "mci": _get_two_splits_entropy_info,
+        "msi": _get_two_splits_matching_split_phylo_info,
+    }
+    tree1, tree2 = get_random_tree(nsmall, rng), get_random_tree(nsmall, rng)
+    biparts1 = list(tree1.iter_bipartitions())
+    biparts2 = list(tree2.iter_bipartitions())
+    for metric, func in funcs.items():
+        start = time.perf_counter()
+        [[func(i, j) for j in biparts2] for i in biparts1]
+        old = time.perf_counter() - start
+        start = time.perf_counter()
+        _get_split_similarity_matrix(*_get_incidence_matrices(biparts1, biparts2), metric)
+        new = time.perf_counter() - start
+        print(f"{nsmall} tips {metric}: pairwise={old:.2f}s, array={new:.4f}s")
+
+    tree1, tree2 = get_random_tree(ntips, rng), get_random_tree(ntips, rng)
+    for func in (get_trees_shared_phylo_info_dist, get_trees_mutual_clust_info_dist):
+        start = time.perf_counter()
+        func(tree1, tree2)
+        print(f"{ntips} tips {func.__name__}: {time.perf_counter() - start:.2f}s")
+
+
+def benchmark_tree_move_dists(npairs: int = 200, ntips: int = 50, nmoves: int = 3) -> None:
+    """Time NNI and SPR distances for pairs of trees nmoves SPRs apart."""
+    from toytree.distance._src.tree_move_dists import (
+        _get_state, _get_masks, _iter_spr_moves, _apply_spr_move,
+        _get_state_newick, get_treedist_nni, get_treedist_spr)
+
+    rng = np.random.default_rng(123)
+    pairs = []
+    for idx in range(npairs):
+        tree1 = toytree.rtree.rtree(ntips, seed=idx)
+        labels = sorted(tree1.get_tip_labels())
+        state = _get_state(tree1, {j: 1 << i for i, j in enumerate(labels)})
+        for _ in range(nmoves):
+            masks = _get_masks(state)
+            moves = list(_iter_spr_moves(state, masks, {}, set()))
+            _, s, t = moves[rng.integers(len(moves))]
+            state = _apply_spr_move(state, s, t)
+        pairs.append((tree1, toytree.tree(_get_state_newick(state, labels))))
+
+    t0 = time.perf_counter()
+    nni = [get_treedist_nni(*i)["lower"] for i in pairs]
+    t1 = time.perf_counter()
+    spr = [get_treedist_spr(*i, max_dist=nmoves + 2) for i in pairs]
+    t2 = time.perf_counter()
+    print(
+        f"{npairs} pairs x {ntips} tips, {nmoves} SPR moves apart: "
+        f"nni={t1 - t0:.2f}s (mean lower={np.mean(nni):.1f}), "
+        f"spr={t2 - t1:.2f}s (mean={np.mean(spr):.2f})")
+
+
+###################################################
+# inference
+###################################################
+
+def benchmark_nj(sizes: Sequence[int] = (500, 1000, 2000, 4000), reference_max: int = 2000) -> None:
+    """Print time to infer NJ trees from distances among tips of random
+    trees with noise, comparing to the original algorithm for smaller
+    sizes. Sizes up to 20000 require ~4GB of memory for the matrix.
+    """
+    from toytree.infer.src.neighbor_joining import (
+        iter_nj_algorithm, _iter_nj_algorithm_reference)
+
+    rng = np.random.default_rng(123)
+    for ntips in sizes:
+        tree = get_random_tree(ntips, rng, dist="exp")
+        dist = tree.distance.get_tip_distance_matrix()
+        noise = rng.normal(0, 0.05, dist.shape)
+        dist = np.abs(dist + (noise + noise.T))
+        np.fill_diagonal(dist, 0)
+
+        t0 = time.perf_counter()
+        joins = list(iter_nj_algorithm(dist))
+        t1 = time.perf_counter()
+        msg = f"NJ {ntips} tips: in-place={t1 - t0:.2f}s"
+        if ntips <= reference_max:
+            ref = list(_iter_nj_algorithm_reference(dist))
+            t2 = time.perf_counter()
+            # unordered pairs, excluding the last joins among <=4 nodes
+            # where complementary pairs are always exactly tied.
+            same = [set(i[:2]) for i in joins[:-3]] == [set(i[:2]) for i in ref[:-3]]
+            msg += f", original={t2 - t1:.2f}s, same joins={same}"
+        print(msg)
+
+
+def benchmark_upgma(sizes: Sequence[int] = (250, 500, 1000, 2000)) -> None:
+    """Print time to infer UPGMA trees from random distance matrices,
+    and check that the trees have the same cophenetic distances as
+    the scipy linkage.
+    """
+    from scipy.cluster.hierarchy import linkage, cophenet
+    from toytree.infer.src.upgma import upgma_tree
+
+    rng = np.random.default_rng(123)
+    for ntips in sizes:
+        points = rng.normal(size=(ntips, 5))
+        arr = np.sqrt(((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2))
+        cond = arr[np.triu_indices(ntips, 1)]
+
+        t0 = time.perf_counter()
+        tree = upgma_tree(cond)
+        t1 = time.perf_counter()
+        coph = cophenet(linkage(cond, method="average"))
+        t2 = time.perf_counter()
+        names = [str(i) for i in range(ntips)]
+        dists = tree.distance.get_tip_distance_matrix(df=True).loc[names, names].values
+        same = np.allclose(dists[np.triu_indices(ntips, 1)], coph)
+        print(f"UPGMA {ntips} tips: nn-chain={t1 - t0:.2f}s, scipy={t2 - t1:.2f}s, same={same}")
+
+
+def _simulate_dna(tree: toytree.ToyTree, nsites: int, rate: float, rng: np.random.Generator) -> np.ndarray:
+    """Return a (ntips, nsites) uint8 array of ACGT codes (0-3) from
+    sequences evolved down a tree, in which each site is resampled
+    on each edge with probability `rate`.
+    """
+    seqs = {tree.nnodes - 1: rng.integers(0, 4, nsites, dtype=np.uint8)}
+    for idx in range(tree.nnodes - 2, -1, -1):
+        seq = seqs[tree[idx].up._idx].copy()
+        mut = rng.random(nsites) < rate
+        seq[mut] = rng.integers(0, 4, mut.sum(), dtype=np.uint8)
+        seqs[idx] = seq
+    return np.array([seqs[i] for i in range(tree.ntips)])
+
+
+def benchmark_parsimony(ntips: int = 1000, nsites: int = 100_000, seed: int = 123) -> None:
+    """Print time to score a tree from a simulated DNA alignment of
+    ntips x nsites with some ambiguous (N, R) characters.
+    """
+    from toytree.infer.src.parsimony import Parsimony
+
+    tree = toytree.rtree.unittree(ntips, seed=seed)
+    rng = np.random.default_rng(seed)
+    arr = np.frombuffer(b"ACGT", dtype=np.uint8)[_simulate_dna(tree, nsites, 0.02, rng)]
+    arr[rng.random(arr.shape) < 0.001] = ord("N")
+    arr[rng.random(arr.shape) < 0.001] = ord("R")
+    arr = arr.view("S1")
+
+    t0 = time.perf_counter()
+    tool = Parsimony(arr)
+    t1 = time.perf_counter()
+    score = tool.get_score(tree)
+    t2 = time.perf_counter()
+    print(
+        f"{ntips} tips x {nsites} sites ({tool.counts.size} patterns): "
+        f"encode={t1 - t0:.2f}s, fitch={t2 - t1:.2f}s, score={score}")
+
+    weights = 1 - np.eye(4)
+    weights[[0, 1, 2, 3], [2, 3, 0, 1]] = 0.5
+    tool.weights = weights
+    t3 = time.perf_counter()
+    score = tool.get_score(tree)
+    print(f"sankoff (transitions=0.5)={time.perf_counter() - t3:.2f}s, score={score}")
+
+
+def benchmark_parsimony_search(ntips: int = 100, nsites: int = 2000, seed: int = 123) -> None:
+    """Print time to score SPR neighbors incrementally and as copied
+    trees, and time and scores of searches on simulated DNA data.
+    """
+    from toytree.mod._src.tree_move import move_spr_iter
+    from toytree.infer.src.parsimony import Parsimony
+    from toytree.infer.src.parsimony_search import (
+        parsimony_tree_search, _FitchSearchState, _get_binary_children)
+
+    rng = np.random.default_rng(seed)
+    tree = toytree.rtree.unittree(ntips, seed=seed)
+    data = pd.DataFrame(
+        np.array(list("ACGT"))[_simulate_dna(tree, nsites, 0.15, rng)],
+        index=tree.get_tip_labels())
+    start = toytree.rtree.rtree(ntips, seed=seed)
+    start = start.set_node_data("name", dict(zip(range(ntips), tree.get_tip_labels())))
+
+    # score all SPR neighbors of the start tree.
+    tool = Parsimony(data)
+    rows = {j: i for i, j in enumerate(tool.names)}
+    state = _FitchSearchState(tool.patterns, tool.counts, *_get_binary_children(start, rows))
+    t0 = time.perf_counter()
+    subtrees = state.iter_spr_subtrees()
+    for subtree in subtrees:
+        state.get_best_spr(subtree)
+    t1 = time.perf_counter()
+    nneighbors = 200
+    for ntree in itertools.islice(move_spr_iter(start), nneighbors):
+        tool.get_score(ntree)
+    t2 = time.perf_counter()
+    nedges = len(state.children) - 2
+    print(
+        f"{ntips} tips x {nsites} sites ({tool.counts.size} patterns), SPR neighbors: "
+        f"incremental={(t1 - t0) / (len(subtrees) * nedges) * 1e6:.1f}us each, "
+        f"copy+score={(t2 - t1) / nneighbors * 1e6:.1f}us each")
+
+    true = tool.get_score(tree)
+    for moves in ("nni", "spr"):
+        t0 = time.perf_counter()
+        result = parsimony_tree_search(data, tree=start, moves=moves)
+        rfdist = toytree.distance.get_treedist_rf(result, tree, normalize=True)
+        print(
+            f"search {moves}: time={time.perf_counter() - t0:.2f}s "
+            f"score={tool.get_score(result)} (true tree={true}, start={tool.get_score(start)}), "
+            f"normalized RF to true={rfdist:.2f}")
+
+
+def benchmark_loglikelihood(ntips: int = 50, nsites: int = 10000, nsites_per_site: int = 100) -> None:
+    """Print time to compute the log-likelihood of an alignment by
+    vectorized pruning, compared to the per-site recursive function."""
+    from toytree.infer.src.maximum_likelihood import (
+        K80, BASE_ORDER, get_tree_likelihood, get_tree_loglikelihood,
+        _get_eigen_system, _get_p_matrices, _get_tip_patterns)
+
+    rng = np.random.default_rng(123)
+    tree = toytree.rtree.unittree(ntips, treeheight=0.5, seed=123)
+    model = K80()
+    q_matrix, pi = model.get_rate_matrix_array(kappa=2.)
+    evals, evecs, ievecs = _get_eigen_system(tuple(q_matrix.ravel()), tuple(pi))
+    dists = np.array([tree[i]._dist for i in range(tree.nnodes - 1)])
+    pmats = _get_p_matrices(evals, evecs, ievecs, dists)
+
+    # simulate sites down the tree
+    states = {tree.nnodes - 1: rng.choice(4, size=nsites, p=pi)}
+    for idx in range(tree.nnodes - 2, -1, -1):
+        cum = pmats[idx][states[tree[idx].up._idx]].cumsum(axis=1)
+        states[idx] = (rng.random((nsites, 1)) > cum).sum(axis=1)
+    seqs = {tree[i].name: "".join(np.array(BASE_ORDER)[states[i]]) for i in range(ntips)}
+
+    t0 = time.perf_counter()
+    _get_tip_patterns(tree, seqs)
+    parse = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    loglik = get_tree_loglikelihood(tree, seqs, model, kappa=2.)
+    t1 = time.perf_counter()
+
+    # per-site recursive function on a subset of sites.
+    p_matrix_func = model.get_p_matrix_function(kappa=2.)
+    sub = {i: j[:nsites_per_site] for i, j in seqs.items()}
+    sub_loglik = get_tree_loglikelihood(tree, sub, model, kappa=2.)
+    t2 = time.perf_counter()
+    old = sum(
+        np.log(get_tree_likelihood(tree, {i: j[site] for i, j in sub.items()}, p_matrix_func, pi))
+        for site in range(nsites_per_site))
+    t3 = time.perf_counter()
+    per_site = (t3 - t2) / nsites_per_site
+    print(
+        f"{ntips} tips x {nsites} sites: pruning={t1 - t0:.3f}s "
+        f"(of which parsing data={parse:.3f}s, lnL={loglik:.2f}), "
+        f"per-site={per_site * nsites:.1f}s (extrapolated from {nsites_per_site} sites, "
+        f"lnL difference={abs(old - sub_loglik):.2e})")
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "newick": benchmark_newick,
+    "parse_multitree": benchmark_parse_multitree,
+    "tree_arrays": benchmark_tree_arrays,
+    "node_memory": benchmark_node_memory,
+    "copy": benchmark_copy,
+    "edits": benchmark_edits,
+    "lca": benchmark_lca,
+    "topology_hash": benchmark_topology_hash,
+    "vcv": benchmark_vcv,
+    "distance_matrix": benchmark_distance_matrix,
+    "bipartitions": benchmark_bipartitions,
+    "treedist_matrix": benchmark_treedist_matrix,
+    "rf_one_to_many": benchmark_rf_one_to_many,
+    "kf_matrix": benchmark_kf_matrix,
+    "quartets": benchmark_quartets,
+    "split_matching": benchmark_split_matching,
+    "tree_move_dists": benchmark_tree_move_dists,
+    "nj": benchmark_nj,
+    "upgma": benchmark_upgma,
+    "parsimony": benchmark_parsimony,
+    "parsimony_search": benchmark_parsimony_search,
+    "loglikelihood": benchmark_loglikelihood,
+}
+
+
+if __name__ == "__main__":
+
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"--- {name}")
+        BENCHMARKS[name]()